@@ -0,0 +1,32 @@
+"""
+Command line tool that removes duplicate games from the game archive.
+"""
+import logging
+from chessy.config import (
+    USERNAME, HEADERS, ARCHIVE_FILE, LAST_DOWNLOADED_FILE, ARCHIVE_CACHE_DIR, GAME_IDS_FILE, OUTPUT_DIR
+)
+from chessy.services.downloader import ChessComDownloader
+from chessy.services.archive_cache import ArchiveCache
+from chessy.services.game_ids import GameIdSet
+from chessy.utils.logging import setup_logging, emoji_log
+
+def main():
+    """Rewrite the archive without duplicates and rebuild the set of archived game IDs."""
+    logger = setup_logging(OUTPUT_DIR)
+
+    downloader = ChessComDownloader(
+        username=USERNAME,
+        headers=HEADERS,
+        archive_file=ARCHIVE_FILE,
+        last_downloaded_file=LAST_DOWNLOADED_FILE,
+        archive_cache=ArchiveCache(ARCHIVE_CACHE_DIR),
+        game_ids=GameIdSet(GAME_IDS_FILE)
+    )
+
+    kept, removed = downloader.compact_archive()
+    emoji_log(logger, logging.INFO,
+             f"Archive holds {kept} games after removing {removed} duplicates. "
+             "Games are parsed again on the next run.", "✅")
+
+if __name__ == "__main__":
+    main()
@@ -31,10 +31,17 @@ class Config:
         
         # File Paths
         self.ARCHIVE_FILE = os.path.join(self.GAMES_DIR, f"{self.USERNAME}_GameArchive.pgn")
-        self.PARSED_GAMES_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_games_parsed.json")
-        self.GAME_ANALYSIS_FILE = os.path.join(self.ANALYSIS_DIR, "game_analysis.json")
+        self.PARSED_GAMES_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_games_parsed.jsonl")
+        self.GAME_ANALYSIS_FILE = os.path.join(self.ANALYSIS_DIR, "game_analysis.jsonl")
+        self.GAME_INDEX_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_game_index.json")
+        self.PARSE_STATE_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_parse_state.json")
+        self.EVAL_CACHE_FILE = os.path.join(self.ANALYSIS_DIR, "eval_cache.sqlite")
+        self.GAME_DB_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_games.sqlite")
         self.ECO_CSV_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_eco_performance.csv")
+        self.SUMMARY_FILE = os.path.join(self.ANALYSIS_DIR, f"{self.USERNAME}_summary.json")
         self.LAST_DOWNLOADED_FILE = os.path.join(self.GAMES_DIR, "last_downloaded.txt")
+        self.ARCHIVE_CACHE_DIR = os.path.join(self.GAMES_DIR, "archive_cache")
+        self.GAME_IDS_FILE = os.path.join(self.GAMES_DIR, f"{self.USERNAME}_game_ids.txt")
         
         # API Configuration
         self.HEADERS = {
@@ -42,9 +49,60 @@ class Config:
             'Accept-Encoding': 'gzip',
             'Accept': 'application/json, text/plain, */*'
         }
+        self.DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", 4))  # Monthly archives downloaded at the same time
+        self.API_RATE_LIMIT = float(os.getenv("API_RATE_LIMIT", 3))  # Average Chess.com requests per second
+        
+        # Parser Configuration
+        self.FAST_HEADER_SCAN = os.getenv("FAST_HEADER_SCAN", "true").lower() == "true"  # Skip move replay when parsing metadata
+        self.PARSER_WORKERS = int(os.getenv("PARSER_WORKERS", os.cpu_count() or 1))  # Processes used to parse large archives
         
         # Analysis Configuration
         self.STOCKFISH_ANALYSIS_DEPTH = 18  # Default analysis depth
+        self.STOCKFISH_ANALYSIS_TIME = 0.1  # Time cap per position (seconds)
+        self.ADAPTIVE_ANALYSIS = os.getenv("ADAPTIVE_ANALYSIS", "true").lower() == "true"  # Shallow scan, deep re-check
+        self.STOCKFISH_SCAN_DEPTH = 8  # Depth of the shallow scan in adaptive mode
+        self.ESCALATION_MARGIN = 5  # Re-check moves within this many points of either threshold (scale below)
+        self.ENGINE_POOL_SIZE = int(os.getenv("ENGINE_POOL_SIZE", os.cpu_count() or 1))  # Parallel engine processes
+        
+        # Move classification thresholds, in percentage points of winning chances (0-100) lost by one
+        # of the player's own moves (the opponent's moves aren't counted). Evaluations are converted with the logistic curve Lichess uses for accuracy
+        # (GameAnalyzer._white_win_percent). From a level position a 100cp slip, the old inaccuracy
+        # threshold, costs about 9 points; 20 points is a 230cp drop, a little under the old 300cp
+        # blunder threshold (25 points). Results record these values, so changing them re-analyzes games.
+        self.BLUNDER_THRESHOLD = 20  # Win probability lost by a move (percentage points)
+        self.INACCURACY_THRESHOLD = 10  # Win probability lost by a move (percentage points)
+        self.EVAL_CACHE_MAX_ENTRIES = int(os.getenv("EVAL_CACHE_MAX_ENTRIES", 1000000))  # Cached positions kept on disk
+        self.ANALYSIS_CHECKPOINT_INTERVAL = 50  # Save partial results every N analyzed games
+        
+        # Analysis profiles: engine limits for the full and scan passes, UCI Threads/Hash and pool size.
+        # Evaluations are cached only when reproducible: a depth or node limit on a single thread.
+        # A depth limit with a time cap ("standard" full pass) is cached under its depth alone, and
+        # only for searches that reached that depth before the time ran out. Every profile runs
+        # single-threaded engines and scales with the pool size instead.
+        self.ANALYSIS_PROFILES = {
+            "fast": {
+                "limit": {"nodes": 100000},
+                "scan_limit": {"nodes": 20000},
+                "threads": 1,
+                "hash": 32,
+                "pool_size": self.ENGINE_POOL_SIZE
+            },
+            "standard": {
+                "limit": {"depth": self.STOCKFISH_ANALYSIS_DEPTH, "time": self.STOCKFISH_ANALYSIS_TIME},
+                "scan_limit": {"depth": self.STOCKFISH_SCAN_DEPTH},
+                "threads": 1,
+                "hash": 64,
+                "pool_size": self.ENGINE_POOL_SIZE
+            },
+            "deep": {
+                "limit": {"nodes": 2000000},
+                "scan_limit": {"nodes": 200000},
+                "threads": 1,
+                "hash": 256,
+                "pool_size": max(1, self.ENGINE_POOL_SIZE // 2)  # Fewer engines for the larger hash
+            }
+        }
+        self.ANALYSIS_PROFILE = os.getenv("ANALYSIS_PROFILE", "standard")  # Profile used when none is requested
 
 # Create a singleton configuration instance
 config = Config()
@@ -60,8 +118,14 @@ LOGS_DIR = config.LOGS_DIR
 ARCHIVE_FILE = config.ARCHIVE_FILE
 PARSED_GAMES_FILE = config.PARSED_GAMES_FILE
 GAME_ANALYSIS_FILE = config.GAME_ANALYSIS_FILE
+GAME_INDEX_FILE = config.GAME_INDEX_FILE
+PARSE_STATE_FILE = config.PARSE_STATE_FILE
+GAME_DB_FILE = config.GAME_DB_FILE
 ECO_CSV_FILE = config.ECO_CSV_FILE
+SUMMARY_FILE = config.SUMMARY_FILE
 LAST_DOWNLOADED_FILE = config.LAST_DOWNLOADED_FILE
+ARCHIVE_CACHE_DIR = config.ARCHIVE_CACHE_DIR
+GAME_IDS_FILE = config.GAME_IDS_FILE
 HEADERS = config.HEADERS
 
 def validate_config():
@@ -75,4 +139,8 @@ def validate_config():
     elif not os.path.exists(config.STOCKFISH_PATH):
         logging.warning(f"Stockfish not found at {config.STOCKFISH_PATH}. Analysis features will be limited.")
     
+    if config.ANALYSIS_PROFILE not in config.ANALYSIS_PROFILES:
+        logging.warning(f"Unknown ANALYSIS_PROFILE '{config.ANALYSIS_PROFILE}'. Using 'standard' instead.")
+        config.ANALYSIS_PROFILE = "standard"
+    
     return True
\ No newline at end of file
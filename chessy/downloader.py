@@ -1,13 +1,23 @@
 import requests
-import time
 import os
 from datetime import datetime
+import shutil
 import logging
+from chessy.utils.pgn import PGNReader
+from chessy.utils.rate_limit import TokenBucket, get_with_retries
+
+# Retries for throttled or failed requests, and the base delay (seconds) of the backoff between them
+MAX_RETRIES = 3
+RETRY_DELAY = 2
+
+# Average number of API requests per second
+RATE_LIMIT = 3
 
 class ChessComDownloader:
-    def __init__(self, username, headers, archive_file, last_downloaded_file):
+    def __init__(self, username, headers, archive_file, last_downloaded_file, rate_limiter=None):
         self.username = username
         self.headers = headers
+        self.rate_limiter = rate_limiter or TokenBucket(RATE_LIMIT)
         self.archive_file = archive_file
         self.last_downloaded_file = last_downloaded_file
         self.output_dir = os.path.dirname(archive_file)
@@ -21,7 +31,8 @@ class ChessComDownloader:
         url = f"https://api.chess.com/pub/player/{self.username}/games/archives"
         
         try:
-            response = requests.get(url, headers=self.headers)
+            response = get_with_retries(requests, url, self.rate_limiter, MAX_RETRIES, RETRY_DELAY,
+                                        headers=self.headers)
             response.raise_for_status()  # Raise exception for 4XX/5XX responses
             
             return response.json().get('archives', [])
@@ -64,7 +75,11 @@ class ChessComDownloader:
         
         archives = self.fetch_archives()
         last_downloaded_date = self.get_last_downloaded_datetime()
-        new_pgns = ""
+        
+        # Stream each archive straight into the new games file instead of building one big string
+        date_str = datetime.now().strftime("%Y.%m.%d")
+        new_pgn_file = os.path.join(self.output_dir, f"{self.username}_GameArchive_{date_str}.pgn")
+        recent_file = open(new_pgn_file, "wb")
         
         for archive_url in archives:
             archive_date = archive_url.split("/")[-2] + "/" + archive_url.split("/")[-1]  # Extract YYYY/MM format
@@ -74,47 +89,35 @@ class ChessComDownloader:
                 continue
             
             try:
-                # Respect rate limits
-                time.sleep(1)
-                
-                response = requests.get(f"{archive_url}/pgn", headers=self.headers)
-                
-                if response.status_code == 200:
-                    logging.info(f"Downloaded PGNs from {archive_date}")
-                    new_pgns += response.text + "\n\n"
-                elif response.status_code == 429:
-                    logging.warning("Rate limit exceeded. Waiting 60 seconds...")
-                    time.sleep(60)
-                    
-                    # Retry after waiting
-                    retry_response = requests.get(f"{archive_url}/pgn", headers=self.headers)
-                    if retry_response.status_code == 200:
-                        new_pgns += retry_response.text + "\n\n"
+                # Rate limiting, Retry-After and backoff on throttled requests are handled here
+                with get_with_retries(requests, f"{archive_url}/pgn", self.rate_limiter,
+                                      MAX_RETRIES, RETRY_DELAY, headers=self.headers, stream=True) as response:
+                    if response.status_code == 200:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            recent_file.write(chunk)
+                        recent_file.write(b"\n\n")
+                        logging.info(f"Downloaded PGNs from {archive_date}")
                     else:
-                        logging.error(f"Failed to fetch PGNs after retry: {retry_response.status_code}")
-                else:
-                    logging.error(f"Failed to fetch PGNs: {response.status_code}")
+                        logging.error(f"Failed to fetch PGNs: {response.status_code}")
             
             except Exception as e:
                 logging.error(f"Error downloading archive {archive_url}: {e}")
         
-        if not new_pgns.strip():
-            logging.info("No new games found")
-            return None
+        recent_file.close()
         
-        # Save newly downloaded games to a separate file
-        date_str = datetime.now().strftime("%Y.%m.%d")
-        new_pgn_file = os.path.join(self.output_dir, f"{self.username}_GameArchive_{date_str}.pgn")
+        # Count games by their boundaries in the file on disk
+        with PGNReader(new_pgn_file) as reader:
+            game_count = reader.count_games()
         
-        with open(new_pgn_file, "w") as recent_file:
-            recent_file.write(new_pgns)
+        if not game_count:
+            os.remove(new_pgn_file)
+            logging.info("No new games found")
+            return None
         
         # Append to archive file
-        with open(self.archive_file, "a") as archive:
-            archive.write(new_pgns)
+        with open(new_pgn_file, "rb") as recent_file, open(self.archive_file, "ab") as archive:
+            shutil.copyfileobj(recent_file, archive)
         
-        # Count games (approximate by counting [Event tags)
-        game_count = new_pgns.count('[Event "')
         logging.info(f"Added {game_count} games to archive")
         
         # Update last downloaded tracker
@@ -12,29 +12,40 @@ import logging
 import threading
 import datetime
 import traceback
+import hashlib
+import functools
 from datetime import datetime
 from datetime import timedelta
+from datetime import timezone
 import io
+import shutil
 import chess
 import chess.pgn
 from flask import send_from_directory
 from chessy.utils import format_time_control, categorize_time_control
 
 # Third-party libraries
-from flask import Flask, render_template, jsonify, request, redirect, url_for, flash, session, send_from_directory
+from flask import Flask, Response, make_response, render_template, jsonify, request, redirect, url_for, flash, session, send_from_directory
 import pandas as pd
 
 # Chessy modules
 from chessy.config import (
-    USERNAME, HEADERS, ARCHIVE_FILE, LAST_DOWNLOADED_FILE, 
-    GAME_ANALYSIS_FILE, PARSED_GAMES_FILE, ECO_CSV_FILE, 
-    STOCKFISH_PATH, validate_config, OUTPUT_DIR, config
+    USERNAME, HEADERS, ARCHIVE_FILE, LAST_DOWNLOADED_FILE, ARCHIVE_CACHE_DIR, GAME_IDS_FILE,
+    GAME_ANALYSIS_FILE, PARSED_GAMES_FILE, ECO_CSV_FILE, GAME_INDEX_FILE, GAME_DB_FILE, PARSE_STATE_FILE,
+    SUMMARY_FILE, STOCKFISH_PATH, validate_config, OUTPUT_DIR, config
 )
 from chessy.services.downloader import ChessComDownloader
-from chessy.services.parser import GameParser
+from chessy.services.archive_cache import ArchiveCache
+from chessy.services.game_ids import GameIdSet
+from chessy.services.parser import GameParser, game_identifier
 from chessy.services.analyzer import GameAnalyzer
+from chessy.services.game_store import GameStore
+from chessy.services.data_cache import DataCache
+from chessy.services.summary import GameSummary
 from chessy.services import ChessyService
 from chessy.utils.logging import setup_logging, emoji_log
+from chessy.utils.pgn import PGNReader
+from chessy.utils.rate_limit import TokenBucket
 
 ################################################################################
 # II. APPLICATION INITIALIZATION
@@ -79,6 +90,37 @@ background_tasks = {
     }
 }
 
+# Indexed store of games and analysis results shared by the services and routes
+game_store = GameStore(GAME_DB_FILE, game_identifier)
+
+# Decoded query results and data files shared by the routes, reloaded only when the data changes
+data_cache = DataCache(game_store)
+
+# Precomputed aggregates of the analyzed games that the dashboard pages read
+game_summary = GameSummary(SUMMARY_FILE, game_store)
+
+# Fields of each game in a /api/games page, enough to draw one table row
+GAME_LIST_FIELDS = ("date", "white", "black", "Result", "PlayedAs", "ECO", "TimeControl", "NumMoves", "link")
+
+# Sort keys of the game list and the largest page it serves
+GAME_LIST_SORTS = ("date", "eco", "opponent", "result", "moves")
+MAX_GAME_PAGE_SIZE = 500
+
+# Fields /api/game_data leaves out unless they are asked for (server file paths)
+GAME_DATA_HIDDEN_FIELDS = ("source_file",)
+
+# Games encoded per chunk of a streamed /api/game_data response
+GAME_DATA_CHUNK_SIZE = 500
+
+# Seconds browsers may reuse the ECO dictionary without asking again (it only changes with the code)
+ECO_DICTIONARY_MAX_AGE = 7 * 24 * 3600
+
+# Downloaded monthly archives, reused and revalidated across downloads
+archive_cache = ArchiveCache(ARCHIVE_CACHE_DIR)
+
+# Identifiers of archived games, so downloads only append games not seen before
+game_ids = GameIdSet(GAME_IDS_FILE)
+
 # Initialize services
 def init_services():
     """Initialize all required services."""
@@ -94,16 +136,27 @@ def init_services():
             username=USERNAME,
             headers=HEADERS,
             archive_file=ARCHIVE_FILE,
-            last_downloaded_file=LAST_DOWNLOADED_FILE
+            last_downloaded_file=LAST_DOWNLOADED_FILE,
+            max_workers=config.DOWNLOAD_WORKERS,
+            rate_limiter=TokenBucket(config.API_RATE_LIMIT),
+            archive_cache=archive_cache,
+            game_ids=game_ids
         )
         
         parser = GameParser(
             username=USERNAME,
-            parsed_games_file=PARSED_GAMES_FILE
+            parsed_games_file=PARSED_GAMES_FILE,
+            game_index_file=GAME_INDEX_FILE,
+            game_store=game_store,
+            fast_scan=config.FAST_HEADER_SCAN,
+            workers=config.PARSER_WORKERS,
+            parse_state_file=PARSE_STATE_FILE
         )
         
         analyzer = GameAnalyzer(
-            config=config
+            config=config,
+            game_store=game_store,
+            summary=game_summary
         )
         
         # Initialize main service
@@ -146,8 +199,7 @@ def ensure_required_files():
         if os.path.exists(ARCHIVE_FILE) and chessy_service:
             try:
                 # Create an empty parsed games file
-                with open(PARSED_GAMES_FILE, "w") as f:
-                    f.write(json.dumps([]))
+                open(PARSED_GAMES_FILE, "w").close()
                     
                 # Parse games
                 emoji_log(logger, logging.INFO, f"Parsing games from existing archive: {ARCHIVE_FILE}", "📊")
@@ -160,39 +212,34 @@ def ensure_required_files():
     # Check for game analysis
     if not os.path.exists(GAME_ANALYSIS_FILE):
         emoji_log(logger, logging.WARNING, "No game analysis found. Will run analysis on request.", "⚠️")
-        # Create an empty analysis file so JSON reads don't fail
+        # Create an empty analysis file so journal reads don't fail
         try:
-            with open(GAME_ANALYSIS_FILE, "w") as f:
-                f.write(json.dumps([]))
+            open(GAME_ANALYSIS_FILE, "w").close()
         except Exception as e:
             emoji_log(logger, logging.ERROR, f"Error creating empty analysis file: {str(e)}", "❌")
         
     return True
 
+def read_eco_csv():
+    """Read the rows of the ECO performance CSV."""
+    with open(ECO_CSV_FILE, "r") as f:
+        return list(csv.DictReader(f))
+
+def get_summary():
+    """Get the precomputed aggregates of the analyzed games."""
+    return data_cache.load("summary", game_summary.current)
+
 def get_date_range():
     """Get the date range of available games."""
     try:
         if not os.path.exists(PARSED_GAMES_FILE):
             return {"start": None, "end": None}
             
-        with open(PARSED_GAMES_FILE, "r") as f:
-            games_data = json.load(f)
-            
-        if not games_data:
-            return {"start": None, "end": None}
-            
-        # Extract valid dates
-        dates = [game.get("date") for game in games_data if game.get("date") and game.get("date") != "????-??-??"]
-        
-        if not dates:
-            return {"start": None, "end": None}
-            
-        # Sort dates
-        dates.sort()
+        start, end = data_cache.date_range()
         
         return {
-            "start": dates[0],
-            "end": dates[-1]
+            "start": start,
+            "end": end
         }
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error getting date range: {str(e)}", "❌")
@@ -260,27 +307,15 @@ def download_thread(app_context):
             
             if os.path.exists(PARSED_GAMES_FILE):
                 try:
-                    with open(PARSED_GAMES_FILE, "r") as f:
-                        games_data = json.load(f)
-                    
-                    # Filter games by date
-                    filtered_games = games_data
+                    # Count matching games by date and time control category
+                    existing_filters = {}
                     if start_date and end_date:
-                        filtered_games = [g for g in filtered_games if g.get('date', '') >= start_date and 
-                                        g.get('date', '') <= end_date]
-                    
-                    # Filter by time control if needed
+                        existing_filters["start_date"] = start_date
+                        existing_filters["end_date"] = end_date
                     if time_control != 'all':
-                        temp_filtered = []
-                        for game in filtered_games:
-                            tc = game.get('TimeControl', '')
-                            if tc:
-                                game_category = categorize_time_control(tc)
-                                if game_category == time_control:
-                                    temp_filtered.append(game)
-                        filtered_games = temp_filtered
+                        existing_filters["tc_category"] = time_control
                     
-                    filtered_game_count = len(filtered_games)
+                    filtered_game_count = data_cache.count_games(existing_filters)
                     
                     # If we have games that match the filter
                     if filtered_game_count > 0:
@@ -412,6 +447,7 @@ def analyze_thread(app_context):
     with app_context:
         try:
             background_tasks['analyze']['running'] = True
+            background_tasks['analyze']['cancel_requested'] = False
             background_tasks['analyze']['status'] = "Running"
             background_tasks['analyze']['messages'] = ["Starting analysis..."]
             background_tasks['analyze']['start_time'] = datetime.now()
@@ -420,9 +456,7 @@ def analyze_thread(app_context):
             total_games = 0
             if os.path.exists(PARSED_GAMES_FILE):
                 try:
-                    with open(PARSED_GAMES_FILE, "r") as f:
-                        parsed_games = json.load(f)
-                        total_games = len(parsed_games)
+                    total_games = data_cache.count_games()
                 except Exception as e:
                     emoji_log(logger, logging.ERROR, f"Error loading parsed games: {str(e)}", "❌")
             
@@ -472,23 +506,40 @@ def analyze_thread(app_context):
                 chessy_service.analyzer.set_progress_callback(progress_callback)
             
             # Trigger game analysis
-            results = chessy_service.process_new_games()
+            profile = background_tasks['analyze'].get('profile', config.ANALYSIS_PROFILE)
+            background_tasks['analyze']['messages'].append(f"Using {profile} analysis profile")
+            results = chessy_service.process_new_games(profile=profile)
             
-            background_tasks['analyze']['messages'].append(f"Completed: {results['analyzed_games']} games analyzed")
-            background_tasks['analyze']['status'] = f"Completed: {results['analyzed_games']} games analyzed"
             background_tasks['analyze']['result'] = results
             background_tasks['analyze']['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             end_time = datetime.now()
             background_tasks['analyze']['elapsed_seconds'] = (end_time - background_tasks['analyze']['start_time']).total_seconds()
-            background_tasks['analyze']['current'] = total_games  # Ensure we show 100% at the end
-            background_tasks['analyze']['percentage'] = 100
             
-            # Push notification to user
-            background_tasks['analyze']['notification'] = {
-                'type': 'success',
-                'title': 'Analysis Complete',
-                'message': f"Successfully analyzed {results['analyzed_games']} games"
-            }
+            if results.get('cancelled'):
+                # Progress up to the last checkpoint is kept and resumed by the next run
+                background_tasks['analyze']['messages'].append("Analysis cancelled. Progress saved, run Analyze again to resume.")
+                background_tasks['analyze']['status'] = "Cancelled"
+                background_tasks['analyze']['notification'] = {
+                    'type': 'warning',
+                    'title': 'Analysis Cancelled',
+                    'message': "Analysis stopped. Completed games were saved and will be skipped next time."
+                }
+            else:
+                background_tasks['analyze']['messages'].append(f"Completed: {results['analyzed_games']} games analyzed")
+                if results.get('skipped_games'):
+                    background_tasks['analyze']['messages'].append(
+                        f"Reused {results['skipped_games']} results from earlier runs"
+                    )
+                background_tasks['analyze']['status'] = f"Completed: {results['analyzed_games']} games analyzed"
+                background_tasks['analyze']['current'] = total_games  # Ensure we show 100% at the end
+                background_tasks['analyze']['percentage'] = 100
+                
+                # Push notification to user
+                background_tasks['analyze']['notification'] = {
+                    'type': 'success',
+                    'title': 'Analysis Complete',
+                    'message': f"Successfully analyzed {results['analyzed_games']} games"
+                }
                 
         except Exception as e:
             error_msg = f"Analysis error: {str(e)}"
@@ -560,6 +611,89 @@ def get_pending_notifications():
     
     return notifications
 
+def conditional_response(etag, build, last_modified=None, max_age=None):
+    """
+    Serve a response with ETag / Last-Modified validators, or 304 if the client's copy is current.
+    
+    The ETag comes from the version of the underlying data, so a matching
+    If-None-Match (or If-Modified-Since) is answered without building the payload.
+    
+    Args:
+        etag: Strong ETag for the current data version
+        build: Function returning the full response (anything Flask accepts from a view)
+        last_modified: Optional UTC datetime of the last data change
+        max_age: Seconds the client may reuse the response without revalidating; None to revalidate every time
+        
+    Returns:
+        Response: The full response, or an empty 304 response
+    """
+    if last_modified is not None:
+        # HTTP dates have one-second resolution
+        last_modified = last_modified.replace(microsecond=0)
+    
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    else:
+        fresh = bool(last_modified and request.if_modified_since and request.if_modified_since >= last_modified)
+    
+    response = Response(status=304) if fresh else make_response(build())
+    if response.status_code not in (200, 304):
+        return response
+    
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if max_age is None:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
+
+def content_etag(data):
+    """ETag of in-memory data: a hash of its JSON encoding."""
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def file_validators(path, prefix):
+    """
+    ETag and modification time of a data file, from its metadata alone.
+    
+    Returns:
+        tuple: (ETag, UTC datetime of the last change or None if the file is missing)
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return f"{prefix}-missing", None
+    return (f"{prefix}-{stat.st_mtime_ns}-{stat.st_size}",
+            datetime.fromtimestamp(stat.st_mtime, timezone.utc))
+
+@functools.lru_cache(maxsize=1)
+def eco_dictionary():
+    """
+    Load the ECO code descriptions once.
+    
+    Returns:
+        tuple: (JSON body, ETag of the body)
+    """
+    try:
+        from chessy.utils.ECO_codes_library import get_eco_descriptions
+        eco_data = get_eco_descriptions()
+        emoji_log(logger, logging.INFO, "Loaded ECO codes from library", "✅")
+    except ImportError:
+        emoji_log(logger, logging.WARNING, 
+                "ECO_codes_library module not found", "⚠️")
+        # Return a minimal set as fallback
+        eco_data = {
+            "A00": "Irregular Openings",
+            "B20": "Sicilian Defence",
+            "C00": "French Defense",
+            "D00": "Queen's Pawn Game",
+            "E00": "Queen's Pawn, Indian Defenses"
+        }
+    body = json.dumps(eco_data, sort_keys=True)
+    return body, hashlib.sha1(body.encode("utf-8")).hexdigest()
+
 ################################################################################
 # V. ROUTE HANDLERS
 ################################################################################
@@ -586,7 +720,9 @@ def index():
         has_data=has_data,
         stats=stats,
         date_range=date_range,
-        task_status=task_status
+        task_status=task_status,
+        analysis_profiles=list(config.ANALYSIS_PROFILES),
+        default_profile=config.ANALYSIS_PROFILE
     )
 
     """Download games from Chess.com."""
@@ -649,7 +785,7 @@ def analyze_games():
         return redirect(url_for("index"))
     
     # Verify we have games data to analyze
-    if not os.path.exists(PARSED_GAMES_FILE) or os.path.getsize(PARSED_GAMES_FILE) <= 5:  # Just contains [] or empty
+    if data_cache.is_empty():
         if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
             return jsonify({
                 "status": "error",
@@ -658,6 +794,21 @@ def analyze_games():
         flash("No game data available. Please download games first.", "error")
         return redirect(url_for("index"))
         
+    # Get the analysis profile from the request
+    options = request.get_json(silent=True) or request.form
+    profile = options.get('profile') or config.ANALYSIS_PROFILE
+    if profile not in config.ANALYSIS_PROFILES:
+        if request.is_json or request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+            return jsonify({
+                "status": "error",
+                "message": f"Unknown analysis profile: {profile}"
+            })
+        flash(f"Unknown analysis profile: {profile}", "error")
+        return redirect(url_for("index"))
+    
+    # Store the profile in background task data for use in the analysis thread
+    background_tasks['analyze']['profile'] = profile
+    
     # Start background analysis
     thread = threading.Thread(
         target=analyze_thread, 
@@ -685,26 +836,17 @@ def games():
         flash("Service not available. Check configuration and try again.", "error")
         return redirect(url_for("index"))
         
-    # Get game data if available
-    games_data = []
+    # The page loads the games themselves a page at a time from /api/games
+    has_games = False
     try:
-        if os.path.exists(PARSED_GAMES_FILE):
-            with open(PARSED_GAMES_FILE, "r") as f:
-                games_data = json.load(f)
-                
-            # Sort games by date (newest first)
-            games_data = sorted(
-                games_data, 
-                key=lambda x: x.get("date", "0000-00-00"), 
-                reverse=True
-            )
+        has_games = not data_cache.is_empty()
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error loading game data: {str(e)}", "❌")
         
     return render_template(
         "games.html",
         username=USERNAME,
-        games=games_data
+        has_games=has_games
     )
 
 @app.route("/openings")
@@ -714,7 +856,7 @@ def openings():
         flash("Service not available. Check configuration and try again.", "error")
         return redirect(url_for("index"))
         
-    eco_data = chessy_service.get_opening_performance() or []
+    eco_data = data_cache.load_file(ECO_CSV_FILE, chessy_service.get_opening_performance) or []
     
     # Load ECO descriptions
     eco_descriptions = {}
@@ -758,40 +900,35 @@ def blunders():
     # Get blunders data if available
     blunders_data = {}
     try:
-        if os.path.exists(GAME_ANALYSIS_FILE):
-            with open(GAME_ANALYSIS_FILE, "r") as f:
-                games_data = json.load(f)
-                
-            if games_data:
-                # Calculate average blunders per game
-                total_blunders = sum(game.get("blunders", 0) for game in games_data)
-                total_games = len(games_data)
-                avg_blunders = total_blunders / total_games if total_games > 0 else 0
-                
-                # Group blunders by time control
-                blunders_by_tc = {}
-                for game in games_data:
-                    tc = game.get("TimeControl", "Unknown")
-                    blunders = game.get("blunders", 0)
-                    
-                    if tc not in blunders_by_tc:
-                        blunders_by_tc[tc] = {"games": 0, "blunders": 0}
-                    
-                    blunders_by_tc[tc]["games"] += 1
-                    blunders_by_tc[tc]["blunders"] += blunders
-                
-                # Calculate averages
-                for tc in blunders_by_tc:
-                    blunders_by_tc[tc]["avg"] = (
-                        blunders_by_tc[tc]["blunders"] / blunders_by_tc[tc]["games"]
-                        if blunders_by_tc[tc]["games"] > 0 else 0
-                    )
-                
-                blunders_data = {
-                    "total_blunders": total_blunders,
-                    "avg_blunders": avg_blunders,
-                    "by_time_control": blunders_by_tc
+        aggregates = get_summary()
+        summary = aggregates["totals"]
+        
+        if summary["games"]:
+            # Calculate average blunders per game
+            total_blunders = summary["blunders"]
+            total_games = summary["games"]
+            avg_blunders = total_blunders / total_games if total_games > 0 else 0
+            
+            # Group blunders by time control
+            blunders_by_tc = {}
+            for group in aggregates["by_time_control"]:
+                blunders_by_tc[group["key"] or "Unknown"] = {
+                    "games": group["games"],
+                    "blunders": group["blunders"]
                 }
+            
+            # Calculate averages
+            for tc in blunders_by_tc:
+                blunders_by_tc[tc]["avg"] = (
+                    blunders_by_tc[tc]["blunders"] / blunders_by_tc[tc]["games"]
+                    if blunders_by_tc[tc]["games"] > 0 else 0
+                )
+            
+            blunders_data = {
+                "total_blunders": total_blunders,
+                "avg_blunders": avg_blunders,
+                "by_time_control": blunders_by_tc
+            }
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error loading blunders data: {str(e)}", "❌")
     
@@ -816,30 +953,17 @@ def inaccuracies():
     inaccuracy_games = []
     
     try:
-        if os.path.exists(GAME_ANALYSIS_FILE):
-            with open(GAME_ANALYSIS_FILE, "r") as f:
-                games_data = json.load(f)
-                
-            if games_data:
-                # Calculate totals
-                total_inaccuracies = sum(game.get("inaccuracies", 0) for game in games_data)
-                total_games = len(games_data)
-                avg_inaccuracies = round(total_inaccuracies / total_games, 2) if total_games > 0 else 0
-                
-                # Add inaccuracy count to game data for display
-                for game in games_data:
-                    inaccuracies = game.get("inaccuracies", 0)
-                    if inaccuracies > 0:
-                        game_copy = game.copy()
-                        game_copy["inaccuracies"] = inaccuracies
-                        inaccuracy_games.append(game_copy)
-                
-                # Sort games by number of inaccuracies (most first)
-                inaccuracy_games = sorted(
-                    inaccuracy_games,
-                    key=lambda x: x.get("inaccuracies", 0),
-                    reverse=True
-                )[:20]  # Show only top 20
+        aggregates = get_summary()
+        summary = aggregates["totals"]
+        
+        if summary["games"]:
+            # Calculate totals
+            total_inaccuracies = summary["inaccuracies"]
+            total_games = summary["games"]
+            avg_inaccuracies = round(total_inaccuracies / total_games, 2) if total_games > 0 else 0
+            
+            # Top 20 games with the most inaccuracies first
+            inaccuracy_games = aggregates["top_inaccuracies"]
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error loading inaccuracies data: {str(e)}", "❌")
     
@@ -864,119 +988,101 @@ def mistakes():
     top_mistake_games = []
     
     try:
-        if os.path.exists(GAME_ANALYSIS_FILE):
-            with open(GAME_ANALYSIS_FILE, "r") as f:
-                games_data = json.load(f)
-                
-            if games_data:
-                # Calculate total mistakes
-                total_blunders = sum(game.get("blunders", 0) for game in games_data)
-                total_inaccuracies = sum(game.get("inaccuracies", 0) for game in games_data)
-                total_mistakes = total_blunders + total_inaccuracies
-                total_games = len(games_data)
-                
-                # Calculate game phase statistics (approximation)
-                opening_mistakes = 0
-                middlegame_mistakes = 0
-                endgame_mistakes = 0
-                
-                for game in games_data:
-                    # Simple approximation - distribute mistakes by phase
-                    # In a real implementation, this would use actual phase data from the analysis
-                    moves = game.get("move_count", 0)
-                    blunders = game.get("blunders", 0)
-                    inaccuracies = game.get("inaccuracies", 0)
-                    total = blunders + inaccuracies
-                    
-                    if moves <= 0:
-                        continue
-                        
-                    # Estimate phase distribution
-                    if moves <= 10:
-                        # Mostly opening
-                        opening_mistakes += total
-                    elif moves <= 30:
-                        # Split between opening and middlegame
-                        opening_mistakes += total * 0.3
-                        middlegame_mistakes += total * 0.7
-                    else:
-                        # Distribute across all phases
-                        opening_mistakes += total * 0.2
-                        middlegame_mistakes += total * 0.5
-                        endgame_mistakes += total * 0.3
+        aggregates = get_summary()
+        summary = aggregates["totals"]
+        
+        if summary["games"]:
+            # Calculate total mistakes
+            total_blunders = summary["blunders"]
+            total_inaccuracies = summary["inaccuracies"]
+            total_mistakes = total_blunders + total_inaccuracies
+            total_games = summary["games"]
+            
+            # Calculate game phase statistics (approximation)
+            opening_mistakes = 0
+            middlegame_mistakes = 0
+            endgame_mistakes = 0
+            
+            for group in aggregates["by_move_count"]:
+                # Simple approximation - distribute mistakes by phase
+                # In a real implementation, this would use actual phase data from the analysis
+                moves = group["key"] or 0
+                total = group["blunders"] + group["inaccuracies"]
                 
-                # Calculate mistakes by time control
-                tc_stats = {}
-                for game in games_data:
-                    tc = game.get("TimeControl", "Unknown")
-                    
-                    # Parse time control into standard categories
-                    try:
-                        if "+" in tc:
-                            base_time = int(tc.split("+")[0])
-                        else:
-                            base_time = int(tc)
-                            
-                        if base_time < 180:
-                            tc_category = "Bullet"
-                        elif base_time < 600:
-                            tc_category = "Blitz"
-                        elif base_time < 1800:
-                            tc_category = "Rapid"
-                        else:
-                            tc_category = "Classical"
-                    except:
-                        tc_category = tc if tc else "Unknown"
-                    
-                    mistakes = game.get("blunders", 0) + game.get("inaccuracies", 0)
+                if moves <= 0:
+                    continue
                     
-                    if tc_category not in tc_stats:
-                        tc_stats[tc_category] = 0
-                    tc_stats[tc_category] += mistakes
-                
-                # Sort games by total mistakes and get top 10
-                for game in games_data:
-                    game["total_mistakes"] = game.get("blunders", 0) + game.get("inaccuracies", 0)
-                
-                top_mistake_games = sorted(
-                    games_data,
-                    key=lambda x: x.get("total_mistakes", 0),
-                    reverse=True
-                )[:10]
+                # Estimate phase distribution
+                if moves <= 10:
+                    # Mostly opening
+                    opening_mistakes += total
+                elif moves <= 30:
+                    # Split between opening and middlegame
+                    opening_mistakes += total * 0.3
+                    middlegame_mistakes += total * 0.7
+                else:
+                    # Distribute across all phases
+                    opening_mistakes += total * 0.2
+                    middlegame_mistakes += total * 0.5
+                    endgame_mistakes += total * 0.3
+            
+            # Calculate mistakes by time control
+            tc_stats = {}
+            for group in aggregates["by_time_control"]:
+                tc = group["key"] or "Unknown"
                 
-                # Create trend data by month
-                month_data = {}
-                for game in games_data:
-                    date_str = game.get("date", "")
-                    if date_str and date_str != "????-??-??":
-                        month = date_str[:7]  # YYYY-MM format
-                        mistakes = game.get("blunders", 0) + game.get("inaccuracies", 0)
-                        
-                        if month not in month_data:
-                            month_data[month] = {"games": 0, "mistakes": 0}
+                # Parse time control into standard categories
+                try:
+                    if "+" in tc:
+                        base_time = int(tc.split("+")[0])
+                    else:
+                        base_time = int(tc)
                         
-                        month_data[month]["games"] += 1
-                        month_data[month]["mistakes"] += mistakes
+                    if base_time < 180:
+                        tc_category = "Bullet"
+                    elif base_time < 600:
+                        tc_category = "Blitz"
+                    elif base_time < 1800:
+                        tc_category = "Rapid"
+                    else:
+                        tc_category = "Classical"
+                except:
+                    tc_category = tc if tc else "Unknown"
                 
-                # Calculate averages for trend data
-                trend_data = []
-                for month, data in sorted(month_data.items()):
-                    if data["games"] > 0:
-                        avg = data["mistakes"] / data["games"]
-                        trend_data.append((month, round(avg, 2)))
+                mistakes = group["blunders"] + group["inaccuracies"]
                 
-                analysis_data = {
-                    "blunders": total_blunders,
-                    "inaccuracies": total_inaccuracies,
-                    "total_mistakes": total_mistakes,
-                    "phase_stats": {
-                        "opening": int(opening_mistakes),
-                        "middlegame": int(middlegame_mistakes),
-                        "endgame": int(endgame_mistakes)
-                    },
-                    "time_control_stats": tc_stats,
-                    "trend_data": trend_data
-                }
+                if tc_category not in tc_stats:
+                    tc_stats[tc_category] = 0
+                tc_stats[tc_category] += mistakes
+            
+            # Top 10 games by total mistakes
+            top_mistake_games = [
+                {**game, "total_mistakes": game.get("blunders", 0) + game.get("inaccuracies", 0)}
+                for game in aggregates["top_mistakes"]
+            ]
+            
+            # Create trend data by month
+            trend_data = []
+            for group in aggregates["by_month"]:
+                month = group["key"]  # YYYY-MM format
+                if not month or month.startswith("?"):
+                    continue
+                if group["games"] > 0:
+                    avg = (group["blunders"] + group["inaccuracies"]) / group["games"]
+                    trend_data.append((month, round(avg, 2)))
+            
+            analysis_data = {
+                "blunders": total_blunders,
+                "inaccuracies": total_inaccuracies,
+                "total_mistakes": total_mistakes,
+                "phase_stats": {
+                    "opening": int(opening_mistakes),
+                    "middlegame": int(middlegame_mistakes),
+                    "endgame": int(endgame_mistakes)
+                },
+                "time_control_stats": tc_stats,
+                "trend_data": trend_data
+            }
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error loading mistakes data: {str(e)}", "❌")
     
@@ -1226,15 +1332,117 @@ def get_progress():
             "active": False
         })
 
+@app.route("/api/games")
+def list_games():
+    """
+    Return one page of the game list as JSON.
+    
+    Query parameters: offset, limit, sort (see GAME_LIST_SORTS), order (asc/desc),
+    start_date, end_date, eco, opponent, and the repeatable tc_category, result
+    (win/loss/draw) and played_as. Filtering, sorting and paging all run in the
+    store's indexed queries.
+    """
+    try:
+        offset = max(0, request.args.get("offset", 0, type=int))
+        limit = min(max(1, request.args.get("limit", 100, type=int)), MAX_GAME_PAGE_SIZE)
+        sort = request.args.get("sort", "date")
+        if sort not in GAME_LIST_SORTS:
+            return jsonify({"error": f"Unknown sort key: {sort}"}), 400
+        descending = request.args.get("order", "desc") != "asc"
+        
+        filters = {
+            "start_date": request.args.get("start_date"),
+            "end_date": request.args.get("end_date"),
+            "tc_category": request.args.getlist("tc_category"),
+            "outcome": request.args.getlist("result"),
+            "played_as": request.args.getlist("played_as"),
+            "eco": request.args.get("eco"),
+            "opponent": request.args.get("opponent")
+        }
+        
+        games_page = data_cache.query_games(
+            filters, sort=sort, descending=descending, limit=limit, offset=offset)
+        return jsonify({
+            "total": data_cache.count_games(filters),
+            "offset": offset,
+            "limit": limit,
+            "games": [{field: game.get(field) for field in GAME_LIST_FIELDS} for game in games_page]
+        })
+    except Exception as e:
+        emoji_log(logger, logging.ERROR, f"Error listing games: {str(e)}", "❌")
+        return jsonify({"error": str(e)}), 500
+
 @app.route("/api/game_data")
 def get_game_data():
-    """Return game data as JSON."""
+    """
+    Return analyzed games as JSON, streamed as they are read from the store.
+    
+    Query parameters: fields (comma-separated field names to return), start_date,
+    end_date, limit, order (asc/desc by date, asc by default), and format=ndjson
+    for one JSON object per line instead of a single array. The X-Total-Count header
+    holds the number of games in the response.
+    """
     try:
-        if not os.path.exists(GAME_ANALYSIS_FILE):
-            return jsonify([])
-            
-        with open(GAME_ANALYSIS_FILE, "r") as f:
-            return jsonify(json.load(f))
+        fields = [field.strip() for field in request.args.get("fields", "").split(",") if field.strip()]
+        limit = request.args.get("limit", type=int)
+        descending = request.args.get("order") == "desc"
+        ndjson = request.args.get("format") == "ndjson"
+        filters = {
+            "start_date": request.args.get("start_date"),
+            "end_date": request.args.get("end_date")
+        }
+        
+        # The URL tells responses for different parameters apart; the ETag only has to track the data
+        etag = f"games-{game_store.database_id():x}-{game_store.version()}"
+    except Exception as e:
+        emoji_log(logger, logging.ERROR, f"Error retrieving game data: {str(e)}", "❌")
+        return jsonify([])
+    
+    def project(game):
+        if fields:
+            return {field: game[field] for field in fields if field in game}
+        return {field: value for field, value in game.items() if field not in GAME_DATA_HIDDEN_FIELDS}
+    
+    def encode(batch, first):
+        if ndjson:
+            return "".join(line + "\n" for line in batch)
+        return ("" if first else ",") + ",".join(batch)
+    
+    def build():
+        games_iter = game_store.iter_games(
+            filters, sort="date", descending=descending,
+            limit=max(0, limit) if limit is not None else None, analyzed=True)
+        total = game_store.count_games(filters, analyzed=True)
+        if limit is not None:
+            total = min(total, max(0, limit))
+        mimetype = "application/x-ndjson" if ndjson else "application/json"
+        response = Response(generate(games_iter), mimetype=mimetype)
+        # Streamed responses have no Content-Length, so clients learn the size up front from this
+        response.headers["X-Total-Count"] = str(total)
+        return response
+    
+    def generate(games_iter):
+        # Encode in chunks so memory stays flat and the first games go out right away
+        if not ndjson:
+            yield "["
+        first = True
+        batch = []
+        try:
+            for game in games_iter:
+                batch.append(json.dumps(project(game)))
+                if len(batch) >= GAME_DATA_CHUNK_SIZE:
+                    yield encode(batch, first)
+                    first = False
+                    batch = []
+            if batch:
+                yield encode(batch, first)
+        except Exception as e:
+            emoji_log(logger, logging.ERROR, f"Error streaming game data: {str(e)}", "❌")
+        if not ndjson:
+            yield "]"
+    
+    try:
+        return conditional_response(etag, build)
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error retrieving game data: {str(e)}", "❌")
         return jsonify([])
@@ -1243,12 +1451,12 @@ def get_game_data():
 def get_eco_data():
     """Return ECO performance data as JSON."""
     try:
-        if not os.path.exists(ECO_CSV_FILE):
-            return jsonify([])
+        etag, last_modified = file_validators(ECO_CSV_FILE, "eco")
+        if last_modified is None:
+            return conditional_response(etag, lambda: jsonify([]))
             
-        with open(ECO_CSV_FILE, "r") as f:
-            reader = csv.DictReader(f)
-            return jsonify(list(reader))
+        return conditional_response(
+            etag, lambda: jsonify(data_cache.load_file(ECO_CSV_FILE, read_eco_csv)), last_modified)
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error retrieving ECO data: {str(e)}", "❌")
         return jsonify([])
@@ -1280,16 +1488,11 @@ def get_eco_description(eco_code):
 def win_rate_chart():
     """Generate win rate chart data."""
     try:
-        if not os.path.exists(GAME_ANALYSIS_FILE):
-            return jsonify([])
-            
-        with open(GAME_ANALYSIS_FILE, "r") as f:
-            data = json.load(f)
+        # Per-time-control outcome counts from the store
+        groups = get_summary()["by_time_control"]
             
-        if not data:
+        if not groups:
             return jsonify([])
-            
-        df = pd.DataFrame(data)
         
         # Handle different time control formats
         def parse_time_control(tc):
@@ -1317,41 +1520,31 @@ def win_rate_chart():
                 # If we couldn't parse it, use the original value
                 return tc if tc else "Unknown"
         
-        # Prepare time control groups
-        if 'TimeControl' in df.columns:
-            df['TimeControlGroup'] = df['TimeControl'].apply(parse_time_control)
+        # Calculate win rates by time control group
+        tc_stats = {}
+        for group in groups:
+            stats = tc_stats.setdefault(parse_time_control(group["key"]), {'games': 0, 'wins': 0, 'losses': 0, 'draws': 0})
+            for field in stats:
+                stats[field] += group[field]
+        
+        # Skip Unknown if it's just a few games
+        if "Unknown" in tc_stats and tc_stats["Unknown"]['games'] < 5:
+            del tc_stats["Unknown"]
+        
+        # Create chart data
+        chart_data = []
+        for tc, stats in tc_stats.items():
+            win_rate = stats['wins'] / stats['games'] * 100 if stats['games'] > 0 else 0
+            chart_data.append({
+                'timeControl': tc,
+                'winRate': round(win_rate, 1),
+                'games': stats['games']
+            })
             
-            # Calculate win rates by time control
-            tc_stats = {}
-            for group, group_df in df.groupby('TimeControlGroup'):
-                if group == "Unknown" and len(group_df) < 5:  # Skip Unknown if it's just a few games
-                    continue
-                    
-                tc_stats[group] = {
-                    'games': len(group_df),
-                    'wins': sum((group_df['PlayedAs'] == 'White') & (group_df['Result'] == '1-0') | 
-                                (group_df['PlayedAs'] == 'Black') & (group_df['Result'] == '0-1')),
-                    'losses': sum((group_df['PlayedAs'] == 'White') & (group_df['Result'] == '0-1') | 
-                                (group_df['PlayedAs'] == 'Black') & (group_df['Result'] == '1-0')),
-                    'draws': sum(group_df['Result'] == '1/2-1/2')
-                }
+        # Sort by number of games (descending)
+        chart_data = sorted(chart_data, key=lambda x: x['games'], reverse=True)
             
-            # Create chart data
-            chart_data = []
-            for tc, stats in tc_stats.items():
-                win_rate = stats['wins'] / stats['games'] * 100 if stats['games'] > 0 else 0
-                chart_data.append({
-                    'timeControl': tc,
-                    'winRate': round(win_rate, 1),
-                    'games': stats['games']
-                })
-                
-            # Sort by number of games (descending)
-            chart_data = sorted(chart_data, key=lambda x: x['games'], reverse=True)
-                
-            return jsonify(chart_data)
-        else:
-            return jsonify([])
+        return jsonify(chart_data)
             
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error generating win rate chart: {str(e)}", "❌")
@@ -1361,24 +1554,10 @@ def win_rate_chart():
 def get_all_eco_codes():
     """Return all ECO codes and descriptions as JSON."""
     try:
-        # Try to load from ECO codes module
-        try:
-            from chessy.utils.ECO_codes_library import get_eco_descriptions
-            eco_data = get_eco_descriptions()
-            emoji_log(logger, logging.INFO, "Loaded ECO codes from library", "✅")
-            return jsonify(eco_data)
-        except ImportError:
-            emoji_log(logger, logging.WARNING, 
-                    "ECO_codes_library module not found", "⚠️")
-            # Return a minimal set as fallback
-            eco_data = {
-                "A00": "Irregular Openings",
-                "B20": "Sicilian Defence",
-                "C00": "French Defense",
-                "D00": "Queen's Pawn Game",
-                "E00": "Queen's Pawn, Indian Defenses"
-            }
-            return jsonify(eco_data)
+        # Loaded once per process; browsers keep it for a week and then revalidate
+        body, etag = eco_dictionary()
+        return conditional_response(
+            etag, lambda: Response(body, mimetype="application/json"), max_age=ECO_DICTIONARY_MAX_AGE)
     except Exception as e:
         emoji_log(logger, logging.ERROR, f"Error retrieving ECO descriptions: {str(e)}", "❌")
         return jsonify({"error": str(e)}), 500
@@ -1387,29 +1566,20 @@ def get_all_eco_codes():
 def get_inaccuracies_data():
     """Return inaccuracies data for charts."""
     try:
-        if not os.path.exists(GAME_ANALYSIS_FILE):
+        aggregates = get_summary()
+        if not aggregates["totals"]["games"]:
             return jsonify({"error": "No analysis data available"})
             
-        with open(GAME_ANALYSIS_FILE, "r") as f:
-            games_data = json.load(f)
-            
-        if not games_data:
-            return jsonify({"error": "No games found"})
-            
         # Group by ECO code
         inaccuracies_by_opening = {}
-        for game in games_data:
-            eco = game.get("ECO", "Unknown")
-            if not eco:
-                eco = "Unknown"
-                
-            inaccuracies = game.get("inaccuracies", 0)
+        for group in aggregates["by_eco"]:
+            eco = group["key"] or "Unknown"
+            opening = inaccuracies_by_opening.setdefault(eco, {"count": 0, "games": 0})
+            opening["count"] += group["inaccuracies"]
+            opening["games"] += group["games"]
             
-            if eco not in inaccuracies_by_opening:
-                inaccuracies_by_opening[eco] = {"count": 0, "games": 0}
-                
-            inaccuracies_by_opening[eco]["count"] += inaccuracies
-            inaccuracies_by_opening[eco]["games"] += 1
+        if not inaccuracies_by_opening:
+            return jsonify({"error": "No games found"})
             
         # Format for chart
         opening_data = [{"opening": eco, "count": data["count"]} 
@@ -1454,29 +1624,21 @@ def export_games():
         format_type = request.json.get("format", "csv")
         
         # Load game data
-        if not os.path.exists(PARSED_GAMES_FILE):
+        if data_cache.is_empty():
             return jsonify({"error": "No game data available"}), 400
-            
-        with open(PARSED_GAMES_FILE, "r") as f:
-            games_data = json.load(f)
-        
-        # Apply filters
-        filtered_data = games_data
         
-        if filters.get("result"):
-            filtered_data = [g for g in filtered_data if g.get("Result") in filters["result"]]
-            
-        if filters.get("time_control"):
-            filtered_data = [g for g in filtered_data if g.get("TimeControl") in filters["time_control"]]
-            
-        if filters.get("played_as"):
-            filtered_data = [g for g in filtered_data if g.get("PlayedAs") == filters["played_as"]]
-            
-        if filters.get("min_moves") is not None:
-            filtered_data = [g for g in filtered_data if g.get("NumMoves", 0) >= filters["min_moves"]]
-            
-        if filters.get("max_moves") is not None:
-            filtered_data = [g for g in filtered_data if g.get("NumMoves", 0) <= filters["max_moves"]]
+        # Apply filters in the query
+        filtered_data = data_cache.query_games(
+            filters={
+                "result": filters.get("result"),
+                "time_control": filters.get("time_control"),
+                "played_as": filters.get("played_as"),
+                "min_moves": filters.get("min_moves"),
+                "max_moves": filters.get("max_moves")
+            },
+            sort="date",
+            descending=False
+        )
 
         if not filtered_data:
             return jsonify({"warning": "No games match the selected filters"}), 200
@@ -1590,7 +1752,12 @@ def toggle_theme():
 def get_notifications():
     """Endpoint for retrieving pending notifications."""
     notifications = get_pending_notifications()
-    return jsonify(notifications)
+    if notifications:
+        # Delivered once and then cleared, so never answered from a cached copy
+        response = jsonify(notifications)
+        response.cache_control.no_store = True
+        return response
+    return conditional_response(content_etag(notifications), lambda: jsonify(notifications))
 
 @app.route("/api/task_history/<task_type>")
 def task_history(task_type):
@@ -1612,7 +1779,7 @@ def task_history(task_type):
 
 @app.route("/api/cancel_task/<task_type>", methods=["POST"])
 def cancel_task(task_type):
-    """Cancel a running background task (preparation for interruptible analysis)."""
+    """Cancel a running background task. Analysis stops promptly and keeps its checkpointed results."""
     if task_type not in ['download', 'analyze']:
         return jsonify({"error": "Invalid task type"}), 400
         
@@ -1644,7 +1811,8 @@ def get_all_task_status():
             'last_message': task_data.get('messages', [])[-1] if task_data.get('messages') else None
         }
     
-    return jsonify(status)
+    # Task state lives in memory; its ETag is a hash of the state, so an unchanged state answers 304
+    return conditional_response(content_etag(status), lambda: jsonify(status))
 
 @app.errorhandler(404)
 def page_not_found(e):
@@ -1668,6 +1836,8 @@ def clear_history():
             ARCHIVE_FILE,
             PARSED_GAMES_FILE,
             GAME_ANALYSIS_FILE,
+            GAME_INDEX_FILE,
+            PARSE_STATE_FILE,
             ECO_CSV_FILE,
             LAST_DOWNLOADED_FILE
         ]
@@ -1682,12 +1852,28 @@ def clear_history():
                 except Exception as e:
                     logger.error(f"Error deleting {file_path}: {str(e)}")
         
+        # Empty the game store in place; request threads keep connections open to it
+        try:
+            game_store.clear()
+            cleared_files.append(os.path.basename(GAME_DB_FILE))
+            game_summary.clear()
+        except Exception as e:
+            logger.error(f"Error clearing game store: {str(e)}")
+        
+        # Drop cached archives and archived game IDs too, so the next download fetches every game again
+        try:
+            archive_cache.clear()
+            cleared_files.append(os.path.basename(ARCHIVE_CACHE_DIR))
+            game_ids.clear()
+            cleared_files.append(os.path.basename(GAME_IDS_FILE))
+        except Exception as e:
+            logger.error(f"Error clearing download state: {str(e)}")
+        
         # Create empty files to prevent errors
         for file_path in [PARSED_GAMES_FILE, GAME_ANALYSIS_FILE]:
             try:
                 os.makedirs(os.path.dirname(file_path), exist_ok=True)
-                with open(file_path, "w") as f:
-                    f.write(json.dumps([]))
+                open(file_path, "w").close()
                 logger.info(f"Created empty file: {file_path}")
             except Exception as e:
                 logger.error(f"Error creating empty file {file_path}: {str(e)}")
@@ -1739,28 +1925,19 @@ def export_raw_games():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{USERNAME}_raw_games_{timestamp}"
         
-        # Read PGN file
-        with open(ARCHIVE_FILE, "r") as f:
-            pgn_content = f.read()
-        
         if format_type == "csv":
             # Parse PGN into CSV
             export_path = os.path.join(export_dir, f"{filename}.csv")
             
-            # Use chess.pgn to parse games
+            # Parse games one at a time from the mapped archive; only headers are kept
             games = []
-            pgn_io = io.StringIO(pgn_content)
-            
-            while True:
-                game = chess.pgn.read_game(pgn_io)
-                if game is None:
-                    break
-                
-                # Extract headers and add to games list
-                headers = dict(game.headers)
-                # Add move count
-                headers['MoveCount'] = len(list(game.mainline_moves()))
-                games.append(headers)
+            with PGNReader(ARCHIVE_FILE) as reader:
+                for game in reader.iter_games():
+                    # Extract headers and add to games list
+                    headers = dict(game.headers)
+                    # Add move count
+                    headers['MoveCount'] = len(list(game.mainline_moves()))
+                    games.append(headers)
             
             # Convert to DataFrame and save as CSV
             if games:
@@ -1783,38 +1960,33 @@ def export_raw_games():
             # Parse PGN into JSON
             export_path = os.path.join(export_dir, f"{filename}.json")
             
-            games = []
-            pgn_io = io.StringIO(pgn_content)
-            
-            while True:
-                game = chess.pgn.read_game(pgn_io)
-                if game is None:
-                    break
-                
-                # Extract headers
-                game_data = dict(game.headers)
-                
-                # Add moves
-                moves = []
-                node = game
-                while node.variations:
-                    next_node = node.variation(0)
-                    moves.append(str(next_node.move))
-                    node = next_node
-                
-                game_data['moves'] = moves
-                game_data['moveCount'] = len(moves)
-                
-                games.append(game_data)
+            # Stream games straight into the JSON array instead of collecting them first
+            game_count = 0
+            with PGNReader(ARCHIVE_FILE) as reader, open(export_path, "w") as f:
+                f.write("[")
+                for game in reader.iter_games():
+                    # Extract headers
+                    game_data = dict(game.headers)
+                    
+                    # Add moves
+                    moves = []
+                    node = game
+                    while node.variations:
+                        next_node = node.variation(0)
+                        moves.append(str(next_node.move))
+                        node = next_node
+                    
+                    game_data['moves'] = moves
+                    game_data['moveCount'] = len(moves)
+                    
+                    f.write(("," if game_count else "") + "\n" + json.dumps(game_data, indent=2))
+                    game_count += 1
+                f.write("\n]\n")
             
-            # Save as JSON
-            if games:
-                with open(export_path, "w") as f:
-                    json.dump(games, f, indent=2)
-                
+            if game_count:
                 return jsonify({
                     "status": "success",
-                    "message": f"Exported {len(games)} games as JSON",
+                    "message": f"Exported {game_count} games as JSON",
                     "filename": f"{filename}.json",
                     "download_url": f"/download/export/{filename}.json"
                 })
@@ -1829,36 +2001,31 @@ def export_raw_games():
             export_path = os.path.join(export_dir, f"{filename}.xlsx")
             
             games = []
-            pgn_io = io.StringIO(pgn_content)
-            
-            while True:
-                game = chess.pgn.read_game(pgn_io)
-                if game is None:
-                    break
-                
-                # Extract headers and add to games list
-                headers = dict(game.headers)
-                # Add move count
-                headers['MoveCount'] = len(list(game.mainline_moves()))
-                # Format time controls
-                if 'TimeControl' in headers:
-                    try:
-                        seconds = headers['TimeControl']
-                        if '+' in seconds:
-                            base, increment = seconds.split('+')
-                            base_min = int(base) // 60
-                            base_sec = int(base) % 60
-                            inc_sec = int(increment)
-                            headers['TimeControlFormatted'] = f"{base_min}m {base_sec}s +{inc_sec}s"
-                        else:
-                            seconds_int = int(seconds)
-                            minutes = seconds_int // 60
-                            seconds_remainder = seconds_int % 60
-                            headers['TimeControlFormatted'] = f"{minutes}m {seconds_remainder}s"
-                    except:
-                        headers['TimeControlFormatted'] = headers['TimeControl']
-                
-                games.append(headers)
+            with PGNReader(ARCHIVE_FILE) as reader:
+                for game in reader.iter_games():
+                    # Extract headers and add to games list
+                    headers = dict(game.headers)
+                    # Add move count
+                    headers['MoveCount'] = len(list(game.mainline_moves()))
+                    # Format time controls
+                    if 'TimeControl' in headers:
+                        try:
+                            seconds = headers['TimeControl']
+                            if '+' in seconds:
+                                base, increment = seconds.split('+')
+                                base_min = int(base) // 60
+                                base_sec = int(base) % 60
+                                inc_sec = int(increment)
+                                headers['TimeControlFormatted'] = f"{base_min}m {base_sec}s +{inc_sec}s"
+                            else:
+                                seconds_int = int(seconds)
+                                minutes = seconds_int // 60
+                                seconds_remainder = seconds_int % 60
+                                headers['TimeControlFormatted'] = f"{minutes}m {seconds_remainder}s"
+                        except:
+                            headers['TimeControlFormatted'] = headers['TimeControl']
+                    
+                    games.append(headers)
             
             # Convert to DataFrame and save as Excel
             if games:
@@ -1889,8 +2056,7 @@ def export_raw_games():
         else:
             # Save PGN file directly for other formats
             export_path = os.path.join(export_dir, f"{filename}.pgn")
-            with open(export_path, "w") as f:
-                f.write(pgn_content)
+            shutil.copyfile(ARCHIVE_FILE, export_path)
             
             return jsonify({
                 "status": "success",
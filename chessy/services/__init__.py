@@ -3,6 +3,7 @@ Core service module for managing Chess.com game processing pipeline.
 """
 import logging
 import os
+from .parser import game_identifier
 from ..utils.logging import emoji_log
 
 class ChessyService:
@@ -53,17 +54,17 @@ class ChessyService:
         new_pgn_file = self.downloader.fetch_and_save_games(filters=filters)
         
         if new_pgn_file and os.path.exists(new_pgn_file):
-            # Count number of games in the file (approximate by counting [Event tags)
-            with open(new_pgn_file, 'r') as f:
-                content = f.read()
-                game_count = content.count('[Event "')
-            return game_count
+            # Games were counted while the download was written to disk
+            return self.downloader.last_download_count
         return 0
     
-    def process_new_games(self):
+    def process_new_games(self, profile=None):
         """
         Process games through the full pipeline.
         
+        Args:
+            profile (str, optional): Analysis profile name (fast, standard, deep)
+            
         Returns:
             dict: Processing results with metrics
         """
@@ -72,7 +73,9 @@ class ChessyService:
             "new_games": 0,
             "parsed_games": 0,
             "analyzed_games": 0,
-            "openings_analyzed": 0
+            "skipped_games": 0,
+            "openings_analyzed": 0,
+            "cancelled": False
         }
         
         # For analysis, use the full archive file, not just new games
@@ -87,16 +90,38 @@ class ChessyService:
         games_data = self.parser.parse_games(main_archive)
         results["parsed_games"] = len(games_data)
         
-        # Step 2: Analyze games
+        # Step 2: Analyze games, reusing results already computed with the current engine settings
         if games_data:
-            emoji_log(self.logger, logging.INFO, f"Analyzing {len(games_data)} games...", "🧠")
-            analysis_results = self.analyzer.analyze_games(games_data)
-            results["analyzed_games"] = len(analysis_results) if analysis_results else 0
+            # A requested profile applies to this run only; the analyzer is shared
+            previous_profile = self.analyzer.profile
+            if profile:
+                self.analyzer.set_profile(profile)
             
-            # Step 3: Generate ECO statistics
-            emoji_log(self.logger, logging.INFO, "Generating opening statistics...", "📈")
-            eco_stats = self.analyzer.generate_eco_statistics(games_data)
-            results["openings_analyzed"] = len(eco_stats) if eco_stats else 0
+            try:
+                saved_results = self.analyzer.migrate_identifiers(
+                    self.analyzer.load_analysis_results(), games_data)
+                known_results = {
+                    game_identifier(result): result
+                    for result in saved_results
+                    if self.analyzer.is_up_to_date(result)
+                }
+                results["skipped_games"] = sum(1 for game in games_data if game_identifier(game) in known_results)
+                
+                emoji_log(self.logger, logging.INFO, 
+                         f"Analyzing {len(games_data) - results['skipped_games']} new games...", "🧠")
+                self.analyzer.analyze_games(games_data, known_results=known_results)
+                results["analyzed_games"] = self.analyzer.last_analysis_count
+                results["cancelled"] = self.analyzer.cancelled
+                
+                # Step 3: Generate ECO statistics
+                emoji_log(self.logger, logging.INFO, "Generating opening statistics...", "📈")
+                eco_stats = self.analyzer.generate_eco_statistics(games_data)
+                results["openings_analyzed"] = len(eco_stats) if eco_stats else 0
+            finally:
+                self.analyzer.set_profile(previous_profile)
+        
+        # Step 4: Precompute the aggregates the dashboard pages read
+        self.analyzer.refresh_summary()
         
         emoji_log(self.logger, logging.INFO, "Game processing completed successfully", "✅")
         return results
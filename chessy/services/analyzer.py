@@ -5,38 +5,95 @@ import os
 import json
 import csv
 import logging
+import math
+import threading
 import chess
 import chess.pgn
 import chess.engine
-import io
 from collections import defaultdict, Counter
+from .engine_pool import EnginePool, PoolCancelled
+from .eval_cache import EvaluationCache
+from .game_store import GameStore
+from .summary import GameSummary
+from .parser import game_identifier, headers_identifier
+from .records import AnalysisRecord
 from ..utils.logging import emoji_log
+from ..utils.journal import RecordJournal
+from ..utils.pgn import PGNReader
 
 class GameAnalyzer:
     """
     Analyzes chess games using Stockfish and generates statistics.
     """
     
-    def __init__(self, config):
+    # Move classification method recorded with each result, together with its thresholds.
+    # Results classified another way (by centipawn loss, or counting the opponent's
+    # moves too) are analyzed again.
+    CLASSIFICATION = "player_win_probability_loss"
+    
+    def __init__(self, config, game_store=None, summary=None):
         """
         Initialize with configuration.
         
         Args:
             config: Application configuration including Stockfish path
+            game_store: GameStore that analysis results are written to for querying
+            summary: GameSummary kept up to date with the analysis results
         """
         self.config = config
         self.stockfish_path = config.STOCKFISH_PATH
         self.analysis_file = config.GAME_ANALYSIS_FILE
+        self.game_index_file = config.GAME_INDEX_FILE
         self.eco_csv_file = config.ECO_CSV_FILE
         self.username = config.USERNAME
+        self.eval_cache_file = config.EVAL_CACHE_FILE
+        self.eval_cache_max_entries = config.EVAL_CACHE_MAX_ENTRIES
+        self.blunder_threshold = config.BLUNDER_THRESHOLD
+        self.inaccuracy_threshold = config.INACCURACY_THRESHOLD
+        self.classification = (f"{self.CLASSIFICATION};blunder={self.blunder_threshold};"
+                               f"inaccuracy={self.inaccuracy_threshold}")
         self.logger = logging.getLogger(__name__)
         
+        # Adaptive mode: cheap scan of every ply, full budget only near the thresholds
+        self.adaptive_analysis = config.ADAPTIVE_ANALYSIS
+        self.escalation_margin = config.ESCALATION_MARGIN
+        
+        # Engine limits, UCI options and pool size come from the selected analysis profile
+        self.analysis_profiles = config.ANALYSIS_PROFILES
+        self.set_profile(config.ANALYSIS_PROFILE)
+        
         # Progress tracking
         self.progress_callback = None
         
+        # Byte-offset index of games, mapped PGN files and evaluation cache, opened per analysis run
+        self.game_index = {}
+        self.pgn_readers = {}
+        self._readers_lock = threading.Lock()
+        self.eval_cache = None
+        
+        # Cancellation state of the current run
+        self.cancel_event = None
+        self.cancelled = False
+        self.last_analysis_count = 0
+        self.checkpoint_interval = config.ANALYSIS_CHECKPOINT_INTERVAL
+        
         # Ensure analysis directory exists
         os.makedirs(os.path.dirname(self.analysis_file), exist_ok=True)
         
+        # Results are appended one per line; an old JSON array file is migrated on first use
+        self.analysis_journal = RecordJournal(
+            self.analysis_file, game_identifier,
+            legacy_path=os.path.splitext(self.analysis_file)[0] + ".json",
+            record_type=AnalysisRecord)
+        
+        # Indexed copy of the journal that pages query
+        self.game_store = game_store or GameStore(config.GAME_DB_FILE, game_identifier)
+        if self.game_store.is_empty(analysis=True) and self.analysis_journal.exists():
+            self.game_store.upsert_analysis(self.analysis_journal.iter_records())
+        
+        # Precomputed aggregates that pages read instead of scanning the store
+        self.summary = summary or GameSummary(config.SUMMARY_FILE, self.game_store)
+        
     def set_progress_callback(self, callback):
         """
         Set a callback function for progress tracking.
@@ -46,213 +103,661 @@ class GameAnalyzer:
         """
         self.progress_callback = callback
         
-    def analyze_games(self, games_data):
+    def set_profile(self, profile_name):
+        """
+        Select the analysis profile used for subsequent runs.
+        
+        Args:
+            profile_name: Name of a profile in config.ANALYSIS_PROFILES
+            
+        Raises:
+            ValueError: If the profile doesn't exist
+        """
+        if profile_name not in self.analysis_profiles:
+            raise ValueError(f"Unknown analysis profile: {profile_name}")
+        
+        profile = self.analysis_profiles[profile_name]
+        self.profile = profile_name
+        
+        # Engine search limits and the matching cache keys for stored evaluations
+        self.analysis_limit = chess.engine.Limit(**profile["limit"])
+        self.analysis_settings = self._limit_key(profile["limit"])
+        self.scan_limit = chess.engine.Limit(**profile["scan_limit"])
+        self.scan_settings = self._limit_key(profile["scan_limit"])
+        
+        # Only reproducible evaluations are cached; others would differ from what a rerun computes
+        self.analysis_cache_key = self._cache_key(profile["limit"], profile["threads"])
+        self.scan_cache_key = self._cache_key(profile["scan_limit"], profile["threads"])
+        
+        self.engine_pool_size = profile["pool_size"]
+        self.engine_options = {"Threads": profile["threads"], "Hash": profile["hash"]}
+        
+        # Settings recorded with each result, used to decide whether it can be reused
+        self.engine_settings = self.analysis_settings
+        if self.adaptive_analysis:
+            self.engine_settings += f";scan={self.scan_settings};margin=+-{self.escalation_margin}"
+    
+    def _limit_key(self, limit):
+        """
+        Build a stable string key for an engine limit.
+        
+        Args:
+            limit: Dictionary of chess.engine.Limit arguments
+            
+        Returns:
+            str: Key such as "depth=18;time=0.1"
+        """
+        return ";".join(f"{name}={value}" for name, value in sorted(limit.items()))
+    
+    def _cache_key(self, limit, threads):
+        """
+        Get the evaluation cache key for an engine limit, if its results are reproducible.
+        
+        A search gives the same result every time only when it is bounded by depth or
+        nodes and runs on a single thread. Time limits depend on machine load, and
+        several threads share the hash table in a nondeterministic order. A depth limit
+        with a time cap is keyed by its depth alone: a search that reaches the depth
+        gives the same result as one without the cap, and _evaluate only caches those.
+        
+        Args:
+            limit: Dictionary of chess.engine.Limit arguments
+            threads: UCI Threads option of the engines
+            
+        Returns:
+            str or None: Key for the evaluation cache, or None to bypass the cache
+        """
+        if threads != 1:
+            return None
+        if "time" in limit:
+            return self._limit_key({"depth": limit["depth"]}) if "depth" in limit else None
+        return self._limit_key(limit)
+    
+    def analyze_games(self, games_data, known_results=None):
         """
         Analyze a list of parsed games using Stockfish.
         
+        New results are appended to the analysis journal every ANALYSIS_CHECKPOINT_INTERVAL
+        games, and the run stops early if the progress callback returns False. Games
+        that were not reached get basic results in the returned list but are not saved,
+        so the next run picks them up again. last_analysis_count holds the number of
+        games this run analyzed.
+        
+        Args:
+            games_data: List of GameRecords
+            known_results: Optional dict of game identifier -> earlier AnalysisRecord to reuse
+                instead of running the engine again
+            
+        Returns:
+            list: AnalysisRecords in the same order as games_data
+        """
+        known_results = known_results or {}
+        pending_games = [game for game in games_data if game_identifier(game) not in known_results]
+        self.cancelled = False
+        
+        skipped = len(games_data) - len(pending_games)
+        if skipped:
+            emoji_log(self.logger, logging.INFO, 
+                     f"Skipping {skipped} games already analyzed with current engine settings", "⏭️")
+        
+        new_results = {}
+        unsaved_results = []
+        
+        def on_result(analysis_result):
+            new_results[game_identifier(analysis_result)] = analysis_result
+            unsaved_results.append(analysis_result)
+            if len(unsaved_results) >= self.checkpoint_interval:
+                self._save_analysis_results(unsaved_results)
+                unsaved_results.clear()
+        
+        self._run_analysis(pending_games, on_result)
+        
+        self.last_analysis_count = len(new_results)
+        if self.cancelled:
+            emoji_log(self.logger, logging.WARNING, 
+                     f"Analysis cancelled after {len(new_results)} of {len(pending_games)} games", "🛑")
+        
+        analysis_results = self._merge_results(games_data, known_results, new_results)
+        
+        # Games with no stored result at all get their basic result recorded, unless the
+        # run was cancelled before reaching them: the next run saves their real result
+        if not self.cancelled:
+            saved_games = self.analysis_journal.keys()
+            unsaved_results.extend(
+                result for result in analysis_results
+                if game_identifier(result) not in new_results and game_identifier(result) not in saved_games)
+        
+        # Save analysis
+        self._save_analysis_results(unsaved_results)
+        self.analysis_journal.compact()
+        return analysis_results
+    
+    def _merge_results(self, games_data, known_results, new_results):
+        """
+        Combine reused and new results in archive order.
+        
+        Args:
+            games_data: List of GameRecords
+            known_results: Dict of game identifier -> reused result
+            new_results: Dict of game identifier -> result from this run
+            
+        Returns:
+            list: One result per game, basic results for games not analyzed yet
+        """
+        merged = []
+        for game in games_data:
+            key = game_identifier(game)
+            merged.append(known_results.get(key) or new_results.get(key) or self._basic_result(game))
+        return merged
+    
+    def load_analysis_results(self):
+        """
+        Load previously saved analysis results.
+        
+        Returns:
+            list: AnalysisRecords (empty if none saved)
+        """
+        try:
+            return self.analysis_journal.load()
+        except Exception as e:
+            self.logger.error(f"Error reading analysis results: {str(e)}")
+            return []
+    
+    def migrate_identifiers(self, results, games_data):
+        """
+        Re-key analysis results saved before games were identified by their Link.
+        
+        Such results have no link and are keyed by Site, which Chess.com sets to the
+        same value for every game, plus date and players. Each one takes the link of
+        the parsed game with that old key, unless several games share it. The journal
+        and the store are rewritten only if anything changed.
+        
+        Args:
+            results: AnalysisRecords as loaded from the journal
+            games_data: List of GameRecords
+            
+        Returns:
+            list: The results, re-keyed, one per game identifier
+        """
+        links = {}
+        for game in games_data:
+            if not game.get("link"):
+                continue
+            legacy_key = game_identifier({name: game.get(name, "") for name in ("site", "date", "white", "black")})
+            # Games sharing an old key can't be told apart
+            links[legacy_key] = None if legacy_key in links else game.get("link")
+        
+        migrated = 0
+        for result in results:
+            link = None if result.get("link") else links.get(game_identifier(result))
+            if link:
+                result.game.link = link
+                migrated += 1
+        if not migrated:
+            return results
+        
+        # A newer result under the new key supersedes the re-keyed one
+        latest = {}
+        for result in results:
+            key = game_identifier(result)
+            latest.pop(key, None)
+            latest[key] = result
+        results = list(latest.values())
+        
+        self.analysis_journal.write_all(results)
+        self.game_store.replace_analysis(results)
+        emoji_log(self.logger, logging.INFO, 
+                 f"Re-keyed {migrated} analysis results saved before games were identified by link", "📦")
+        return results
+    
+    def _run_analysis(self, games_data, on_result):
+        """
+        Run the engine over a list of games.
+        
+        Sets self.cancelled if the progress callback asked to stop.
+        
         Args:
-            games_data: List of game data dictionaries
+            games_data: List of GameRecords
+            on_result: Function called with each analysis result as it completes
             
         Returns:
-            list: Analysis results
+            list: Analysis results for the games that completed, in input order
         """
         analysis_results = []
         total_games = len(games_data)
         
+        if not games_data:
+            return analysis_results
+        
         # Check if Stockfish is available
         if not self.stockfish_path or not os.path.exists(self.stockfish_path):
             emoji_log(self.logger, logging.WARNING, 
                      "Stockfish not available. Skipping detailed move analysis.", "⚠️")
             # Even without Stockfish, we still want to save basic game data
             for i, game_info in enumerate(games_data):
-                analysis_result = {
-                    **game_info,
-                    "blunders": 0,
-                    "inaccuracies": 0,
-                    "move_count": game_info.get("NumMoves", 0)
-                }
-                analysis_results.append(analysis_result)
+                analysis_results.append(self._basic_result(game_info))
                 
                 # Update progress
                 if self.progress_callback and total_games > 0:
-                    self.progress_callback(i + 1, total_games)
+                    if self.progress_callback(i + 1, total_games) is False:
+                        self.cancelled = True
+                        break
             
-            # Save basic analysis
-            self._save_analysis_results(analysis_results)
             return analysis_results
         
         try:
+            self.game_index = self._load_game_index()
+            
             # Track error statistics
             error_counts = Counter({"Opening": 0, "Middlegame": 0, "Endgame": 0})
             time_trouble_blunders = 0
             
-            with chess.engine.SimpleEngine.popen_uci(self.stockfish_path) as engine:
-                for i, game_info in enumerate(games_data):
-                    # Update progress
-                    if self.progress_callback and total_games > 0:
-                        self.progress_callback(i + 1, total_games)
-                    
-                    # Get PGN text from source file
-                    pgn_file = game_info.get("source_file")
-                    if not pgn_file or not os.path.exists(pgn_file):
-                        # If we can't find the source file, still save basic info
-                        analysis_result = {
-                            **game_info,
-                            "blunders": 0,
-                            "inaccuracies": 0,
-                            "move_count": game_info.get("NumMoves", 0)
-                        }
-                        analysis_results.append(analysis_result)
-                        continue
-                    
-                    try:
-                        # Find this specific game in the file
-                        with open(pgn_file, "r") as f:
-                            pgn_text = f.read()
-                        
-                        pgn_io = io.StringIO(pgn_text)
-                        game_found = False
-                        
-                        while True:
-                            game = chess.pgn.read_game(pgn_io)
-                            if game is None:
-                                break
-                                
-                            # Check if this is the right game by matching headers
-                            headers = game.headers
-                            if headers.get("Site") == game_info.get("site") and \
-                               headers.get("Date") == game_info.get("date") and \
-                               headers.get("White") == game_info.get("white") and \
-                               headers.get("Black") == game_info.get("black"):
-                                
-                                game_found = True
-                                # This is our game - analyze it
-                                board = game.board()
-                                move_count = 0
-                                blunders = 0
-                                inaccuracies = 0
-                                
-                                for move in game.mainline_moves():
-                                    move_count += 1
-                                    board.push(move)
-                                    
-                                    # Classify phase
-                                    phase = (
-                                        "Opening" if move_count <= 10 else
-                                        "Middlegame" if move_count <= 30 else
-                                        "Endgame"
-                                    )
-                                    
-                                    try:
-                                        # Stockfish analysis with timeout protection
-                                        info = engine.analyse(board, chess.engine.Limit(depth=18, time=0.1))
-                                        score = info.get("score")
-                                        
-                                        # Safe score extraction with better error handling
-                                        score_change = 0
-                                        if score and hasattr(score, "relative"):
-                                            relative = score.relative
-                                            if relative is not None and hasattr(relative, "score"):
-                                                try:
-                                                    rel_score = relative.score()
-                                                    if rel_score is not None:
-                                                        score_change = abs(rel_score)
-                                                except (TypeError, ValueError):
-                                                    # If score() method fails, just continue with score_change=0
-                                                    pass
-                                        
-                                        if score_change >= 300:
-                                            blunders += 1
-                                            error_counts[phase] += 1
-                                        elif score_change >= 100:
-                                            inaccuracies += 1
-                                            
-                                        # Track time-trouble blunders (last 5 moves)
-                                        remaining_moves = max(0, len(list(game.mainline_moves())) - move_count)
-                                        if remaining_moves <= 5 and score_change >= 300:
-                                            time_trouble_blunders += 1
-                                    
-                                    except Exception as e:
-                                        # Log the error but continue analyzing the game
-                                        self.logger.warning(f"Error analyzing move {move_count}: {str(e)}")
-                                        continue
-                                
-                                # Add analysis results to game info
-                                analysis_result = {
-                                    **game_info,
-                                    "blunders": blunders,
-                                    "inaccuracies": inaccuracies,
-                                    "move_count": move_count
-                                }
-                                analysis_results.append(analysis_result)
-                                break  # Found and analyzed the game, move to next
-                        
-                        if not game_found:
-                            # If we can't find the game in the PGN, still save basic info
-                            analysis_result = {
-                                **game_info,
-                                "blunders": 0,
-                                "inaccuracies": 0,
-                                "move_count": game_info.get("NumMoves", 0)
-                            }
-                            analysis_results.append(analysis_result)
-                    
-                    except Exception as e:
-                        # Log the error but continue with the next game
-                        self.logger.error(f"Error processing game {game_info.get('site')}: {str(e)}")
-                        # Still add this game to results with basic info
-                        analysis_result = {
-                            **game_info,
-                            "blunders": 0,
-                            "inaccuracies": 0,
-                            "move_count": game_info.get("NumMoves", 0)
-                        }
-                        analysis_results.append(analysis_result)
-            
-            # Save analysis
-            self._save_analysis_results(analysis_results)
+            with EvaluationCache(self.eval_cache_file, self.eval_cache_max_entries) as eval_cache, \
+                 EnginePool(self.stockfish_path, size=self.engine_pool_size, options=self.engine_options) as pool:
+                self.eval_cache = eval_cache
+                self.cancel_event = pool.cancelled
+                emoji_log(self.logger, logging.INFO, 
+                         f"Analyzing {total_games} games on {pool.size} engine processes "
+                         f"({self.profile} profile)", "🧠")
+                game_results = pool.map(
+                    self._analyze_game,
+                    games_data,
+                    callback=self.progress_callback,
+                    fallback=lambda game_info, error: (self._basic_result(game_info), Counter()),
+                    on_result=lambda game_info, game_result: on_result(game_result[0])
+                )
+                self.cancelled = pool.cancelled.is_set()
+                
+                if pool.restarts:
+                    emoji_log(self.logger, logging.WARNING, 
+                             f"Restarted crashed engines {pool.restarts} times", "♻️")
+                eval_cache.log_stats()
+            self.eval_cache = None
+            self.cancel_event = None
+            self._close_pgn_readers()
+            
+            # Merge per-game results in original order
+            escalated_plies = 0
+            scanned_plies = 0
+            for game_result in game_results:
+                if game_result is None:
+                    # Skipped because the run was cancelled
+                    continue
+                analysis_result, game_stats = game_result
+                analysis_results.append(analysis_result)
+                time_trouble_blunders += game_stats.pop("time_trouble", 0)
+                escalated_plies += game_stats.pop("escalated", 0)
+                scanned_plies += game_stats.pop("plies", 0)
+                error_counts.update(game_stats)
             
             # Log summary
             emoji_log(self.logger, logging.INFO, f"Analyzed {len(analysis_results)} games", "✅")
             emoji_log(self.logger, logging.INFO, f"Blunders by phase: {dict(error_counts)}", "📊")
             emoji_log(self.logger, logging.INFO, f"Time-trouble blunders: {time_trouble_blunders}", "⏱️")
+            if self.adaptive_analysis:
+                emoji_log(self.logger, logging.INFO, 
+                         f"Escalated {escalated_plies} of {scanned_plies} plies to full depth", "🔬")
             
             return analysis_results
             
         except Exception as e:
             emoji_log(self.logger, logging.ERROR, f"Analysis error: {str(e)}", "❌")
             self.logger.exception("Detailed exception:")
+            self.eval_cache = None
+            self.cancel_event = None
+            self._close_pgn_readers()
             
             # Even if analysis fails, still save basic game data
+            analysis_results = []
             for i, game_info in enumerate(games_data):
-                analysis_result = {
-                    **game_info,
-                    "blunders": 0,
-                    "inaccuracies": 0,
-                    "move_count": game_info.get("NumMoves", 0)
-                }
-                analysis_results.append(analysis_result)
+                analysis_results.append(self._basic_result(game_info))
                 
                 # Update progress
                 if self.progress_callback and total_games > 0:
                     self.progress_callback(i + 1, total_games)
             
-            # Save basic analysis
-            self._save_analysis_results(analysis_results)
             return analysis_results
     
+    def _analyze_game(self, engine, game_info):
+        """
+        Analyze a single game on the given engine.
+        
+        Runs on an engine pool worker thread. Engine crashes are re-raised so the
+        pool can restart the engine and retry the game.
+        
+        Args:
+            engine: chess.engine.SimpleEngine instance
+            game_info: GameRecord of the game
+            
+        Returns:
+            tuple: (AnalysisRecord, Counter of blunders by phase plus "time_trouble")
+        """
+        game_stats = Counter()
+        
+        # Look up where the game lives in its source file
+        location = self.game_index.get(game_identifier(game_info))
+        if not location or not os.path.exists(location["source_file"]):
+            # If we can't find the source file, still save basic info
+            return self._basic_result(game_info), game_stats
+        
+        try:
+            # Slice this game out of the mapped file and parse only it
+            game = self._pgn_reader(location["source_file"]).read_game(location["offset"], location["length"])
+            
+            if game is not None:
+                # Guard against a stale index, e.g. after the archive was compacted
+                if headers_identifier(game.headers) == game_identifier(game_info):
+                    
+                    # This is our game - analyze it
+                    moves = list(game.mainline_moves())
+                    total_plies = len(moves)
+                    
+                    # Positions before the first move and after every move
+                    board = game.board()
+                    positions = [board.copy(stack=False)]
+                    for move in moves:
+                        board.push(move)
+                        positions.append(board.copy(stack=False))
+                    
+                    # Each position's evaluation is both the "after" value of one move and the
+                    # "before" value of the next, so a game costs one engine call per position
+                    if self.adaptive_analysis:
+                        win_losses = self._adaptive_win_losses(engine, positions, game_stats)
+                    else:
+                        wins = self._evaluate_positions(engine, positions, self.analysis_limit, self.analysis_cache_key)
+                        win_losses = self._win_losses(wins, positions)
+                    
+                    # Only the player's own moves count towards their blunders and inaccuracies
+                    player = chess.BLACK if game_info.get("PlayedAs") == "Black" else chess.WHITE
+                    
+                    move_count = 0
+                    blunders = 0
+                    inaccuracies = 0
+                    
+                    for ply, win_loss in enumerate(win_losses):
+                        move_count += 1
+                        
+                        # Classify phase
+                        phase = (
+                            "Opening" if move_count <= 10 else
+                            "Middlegame" if move_count <= 30 else
+                            "Endgame"
+                        )
+                        
+                        if win_loss is None or positions[ply].turn != player:
+                            continue
+                        
+                        if win_loss >= self.blunder_threshold:
+                            blunders += 1
+                            game_stats[phase] += 1
+                            
+                            # Track time-trouble blunders (last 5 moves)
+                            if total_plies - move_count <= 5:
+                                game_stats["time_trouble"] += 1
+                        elif win_loss >= self.inaccuracy_threshold:
+                            inaccuracies += 1
+                    
+                    # Attach analysis results to the game record
+                    analysis_result = AnalysisRecord(
+                        game_info,
+                        blunders=blunders,
+                        inaccuracies=inaccuracies,
+                        move_count=move_count,
+                        engine_settings=self.engine_settings,
+                        analysis_profile=self.profile,
+                        classification=self.classification
+                    )
+                    return analysis_result, game_stats
+            
+            # If the index entry doesn't point at this game, still save basic info
+            self.logger.warning(f"Game index entry is stale for {game_info.get('site')}")
+            return self._basic_result(game_info), game_stats
+        
+        except (chess.engine.EngineTerminatedError, PoolCancelled):
+            raise
+        except Exception as e:
+            # Log the error but continue with the next game
+            self.logger.error(f"Error processing game {game_info.get('site')}: {str(e)}")
+            # Still add this game to results with basic info
+            return self._basic_result(game_info), Counter()
+    
+    def _pgn_reader(self, pgn_file):
+        """
+        Get the shared memory-mapped reader for a PGN file, opening it on first use.
+        
+        Args:
+            pgn_file: Path to the PGN file
+            
+        Returns:
+            PGNReader: Reader shared by all engine pool workers
+        """
+        with self._readers_lock:
+            reader = self.pgn_readers.get(pgn_file)
+            if reader is None:
+                reader = self.pgn_readers[pgn_file] = PGNReader(pgn_file)
+            return reader
+    
+    def _close_pgn_readers(self):
+        """Close the PGN readers opened during an analysis run."""
+        with self._readers_lock:
+            for reader in self.pgn_readers.values():
+                reader.close()
+            self.pgn_readers = {}
+    
+    def _adaptive_win_losses(self, engine, positions, game_stats):
+        """
+        Scan all positions at the cheap budget, then re-check suspicious moves at full budget.
+        
+        A move is escalated when its shallow win probability loss comes within
+        ESCALATION_MARGIN of the inaccuracy or the blunder threshold, on either side.
+        An escalated move is scored from full-budget evaluations of both the position
+        before and the position after it, never a mix of the two budgets.
+        
+        Args:
+            engine: chess.engine.SimpleEngine instance
+            positions: List of boards, the starting position followed by the position after each move
+            game_stats: Counter updated with "plies" and "escalated" counts
+            
+        Returns:
+            list: Win probability lost by each move (None where evaluation failed)
+        """
+        shallow_wins = self._evaluate_positions(engine, positions, self.scan_limit, self.scan_cache_key)
+        win_losses = self._win_losses(shallow_wins, positions)
+        
+        thresholds = (self.inaccuracy_threshold, self.blunder_threshold)
+        deep_wins = {}
+        
+        for ply, win_loss in enumerate(win_losses):
+            if win_loss is None:
+                continue
+            if all(abs(win_loss - threshold) > self.escalation_margin for threshold in thresholds):
+                continue
+            
+            # Re-evaluate the positions before and after the move at full budget
+            for index in (ply, ply + 1):
+                if index not in deep_wins:
+                    deep_wins[index] = self._evaluate_positions(
+                        engine, [positions[index]], self.analysis_limit, self.analysis_cache_key)[0]
+            
+            # Keep the shallow score if either full-budget evaluation failed
+            deep_loss = self._win_loss(deep_wins[ply], deep_wins[ply + 1], positions[ply].turn)
+            if deep_loss is not None:
+                win_losses[ply] = deep_loss
+            game_stats["escalated"] += 1
+        
+        game_stats["plies"] += len(win_losses)
+        return win_losses
+    
+    def _evaluate_positions(self, engine, positions, limit, settings):
+        """
+        Evaluate a list of positions.
+        
+        Args:
+            engine: chess.engine.SimpleEngine instance
+            positions: List of chess.Board positions
+            limit: chess.engine.Limit for each search
+            settings: Evaluation cache key describing the limit, or None to bypass the cache
+            
+        Returns:
+            list: White's winning chances for each position (None where evaluation failed)
+        """
+        wins = []
+        for index, board in enumerate(positions):
+            # Stop mid-game when the run has been cancelled
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise PoolCancelled()
+            
+            try:
+                wins.append(self._white_win_percent(self._evaluate(engine, board, limit, settings)))
+            except chess.engine.EngineTerminatedError:
+                # Let the engine pool restart the engine and retry this game
+                raise
+            except Exception as e:
+                # Log the error but continue analyzing the game
+                self.logger.warning(f"Error analyzing move {index}: {str(e)}")
+                wins.append(None)
+        return wins
+    
+    def _win_losses(self, wins, positions):
+        """
+        Compute the win probability lost by each move from consecutive position evaluations.
+        
+        Args:
+            wins: White's winning chances for the starting position and after each move
+            positions: The matching list of boards
+            
+        Returns:
+            list: Win probability lost by the side that made each move
+        """
+        return [
+            self._win_loss(wins[ply], wins[ply + 1], positions[ply].turn)
+            for ply in range(len(wins) - 1)
+        ]
+    
+    def _win_loss(self, before, after, mover):
+        """
+        Win probability lost by the side that moved.
+        
+        Args:
+            before: White's winning chances before the move
+            after: White's winning chances after the move
+            mover: chess.WHITE or chess.BLACK
+            
+        Returns:
+            float or None: Percentage points lost (None if either evaluation is missing)
+        """
+        if before is None or after is None:
+            return None
+        return before - after if mover == chess.WHITE else after - before
+    
+    def _evaluate(self, engine, board, limit, settings):
+        """
+        Evaluate a position, consulting the evaluation cache before the engine.
+        
+        Args:
+            engine: chess.engine.SimpleEngine instance
+            board: chess.Board position to evaluate
+            limit: chess.engine.Limit for the search
+            settings: Evaluation cache key describing the limit, or None to bypass the cache
+            
+        Returns:
+            dict: Engine info with at least a "score" key
+        """
+        use_cache = self.eval_cache is not None and settings is not None
+        if use_cache:
+            info = self.eval_cache.get(board, settings)
+            if info is not None:
+                return info
+        
+        info = engine.analyse(board, limit)
+        
+        # A search cut short by its time cap depends on machine load and isn't cached
+        if use_cache and (limit.time is None or limit.depth is None or info.get("depth", 0) >= limit.depth):
+            self.eval_cache.put(board, settings, info)
+        return info
+    
+    def _white_win_percent(self, info):
+        """
+        Convert an engine evaluation to White's winning chances.
+        
+        Uses the logistic centipawn-to-win-probability curve, so a 200cp swing in
+        a balanced position counts for much more than in an already-won one.
+        
+        Args:
+            info: Engine info dictionary with a "score" key
+            
+        Returns:
+            float or None: White's winning chances in percent (0-100)
+        """
+        score = info.get("score") if info else None
+        if score is None:
+            return None
+        
+        centipawns = score.white().score(mate_score=100000)
+        return 50 + 50 * (2 / (1 + math.exp(-0.00368208 * centipawns)) - 1)
+    
+    def is_up_to_date(self, result):
+        """
+        Check whether a saved analysis result matches the current analysis settings.
+        
+        Args:
+            result: AnalysisRecord
+            
+        Returns:
+            bool: True if the result can be reused without running the engine again
+        """
+        return (result.get("engine_settings") == self.engine_settings and
+                result.get("classification") == self.classification)
+    
+    def _load_game_index(self):
+        """
+        Load the byte-offset game index written by the parser.
+        
+        Returns:
+            dict: Game identifier -> {source_file, offset, length}
+        """
+        if not os.path.exists(self.game_index_file):
+            emoji_log(self.logger, logging.WARNING, 
+                     "No game index found. Parse games before analyzing.", "⚠️")
+            return {}
+            
+        try:
+            with open(self.game_index_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            self.logger.error(f"Error reading game index: {str(e)}")
+            return {}
+    
+    def _basic_result(self, game_info):
+        """
+        Build an analysis result without engine data.
+        
+        Args:
+            game_info: GameRecord of the game
+            
+        Returns:
+            AnalysisRecord: Game with zeroed error counts
+        """
+        return AnalysisRecord(game_info, move_count=game_info.get("NumMoves", 0))
+    
     def _save_analysis_results(self, analysis_results):
         """
-        Save analysis results to JSON file.
+        Append analysis results to the analysis journal.
+        
+        Earlier results for the same games are superseded, not rewritten.
         
         Args:
-            analysis_results: List of analysis result dictionaries
+            analysis_results: List of AnalysisRecords
         """
+        if not analysis_results:
+            return
+        
         try:
-            with open(self.analysis_file, "w") as f:
-                json.dump(analysis_results, f, indent=4)
+            self.analysis_journal.append(analysis_results)
+            snapshot = self.summary.snapshot(game_identifier(result) for result in analysis_results)
+            self.game_store.upsert_analysis(analysis_results)
+            self.summary.update(snapshot)
             emoji_log(self.logger, logging.INFO, 
-                     f"Analysis results saved to {self.analysis_file}", "💾")
+                     f"Saved {len(analysis_results)} analysis results to {self.analysis_file}", "💾")
         except Exception as e:
             emoji_log(self.logger, logging.ERROR, 
                      f"Error saving analysis results: {str(e)}", "❌")
@@ -262,7 +767,7 @@ class GameAnalyzer:
         Generate ECO code performance statistics.
         
         Args:
-            games_data: List of parsed game data
+            games_data: List of GameRecords
             
         Returns:
             dict: ECO performance statistics
@@ -327,6 +832,19 @@ class GameAnalyzer:
         
         return dict(eco_performance)
     
+    def refresh_summary(self):
+        """
+        Recompute the precomputed aggregates from all stored games and results.
+        
+        Returns:
+            dict: The new summary
+        """
+        try:
+            return self.summary.rebuild()
+        except Exception as e:
+            emoji_log(self.logger, logging.ERROR, f"Error building game summary: {str(e)}", "❌")
+            return None
+    
     def get_statistics(self):
         """
         Get comprehensive game statistics from analysis results.
@@ -334,39 +852,18 @@ class GameAnalyzer:
         Returns:
             dict: Various game statistics
         """
-        if not os.path.exists(self.analysis_file):
-            # Create an empty analysis file
-            try:
-                with open(self.analysis_file, "w") as f:
-                    json.dump([], f)
-            except Exception as e:
-                self.logger.error(f"Error creating empty analysis file: {str(e)}")
-            return {"total_games": 0}
-            
         try:
-            with open(self.analysis_file, "r") as f:
-                analysis_results = json.load(f)
-                
-            total_games = len(analysis_results)
-            wins = sum(1 for game in analysis_results 
-                      if (game.get("PlayedAs") == "White" and game.get("Result") == "1-0") or
-                         (game.get("PlayedAs") == "Black" and game.get("Result") == "0-1"))
-            losses = sum(1 for game in analysis_results 
-                        if (game.get("PlayedAs") == "White" and game.get("Result") == "0-1") or
-                           (game.get("PlayedAs") == "Black" and game.get("Result") == "1-0"))
-            draws = sum(1 for game in analysis_results if game.get("Result") == "1/2-1/2")
-            
-            # Calculate other statistics
-            blunders = sum(game.get("blunders", 0) for game in analysis_results)
-            inaccuracies = sum(game.get("inaccuracies", 0) for game in analysis_results)
+            summary = self.summary.current()["totals"]
+            total_games = summary["games"]
+            wins = summary["wins"]
             
             return {
                 "total_games": total_games,
                 "wins": wins,
-                "losses": losses,
-                "draws": draws,
-                "blunders": blunders,
-                "inaccuracies": inaccuracies,
+                "losses": summary["losses"],
+                "draws": summary["draws"],
+                "blunders": summary["blunders"],
+                "inaccuracies": summary["inaccuracies"],
                 "win_percentage": round(wins / total_games * 100, 1) if total_games > 0 else 0
             }
         except Exception as e:
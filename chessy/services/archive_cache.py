@@ -0,0 +1,262 @@
+"""
+On-disk HTTP cache of Chess.com monthly archive PGNs.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from ..utils.logging import emoji_log
+
+class ArchiveCache:
+    """
+    Stores the last downloaded PGN of each monthly archive with its ETag and
+    Last-Modified validators.
+
+    A month can't change once it is over, so an archive fetched after its month
+    ended is final and never requested again. Other archives are revalidated with
+    a conditional request.
+
+    Each entry also records how far into the cached copy games have been copied
+    into the game archive. Passes that filter games leave it where it was, so the
+    games they skipped are read again by the next unfiltered pass.
+    """
+
+    # Games finishing just before midnight can show up in an archive a little late
+    FINAL_GRACE_SECONDS = 6 * 3600
+
+    def __init__(self, cache_dir):
+        """
+        Initialize with the cache location.
+
+        Args:
+            cache_dir: Directory holding cached archives and their index
+        """
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index = self._load_index()
+
+    def get(self, url):
+        """
+        Look up the cache entry of an archive.
+
+        Args:
+            url: Archive URL
+
+        Returns:
+            dict or None: {file, etag, last_modified, fetched_at, appended}, or None if not cached
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if entry and not os.path.exists(os.path.join(self.cache_dir, entry["file"])):
+                return None
+            return dict(entry) if entry else None
+
+    def is_final(self, url, month):
+        """
+        Check whether a cached archive was fetched after its month ended.
+
+        Args:
+            url: Archive URL
+            month: Month of the archive in YYYY/MM format
+
+        Returns:
+            bool: True if the cached copy can't change any more
+        """
+        entry = self.get(url)
+        if not entry:
+            return False
+
+        try:
+            year, month_number = (int(part) for part in month.split("/"))
+        except ValueError:
+            return False
+        if month_number == 12:
+            year, month_number = year + 1, 0
+        month_end = datetime(year, month_number + 1, 1, tzinfo=timezone.utc).timestamp()
+        return entry["fetched_at"] >= month_end + self.FINAL_GRACE_SECONDS
+
+    def unappended(self, url):
+        """
+        Find the games of a cached archive that haven't been copied into the game archive.
+
+        Args:
+            url: Archive URL
+
+        Returns:
+            tuple or None: (path of the cached copy, byte offset of the first game not
+                copied yet), or None if not cached or every game has been copied
+        """
+        entry = self.get(url)
+        if not entry:
+            return None
+        path = os.path.join(self.cache_dir, entry["file"])
+        # Entries written before offsets were recorded are read again from the start
+        offset = entry.get("appended", 0)
+        if os.path.getsize(path) <= offset:
+            return None
+        return path, offset
+
+    def mark_appended(self, url):
+        """
+        Record that every game of a cached archive has been copied into the game archive.
+
+        Only call this after a pass that took all games, without a per-game filter.
+
+        Args:
+            url: Archive URL
+        """
+        with self._lock:
+            entry = self._index.get(url)
+            if not entry:
+                return
+            path = os.path.join(self.cache_dir, entry["file"])
+            if os.path.exists(path):
+                entry["appended"] = os.path.getsize(path)
+                self._save_index()
+
+    def conditional_headers(self, url):
+        """
+        Build the revalidation headers for a cached archive.
+
+        Args:
+            url: Archive URL
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since headers (empty if not cached)
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, chunks, etag=None, last_modified=None):
+        """
+        Save a downloaded archive as its chunks arrive.
+
+        The download is streamed to a temporary file and renamed over the cached copy,
+        so the archive is never held in memory. If the new copy continues the previous
+        one, the games already copied into the game archive stay marked as copied.
+
+        Args:
+            url: Archive URL
+            chunks: Iterable of PGN byte chunks
+            etag: ETag response header
+            last_modified: Last-Modified response header
+
+        Returns:
+            tuple: (path of the cached copy, byte offset of the first game not copied
+                into the game archive yet)
+        """
+        file_name = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".pgn"
+        path = os.path.join(self.cache_dir, file_name)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            new_offset = self._common_prefix(path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            previous = self._index.get(url) or {}
+            appended = min(previous.get("appended", 0), new_offset)
+            self._index[url] = {
+                "file": file_name,
+                "etag": etag,
+                "last_modified": last_modified,
+                "fetched_at": time.time(),
+                "appended": appended
+            }
+            self._save_index()
+        return path, appended
+
+    def touch(self, url):
+        """
+        Record that a cached archive was revalidated as unchanged.
+
+        Args:
+            url: Archive URL
+        """
+        with self._lock:
+            if url in self._index:
+                self._index[url]["fetched_at"] = time.time()
+                self._save_index()
+
+    def clear(self):
+        """Remove all cached archives."""
+        with self._lock:
+            for entry in self._index.values():
+                path = os.path.join(self.cache_dir, entry["file"])
+                if os.path.exists(path):
+                    os.remove(path)
+            self._index = {}
+            self._save_index()
+
+    def _common_prefix(self, old_path, new_path):
+        """
+        Find where a new download continues a previous copy.
+
+        Args:
+            old_path: Path of the previous copy (may not exist)
+            new_path: Path of the new download
+
+        Returns:
+            int: Size of the previous copy if the new download starts with it, else 0
+        """
+        if not os.path.exists(old_path):
+            return 0
+        old_size = os.path.getsize(old_path)
+        if old_size > os.path.getsize(new_path):
+            return 0
+
+        with open(old_path, "rb") as old, open(new_path, "rb") as new:
+            while True:
+                block = old.read(1024 * 1024)
+                if not block:
+                    return old_size
+                if new.read(len(block)) != block:
+                    return 0
+
+    def _load_index(self):
+        """Load the cache index, starting empty if it is missing or unreadable."""
+        if not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING, f"Could not read archive cache index: {str(e)}", "⚠️")
+            return {}
+
+    def _save_index(self):
+        """Write the cache index. Caller holds the lock."""
+        self._write_atomic(self.index_file, json.dumps(self._index))
+
+    def _write_atomic(self, path, text):
+        """Write a text file through a temporary file so readers never see a partial write."""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
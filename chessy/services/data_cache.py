@@ -0,0 +1,160 @@
+"""
+Process-wide cache of decoded game data shared by the web routes.
+"""
+import os
+import logging
+import threading
+from collections import OrderedDict
+
+# Most distinct query results kept at once
+DEFAULT_MAX_ENTRIES = 64
+
+class ReadOnlyDict(dict):
+    """
+    Dictionary handed out from the cache, shared between requests.
+
+    Reads (and JSON encoding, templates, pandas) work as on any dict; changes
+    raise TypeError so one request can't alter what the next one sees. Use
+    dict(value) for a private copy.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("cached data is read-only, copy it with dict() first")
+
+    __setitem__ = __delitem__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+class DataCache:
+    """
+    Thread-safe cache in front of the GameStore and the files derived from it.
+
+    Store lookups are keyed by their arguments and reused until the store's data
+    version changes, so repeat page loads skip the SQL query and the JSON decoding
+    of every row. File loads are reused until the file's modification time or size
+    changes. Results are frozen into tuples and ReadOnlyDicts before they are shared.
+    """
+
+    def __init__(self, store, max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Initialize with the store to read from.
+
+        Args:
+            store: GameStore holding games and analysis results
+            max_entries: Most distinct results kept; the least recently used are dropped first
+        """
+        self.store = store
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def query_games(self, filters=None, sort="date", descending=True, limit=None, offset=0, analyzed=False):
+        """Cached GameStore.query_games(), as a tuple of read-only game dictionaries."""
+        return self._from_store(
+            ("query_games", _freeze_key(filters), sort, descending, limit, offset, analyzed),
+            lambda: self.store.query_games(filters, sort, descending, limit, offset, analyzed))
+
+    def count_games(self, filters=None, analyzed=False):
+        """Cached GameStore.count_games()."""
+        return self._from_store(
+            ("count_games", _freeze_key(filters), analyzed),
+            lambda: self.store.count_games(filters, analyzed))
+
+    def summarize(self, group_by=None, filters=None, analyzed=True):
+        """Cached GameStore.summarize(), as read-only summaries."""
+        return self._from_store(
+            ("summarize", group_by, _freeze_key(filters), analyzed),
+            lambda: self.store.summarize(group_by, filters, analyzed))
+
+    def date_range(self):
+        """Cached GameStore.date_range()."""
+        return self._from_store(("date_range",), self.store.date_range)
+
+    def is_empty(self, analysis=False):
+        """Cached GameStore.is_empty()."""
+        return self._from_store(("is_empty", analysis), lambda: self.store.is_empty(analysis))
+
+    def load(self, name, loader):
+        """
+        Cache any value computed from the store, until the store's data version changes.
+
+        Args:
+            name: Name the value is cached under
+            loader: Function that computes the value
+
+        Returns:
+            The loader's result, frozen read-only
+        """
+        return self._from_store(("load", name), loader)
+
+    def load_file(self, path, loader):
+        """
+        Load data derived from a file, reusing the last result while the file is unchanged.
+
+        Args:
+            path: File the data is read from
+            loader: Function that reads and decodes the file; results are cached per path and loader
+
+        Returns:
+            The loader's result, frozen read-only
+        """
+        try:
+            stat = os.stat(path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        return self._get(("file", path, loader), stamp, loader)
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def _from_store(self, key, loader):
+        """Look up a store result, valid for the current data version."""
+        return self._get(key, self.store.version(), loader)
+
+    def _get(self, key, stamp, loader):
+        """
+        Return the cached value for a key if its stamp still matches, else load it.
+
+        The loader runs outside the lock so a slow query doesn't hold up other
+        requests; two requests missing at once may both load, and the last one wins.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        value = _freeze(loader())
+
+        with self._lock:
+            self._entries[key] = (stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+def _freeze(value):
+    """Turn lists and dictionaries into tuples and ReadOnlyDicts, recursively."""
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def _freeze_key(value):
+    """Turn a filters dictionary into a hashable cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze_key(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_key(item) for item in value)
+    return value
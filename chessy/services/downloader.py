@@ -11,6 +11,14 @@ import concurrent.futures
 import threading
 from queue import Queue
 import re
+import tempfile
+from requests.adapters import HTTPAdapter
+from ..utils.logging import emoji_log
+from ..utils.rate_limit import TokenBucket, get_with_retries
+from ..utils.pgn import PGNReader, scan_headers, decode_game
+from .archive_cache import ArchiveCache
+from .game_ids import GameIdSet
+from .parser import headers_identifier
 
 ################################################################################
 # I. CONSTANTS AND CONFIGURATION
@@ -21,9 +29,21 @@ DEFAULT_TIMEOUT = 30
 # Maximum number of retries for failed requests
 MAX_RETRIES = 3
 
-# Base delay (in seconds) between retries
+# Base delay (in seconds) of the exponential backoff between retries
 RETRY_DELAY = 2
 
+# Default average number of API requests per second
+DEFAULT_RATE_LIMIT = 3
+
+# Size of the chunks downloads are streamed to disk in (bytes)
+CHUNK_SIZE = 64 * 1024
+
+# Default number of archives downloaded at the same time
+DEFAULT_MAX_WORKERS = 4
+
+# Chess.com API endpoint listing a player's monthly archives
+ARCHIVES_URL = "https://api.chess.com/pub/player/{username}/games/archives"
+
 # Thread-local storage for maintaining context
 thread_local = threading.local()
 
@@ -31,7 +51,8 @@ thread_local = threading.local()
 # II. DOWNLOADER CLASS UPDATE
 ################################################################################
 class ChessComDownloader:
-    def __init__(self, username, headers, archive_file, last_downloaded_file):
+    def __init__(self, username, headers, archive_file, last_downloaded_file, max_workers=DEFAULT_MAX_WORKERS,
+                 rate_limiter=None, archive_cache=None, game_ids=None):
         """
         Initialize with required parameters.
         
@@ -40,24 +61,37 @@ class ChessComDownloader:
             headers: HTTP headers for API requests
             archive_file: Path to save the complete archive
             last_downloaded_file: Path to save the last download timestamp
+            max_workers: Maximum number of monthly archives downloaded at the same time
+            rate_limiter: TokenBucket shared by all Chess.com requests (defaults to DEFAULT_RATE_LIMIT)
+            archive_cache: ArchiveCache of downloaded monthly archives (defaults to archive_cache/
+                next to the archive file)
+            game_ids: GameIdSet of the games already in the archive (defaults to
+                {username}_game_ids.txt next to the archive file)
         """
         self.username = username
         self.headers = headers
+        self.max_workers = max(1, max_workers or 1)
+        self.rate_limiter = rate_limiter or TokenBucket(DEFAULT_RATE_LIMIT)
         self.archive_file = archive_file
         self.last_downloaded_file = last_downloaded_file
         self.output_dir = os.path.dirname(archive_file)
         os.makedirs(self.output_dir, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        self.archive_cache = archive_cache or ArchiveCache(os.path.join(self.output_dir, "archive_cache"))
+        self.game_ids = game_ids or GameIdSet(os.path.join(self.output_dir, f"{username}_game_ids.txt"))
         
         # Queue for storing downloaded PGNs
         self.pgn_queue = Queue()
+        
+        # Number of games added by the last fetch_and_save_games call
+        self.last_download_count = 0
     
     def fetch_and_save_games(self, filters=None):
         """
         Downloads new PGNs from Chess.com and saves them to the archive.
         - Appends new games to the archive file
         - Saves newly fetched games separately in output directory
-        - Tracks last download date to avoid duplicates
+        - Skips games already in the archive
         
         Args:
             filters (dict, optional): Filtering criteria, can include:
@@ -86,9 +120,7 @@ class ChessComDownloader:
             self.log(logging.WARNING, "No archives found or error fetching archives", "⚠️")
             return None
             
-        last_downloaded_date = self.get_last_downloaded_datetime()
-        
-        # If date filters are provided, override the last_downloaded_date
+        # Convert date filters to the month format of archive URLs
         if filters and 'start_date' in filters:
             # Convert YYYY-MM-DD to YYYY/MM format
             try:
@@ -113,105 +145,364 @@ class ChessComDownloader:
         if filters and 'end_date_api' in filters:
             archives = [url for url in archives if self._extract_month(url) <= filters['end_date_api']]
         
-        # Download archives in parallel
-        pgn_texts = self.download_archives_parallel(archives, last_downloaded_date)
-        
-        # Filter games by time control if needed
-        if filters and 'time_control' in filters and pgn_texts:
-            filtered_pgn_texts = []
-            
-            for pgn_text in pgn_texts:
-                # Filter games by time control
-                filtered_games = self._filter_games_by_time_control(pgn_text, filters['time_control'])
-                if filtered_games:
-                    filtered_pgn_texts.append(filtered_games)
-            
-            pgn_texts = filtered_pgn_texts
+        # Download archives in parallel, straight into the archive cache
+        self.last_download_count = 0
+        downloads = self.download_archives_parallel(archives)
         
-        if not pgn_texts:
+        if not downloads:
             self.log(logging.INFO, "No new games found", "ℹ️")
             return None
-            
-        # Combine all PGN texts
-        combined_pgns = "\n\n".join(pgn_texts)
         
-        # Save newly downloaded games to a separate file
+        # Save newly downloaded games to a separate file and append them to the archive
         date_str = datetime.now().strftime("%Y.%m.%d")
         new_pgn_file = os.path.join(self.output_dir, f"{self.username}_GameArchive_{date_str}.pgn")
+        time_control = filters.get('time_control') if filters else None
         
-        with open(new_pgn_file, "w") as recent_file:
-            recent_file.write(combined_pgns)
-        
-        # Append to archive file
-        with open(self.archive_file, "a") as archive:
-            archive.write(combined_pgns)
+        game_count = self._append_games(downloads, new_pgn_file, time_control)
+        if not game_count:
+            os.remove(new_pgn_file)
+            self.log(logging.INFO, "No new games found", "ℹ️")
+            return None
         
-        # Count games (approximate by counting [Event tags)
-        game_count = combined_pgns.count('[Event "')
+        self.last_download_count = game_count
         self.log(logging.INFO, f"Added {game_count} games to archive", "✅")
         
-        # Update last downloaded tracker
-        self.save_last_downloaded_datetime()
+        # Record the download, unless games were filtered out of it
+        if not time_control:
+            self.save_last_downloaded_datetime()
         
         return new_pgn_file
     
-    def _extract_month(self, archive_url):
+    def _append_games(self, downloads, new_pgn_file, time_control=None):
         """
-        Extract the month in YYYY/MM format from an archive URL.
+        Copy downloaded games into the new games file and the archive, one game at a time.
+        
+        Games already in the archive are left out, so re-downloaded months never
+        add duplicates. After a pass without a time control filter, each cached
+        archive is marked as fully copied; a filtered pass leaves the marks alone,
+        so the games it skipped are read again next time.
         
         Args:
-            archive_url (str): Archive URL
+            downloads: List of (archive URL, cached archive path, offset of the games
+                not copied yet), in month order
+            new_pgn_file: Path of the file collecting this download's games
+            time_control: Optional time control category games must match
             
         Returns:
-            str: Month in YYYY/MM format
+            int: Number of games added
         """
-        # URLs are in format: https://api.chess.com/pub/player/{username}/games/{YYYY}/{MM}
-        parts = archive_url.split('/')
-        if len(parts) >= 2:
-            return f"{parts[-2]}/{parts[-1]}"
-        return ""
+        self._ensure_game_ids()
+        new_ids = []
+        added = set()
+        duplicates = 0
+        
+        with open(new_pgn_file, "wb") as recent_file, open(self.archive_file, "ab") as archive:
+            # Make sure the first new game starts on a line of its own
+            if archive.tell() and not self._ends_with_newline(self.archive_file):
+                archive.write(b"\n\n")
+            
+            for _, path, offset in downloads:
+                with PGNReader(path) as reader:
+                    for _, raw_game in reader.iter_slices(offset):
+                        headers, _ = scan_headers(decode_game(raw_game))
+                        if time_control and self._game_time_control(headers) != time_control:
+                            continue
+                        
+                        game_id = headers_identifier(headers)
+                        if game_id in added or game_id in self.game_ids:
+                            duplicates += 1
+                            continue
+                        
+                        game = raw_game.rstrip() + b"\n\n"
+                        recent_file.write(game)
+                        archive.write(game)
+                        added.add(game_id)
+                        new_ids.append(game_id)
+        
+        self.game_ids.add_all(new_ids)
+        if not time_control:
+            for url, _, _ in downloads:
+                self.archive_cache.mark_appended(url)
+        if duplicates:
+            self.log(logging.INFO, f"Skipped {duplicates} games already in the archive", "♻️")
+        return len(new_ids)
     
-    def _filter_games_by_time_control(self, pgn_text, time_control_category):
+    def compact_archive(self):
         """
-        Filter games in a PGN text by time control category.
+        Rewrite the archive without duplicate games and rebuild the set of archived game IDs.
+        
+        The first copy of each game is kept. The new archive is written to a temporary
+        file and renamed into place, so an interrupted run leaves the old one intact.
+        
+        Returns:
+            tuple: (games kept, duplicates removed)
+        """
+        if not os.path.exists(self.archive_file):
+            self.log(logging.WARNING, f"No archive to compact at {self.archive_file}", "⚠️")
+            return 0, 0
+        
+        game_ids = set()
+        duplicates = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.output_dir, prefix=".tmp-", suffix=".pgn")
+        try:
+            with os.fdopen(fd, "wb") as compacted, PGNReader(self.archive_file) as reader:
+                for _, raw_game in reader.iter_slices():
+                    headers, _ = scan_headers(decode_game(raw_game))
+                    game_id = headers_identifier(headers)
+                    if game_id in game_ids:
+                        duplicates += 1
+                        continue
+                    compacted.write(raw_game.rstrip() + b"\n\n")
+                    game_ids.add(game_id)
+            
+            if duplicates:
+                os.replace(temp_path, self.archive_file)
+            else:
+                os.remove(temp_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        
+        self.game_ids.replace(game_ids)
+        self.log(logging.INFO, 
+                 f"Compacted {self.archive_file}: kept {len(game_ids)} games, removed {duplicates} duplicates", "🗜️")
+        return len(game_ids), duplicates
+    
+    def _ensure_game_ids(self):
+        """Build the set of archived game IDs from an archive that predates it."""
+        if self.game_ids.exists() or not os.path.exists(self.archive_file):
+            return
+        
+        game_ids = set()
+        with PGNReader(self.archive_file) as reader:
+            for _, raw_game in reader.iter_slices():
+                headers, _ = scan_headers(decode_game(raw_game))
+                game_ids.add(headers_identifier(headers))
+        self.game_ids.replace(game_ids)
+    
+    def _ends_with_newline(self, path):
+        """Check whether a non-empty file ends with a line break."""
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    
+    def _game_time_control(self, headers):
+        """
+        Categorize the time control of a single game.
+        
+        Args:
+            headers: PGN headers of the game
+            
+        Returns:
+            str or None: Category (bullet, blitz, rapid, classical), or None without a TimeControl tag
+        """
+        time_control = headers.get("TimeControl")
+        return self._categorize_time_control(time_control) if time_control else None
+    
+    def log(self, level, message, emoji=""):
+        """
+        Log a message with an emoji prefix.
         
         Args:
-            pgn_text (str): PGN text containing multiple games
-            time_control_category (str): Time control category (bullet, blitz, rapid, classical)
+            level: Logging level
+            message: Message to log
+            emoji: Emoji to prefix the message with
+        """
+        emoji_log(self.logger, level, message, emoji)
+    
+    def fetch_archives(self):
+        """
+        Fetch the list of monthly archive URLs for the user.
+        
+        Returns:
+            list: Archive URLs, oldest first (empty if an error occurs)
+        """
+        url = ARCHIVES_URL.format(username=self.username)
+        
+        try:
+            response = self._get(url)
+            archives = response.json().get("archives", [])
+            self.log(logging.INFO, f"Found {len(archives)} monthly archives", "📚")
+            return sorted(archives, key=self._extract_month)
+        except ValueError:
+            self.log(logging.ERROR, "Invalid JSON response received for archive list", "❌")
+            return []
+        except requests.exceptions.RequestException as e:
+            self.log(logging.ERROR, f"Error fetching archives: {str(e)}", "❌")
+            return []
+    
+    def download_archives_parallel(self, archives):
+        """
+        Download the PGNs of several monthly archives concurrently.
+        
+        At most max_workers archives are fetched at once, each worker thread reusing
+        its own keep-alive session, and all requests draw from the shared rate limiter.
+        Cached months that have ended aren't requested at all, and others are
+        revalidated, so only games not yet copied into the archive are returned.
+        
+        Args:
+            archives: List of archive URLs
             
         Returns:
-            str: Filtered PGN text
+            list: (archive URL, cached archive path, byte offset of the games not copied
+                yet) for each archive with such games, in month order
+        """
+        pending = sorted(archives, key=self._extract_month)
+        if not pending:
+            return []
+        
+        workers = min(self.max_workers, len(pending))
+        self.log(logging.INFO, f"Downloading {len(pending)} archives with {workers} connections", "⬇️")
+        
+        # map() hands results back in submission order, so months stay in order
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            downloads = list(executor.map(self._download_archive, pending))
+        
+        return [download for download in downloads if download]
+    
+    def get_last_downloaded_datetime(self):
+        """
+        Read the timestamp of the last download.
+        
+        Returns:
+            str or None: Timestamp (YYYY.MM.DD-HH.MM.SS), or None to fetch all archives
         """
-        # Split the PGN text into individual games
-        games = pgn_text.split('\n\n[Event "')
+        if not os.path.exists(self.last_downloaded_file):
+            return None
         
-        # First element won't start with [Event, so we need to handle it separately
-        header = games[0]
-        games = games[1:]
-        games = ['[Event "' + game for game in games]
+        try:
+            with open(self.last_downloaded_file, "r") as f:
+                return f.read().strip() or None
+        except Exception as e:
+            self.log(logging.WARNING, f"Could not read last download time: {str(e)}", "⚠️")
+            return None
+    
+    def save_last_downloaded_datetime(self):
+        """Record the current time (YYYY.MM.DD-HH.MM.SS) as the last download."""
+        timestamp = datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
+        try:
+            with open(self.last_downloaded_file, "w") as f:
+                f.write(timestamp)
+        except Exception as e:
+            self.log(logging.ERROR, f"Error saving last download time: {str(e)}", "❌")
+    
+    def _download_archive(self, archive_url):
+        """
+        Download a single monthly archive into the archive cache.
         
-        # Filter games by time control
-        filtered_games = []
+        Runs on a downloader worker thread. The response body is streamed to disk in
+        chunks rather than read into memory.
         
-        for game in games:
-            # Extract TimeControl tag
-            time_control_match = re.search(r'\[TimeControl "([^"]+)"\]', game)
+        Args:
+            archive_url: Archive URL
             
-            if time_control_match:
-                tc = time_control_match.group(1)
-                game_category = self._categorize_time_control(tc)
+        Returns:
+            tuple or None: (archive PGN URL, cached archive path, byte offset of the games not
+                copied into the archive yet), or None if there are no such games or the download failed
+        """
+        month = self._extract_month(archive_url)
+        pgn_url = f"{archive_url}/pgn"
+        
+        # Finished months can't change, so a copy fetched after the month ended is final
+        if self.archive_cache.is_final(pgn_url, month):
+            return self._cached_games(pgn_url, f"Archive {month} is complete and cached")
+        
+        try:
+            with self._get(pgn_url, self.archive_cache.conditional_headers(pgn_url), stream=True) as response:
+                if response.status_code == 304:
+                    self.archive_cache.touch(pgn_url)
+                    return self._cached_games(pgn_url, f"Archive {month} unchanged since last download")
                 
-                # Add game if it matches the requested category
-                if game_category == time_control_category:
-                    filtered_games.append(game)
-            else:
-                # If no TimeControl tag, skip this game
-                continue
+                # Games are added to the end of a month's archive, so the part already copied stays copied
+                path, offset = self.archive_cache.store(
+                    pgn_url, response.iter_content(chunk_size=CHUNK_SIZE),
+                    response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except requests.exceptions.RequestException as e:
+            self.log(logging.ERROR, f"Error downloading archive {month}: {str(e)}", "❌")
+            return None
         
-        # If any games were filtered, combine them
-        if filtered_games:
-            return '\n\n'.join(filtered_games)
+        if os.path.getsize(path) <= offset:
+            self.log(logging.INFO, f"No new games in archive {month}", "ℹ️")
+            return None
         
+        self.log(logging.INFO, f"Downloaded PGNs from {month}", "📥")
+        return pgn_url, path, offset
+    
+    def _cached_games(self, pgn_url, message):
+        """
+        Get the games of a cached archive that an earlier, filtered pass didn't copy.
+        
+        Args:
+            pgn_url: Archive PGN URL
+            message: Log message describing the cached archive
+            
+        Returns:
+            tuple or None: (archive PGN URL, cached archive path, byte offset of the games
+                not copied yet), or None if every game has been copied
+        """
+        unappended = self.archive_cache.unappended(pgn_url)
+        if unappended is None:
+            self.log(logging.INFO, f"{message}, skipping", "🗄️")
+            return None
+        
+        self.log(logging.INFO, f"{message}, reading games skipped by an earlier filter", "🗄️")
+        return (pgn_url,) + unappended
+    
+    def _get(self, url, headers=None, stream=False):
+        """
+        GET a URL on this thread's session within the rate limit, retrying throttled and failed requests.
+        
+        Args:
+            url: URL to fetch
+            headers: Optional extra request headers
+            stream: Leave the body unread so it can be consumed with iter_content()
+            
+        Returns:
+            requests.Response: Successful (or 304 Not Modified) response
+            
+        Raises:
+            requests.exceptions.RequestException: If the request still fails after MAX_RETRIES retries
+        """
+        response = get_with_retries(
+            self._session(), url, self.rate_limiter, MAX_RETRIES, RETRY_DELAY, logger=self.logger,
+            headers={**self.headers, **(headers or {})}, timeout=DEFAULT_TIMEOUT, stream=stream)
+        response.raise_for_status()
+        return response
+    
+    def _session(self):
+        """
+        Get the HTTP session of the current thread, creating it on first use.
+        
+        Sessions keep connections to the API alive between requests; requests.Session
+        isn't thread-safe, so each worker thread gets its own.
+        
+        Returns:
+            requests.Session: Session for this thread
+        """
+        session = getattr(thread_local, "session", None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            thread_local.session = session
+        return session
+    
+    def _extract_month(self, archive_url):
+        """
+        Extract the month in YYYY/MM format from an archive URL.
+        
+        Args:
+            archive_url (str): Archive URL
+            
+        Returns:
+            str: Month in YYYY/MM format
+        """
+        # URLs are in format: https://api.chess.com/pub/player/{username}/games/{YYYY}/{MM}
+        parts = archive_url.split('/')
+        if len(parts) >= 2:
+            return f"{parts[-2]}/{parts[-1]}"
         return ""
     
     def _categorize_time_control(self, seconds):
@@ -0,0 +1,184 @@
+"""
+Pool of UCI engine processes for analyzing games in parallel.
+"""
+import os
+import logging
+import threading
+import concurrent.futures
+from queue import Queue
+import chess.engine
+from ..utils.logging import emoji_log
+
+class PoolCancelled(Exception):
+    """Raised by work items that stop early because the pool run was cancelled."""
+
+class EnginePool:
+    """
+    Keeps a fixed number of Stockfish processes alive and hands work items out to them.
+    """
+
+    def __init__(self, engine_path, size=None, options=None, max_restarts=2):
+        """
+        Initialize the pool (engines are started on enter).
+
+        Args:
+            engine_path: Path to the UCI engine executable
+            size: Number of engine processes (defaults to the CPU count)
+            options: UCI options applied to every engine, e.g. {"Threads": 1, "Hash": 64}
+            max_restarts: How often a crashed engine is restarted for a single work item
+        """
+        self.engine_path = engine_path
+        self.size = max(1, size or os.cpu_count() or 1)
+        self.options = options or {}
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.logger = logging.getLogger(__name__)
+
+        # Set when a run is cancelled; long work items should poll it and raise PoolCancelled
+        self.cancelled = threading.Event()
+
+        # Idle engines waiting for work
+        self._engines = Queue()
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """Start all engine processes."""
+        for _ in range(self.size):
+            self._engines.put(self._spawn())
+        emoji_log(self.logger, logging.INFO, f"Started {self.size} engine processes", "⚙️")
+
+    def close(self):
+        """Shut down all idle engine processes."""
+        while not self._engines.empty():
+            engine = self._engines.get_nowait()
+            if engine is not None:
+                self._shutdown(engine)
+
+    def run(self, func, item):
+        """
+        Run func(engine, item) on an idle engine, restarting the engine if it dies.
+
+        Args:
+            func: Callable taking (engine, item)
+            item: Work item passed through to func
+
+        Returns:
+            Whatever func returns
+        """
+        engine = self._engines.get()
+        try:
+            # An earlier restart failed; start the missing engine for this item
+            if engine is None:
+                engine = self._spawn()
+
+            attempts = 0
+            while True:
+                try:
+                    return func(engine, item)
+                except chess.engine.EngineTerminatedError:
+                    # A dead engine never goes back to the pool
+                    dead, engine = engine, None
+                    if attempts >= self.max_restarts:
+                        self._shutdown(dead)
+                        raise
+                    attempts += 1
+                    engine = self._restart(dead)
+        finally:
+            # Hand the (possibly restarted) engine back to the pool, or an empty slot
+            # that the next item fills with a fresh engine
+            self._engines.put(engine)
+
+    def map(self, func, items, callback=None, fallback=None, on_result=None):
+        """
+        Run func over all items on the pool, preserving input order.
+
+        Args:
+            func: Callable taking (engine, item)
+            items: Iterable of work items
+            callback: Optional function taking (completed, total), called as items finish.
+                Returning False cancels the remaining items.
+            fallback: Optional function taking (item, exception) used when an item fails
+            on_result: Optional function taking (item, result), called as items finish
+
+        Returns:
+            list: Results in the same order as items (None for items skipped by cancellation)
+        """
+        items = list(items)
+        total = len(items)
+        results = [None] * total
+        completed = 0
+        self.cancelled.clear()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.size) as executor:
+            futures = {executor.submit(self.run, func, item): i for i, item in enumerate(items)}
+
+            for future in concurrent.futures.as_completed(futures):
+                index = futures[future]
+                if future.cancelled():
+                    continue
+
+                try:
+                    results[index] = future.result()
+                except PoolCancelled:
+                    continue
+                except Exception as e:
+                    if fallback is None:
+                        raise
+                    self.logger.error(f"Engine failed on item {index + 1}/{total}: {str(e)}")
+                    results[index] = fallback(items[index], e)
+
+                completed += 1
+                if on_result:
+                    on_result(items[index], results[index])
+
+                if callback and total > 0 and callback(completed, total) is False:
+                    self.cancel(futures)
+
+        return results
+
+    def cancel(self, futures=()):
+        """
+        Cancel the current run: queued items are dropped and running items are told to stop.
+
+        Args:
+            futures: Futures of queued work items to cancel
+        """
+        if self.cancelled.is_set():
+            return
+        emoji_log(self.logger, logging.INFO, "Cancelling remaining work", "🛑")
+        self.cancelled.set()
+        for future in futures:
+            future.cancel()
+
+    def _spawn(self):
+        """Start a single engine process and apply the configured UCI options."""
+        engine = chess.engine.SimpleEngine.popen_uci(self.engine_path)
+        options = {name: value for name, value in self.options.items() if name in engine.options}
+        if options:
+            engine.configure(options)
+        return engine
+
+    def _restart(self, engine):
+        """Replace a dead engine with a fresh process."""
+        with self._lock:
+            self.restarts += 1
+        emoji_log(self.logger, logging.WARNING, "Engine process terminated unexpectedly, restarting", "♻️")
+        self._shutdown(engine)
+        return self._spawn()
+
+    def _shutdown(self, engine):
+        """Stop an engine process, ignoring errors from already-dead engines."""
+        try:
+            engine.quit()
+        except Exception:
+            try:
+                engine.close()
+            except Exception:
+                pass
@@ -0,0 +1,175 @@
+"""
+Persistent cache of engine evaluations keyed by Zobrist hash and engine settings.
+"""
+import os
+import sqlite3
+import logging
+import threading
+import chess
+import chess.engine
+import chess.polyglot
+from ..utils.logging import emoji_log
+
+class EvaluationCache:
+    """
+    SQLite-backed position evaluation cache with least-recently-used eviction.
+    """
+
+    # Commit pending writes after this many changes
+    COMMIT_INTERVAL = 500
+
+    def __init__(self, cache_file, max_entries=1000000):
+        """
+        Initialize with the cache file location.
+
+        Args:
+            cache_file: Path to the SQLite database file
+            max_entries: Maximum number of cached positions before old entries are evicted
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.logger = logging.getLogger(__name__)
+
+        self._conn = None
+        self._lock = threading.Lock()
+        self._clock = 0
+        self._entries = 0
+        self._pending = 0
+
+        os.makedirs(os.path.dirname(cache_file) or ".", exist_ok=True)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """Open the database, creating the schema if needed."""
+        # Engine pool workers share the connection, guarded by self._lock
+        self._conn = sqlite3.connect(self.cache_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS evaluations (
+                zobrist INTEGER NOT NULL,
+                settings TEXT NOT NULL,
+                score_cp INTEGER,
+                score_mate INTEGER,
+                depth INTEGER,
+                best_move TEXT,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (zobrist, settings)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_last_used ON evaluations (last_used)")
+        self._clock, self._entries = self._conn.execute(
+            "SELECT COALESCE(MAX(last_used), 0), COUNT(*) FROM evaluations").fetchone()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        """Commit pending writes and close the database."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def get(self, board, settings):
+        """
+        Look up a cached evaluation.
+
+        Args:
+            board: chess.Board position
+            settings: String describing the engine settings used for the evaluation
+
+        Returns:
+            dict or None: Engine info with "score", "depth" and "pv" keys, as returned by engine.analyse
+        """
+        key = self._key(board)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT score_cp, score_mate, depth, best_move FROM evaluations WHERE zobrist = ? AND settings = ?",
+                (key, settings)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._clock += 1
+            self._conn.execute(
+                "UPDATE evaluations SET last_used = ? WHERE zobrist = ? AND settings = ?",
+                (self._clock, key, settings))
+            self._changed()
+
+        score_cp, score_mate, depth, best_move = row
+        score = chess.engine.Mate(score_mate) if score_mate is not None else chess.engine.Cp(score_cp)
+        info = {"score": chess.engine.PovScore(score, chess.WHITE), "depth": depth}
+        if best_move:
+            info["pv"] = [chess.Move.from_uci(best_move)]
+        return info
+
+    def put(self, board, settings, info):
+        """
+        Store an engine evaluation.
+
+        Args:
+            board: chess.Board position that was evaluated
+            settings: String describing the engine settings used for the evaluation
+            info: Engine info dictionary as returned by engine.analyse
+        """
+        pov_score = info.get("score")
+        if pov_score is None:
+            return
+
+        score = pov_score.white()
+        score_mate = score.mate() if score.is_mate() else None
+        score_cp = None if score.is_mate() else score.score()
+        pv = info.get("pv")
+        best_move = pv[0].uci() if pv else None
+
+        key = self._key(board)
+        with self._lock:
+            self._clock += 1
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO evaluations "
+                "(zobrist, settings, score_cp, score_mate, depth, best_move, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, settings, score_cp, score_mate, info.get("depth"), best_move, self._clock))
+            if cursor.rowcount:
+                self._entries += 1
+
+            if self._entries > self.max_entries:
+                self._evict()
+            self._changed()
+
+    def log_stats(self):
+        """Log hit and miss counts for the current run."""
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups * 100 if lookups else 0
+        emoji_log(self.logger, logging.INFO,
+                 f"Evaluation cache: {self.hits} hits, {self.misses} misses ({hit_rate:.1f}% hit rate)", "🗃️")
+
+    def _key(self, board):
+        """Zobrist hash as a signed 64-bit integer, which is what SQLite stores."""
+        key = chess.polyglot.zobrist_hash(board)
+        return key - (1 << 64) if key >= (1 << 63) else key
+
+    def _evict(self):
+        """Drop the least recently used tenth of the cache. Caller holds the lock."""
+        excess = self._entries - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM evaluations WHERE rowid IN "
+            "(SELECT rowid FROM evaluations ORDER BY last_used LIMIT ?)", (excess,))
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def _changed(self):
+        """Commit periodically so concurrent writers don't hold a transaction open. Caller holds the lock."""
+        self._pending += 1
+        if self._pending >= self.COMMIT_INTERVAL:
+            self._conn.commit()
+            self._pending = 0
@@ -0,0 +1,100 @@
+"""
+Persistent set of identifiers of the games already in the archive.
+"""
+import os
+import logging
+import tempfile
+import threading
+from ..utils.logging import emoji_log
+
+class GameIdSet:
+    """
+    Identifiers of archived games, one per line in a text file.
+
+    The whole set is loaded into memory on first use; new identifiers are
+    appended to the file, so recording a download never rewrites it.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize with the file location.
+
+        Args:
+            path: Path to the identifier file
+        """
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._ids = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def exists(self):
+        """Check whether the identifier file has been created."""
+        return os.path.exists(self.path)
+
+    def __contains__(self, game_id):
+        return game_id in self._load()
+
+    def __len__(self):
+        return len(self._load())
+
+    def add_all(self, game_ids):
+        """
+        Record identifiers of newly archived games.
+
+        Args:
+            game_ids: Iterable of game identifiers
+        """
+        with self._lock:
+            ids = self._load()
+            new_ids = [game_id for game_id in game_ids if game_id not in ids]
+            if not new_ids:
+                return
+
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(game_id + "\n" for game_id in new_ids))
+                f.flush()
+                os.fsync(f.fileno())
+            ids.update(new_ids)
+
+    def replace(self, game_ids):
+        """
+        Replace the whole set, e.g. after the archive was rebuilt.
+
+        Args:
+            game_ids: Iterable of game identifiers
+        """
+        with self._lock:
+            ids = set(game_ids)
+            directory = os.path.dirname(self.path) or "."
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".txt")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    for game_id in ids:
+                        f.write(game_id + "\n")
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+            self._ids = ids
+
+        emoji_log(self.logger, logging.INFO, f"Recorded {len(ids)} archived game IDs in {self.path}", "🆔")
+
+    def clear(self):
+        """Forget all identifiers."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._ids = None
+
+    def _load(self):
+        """Load the identifiers from disk on first use."""
+        if self._ids is None:
+            ids = set()
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    ids.update(line.rstrip("\n") for line in f if line.strip())
+            self._ids = ids
+        return self._ids
@@ -0,0 +1,459 @@
+"""
+SQLite store of parsed games and analysis results for indexed filtering and aggregation.
+"""
+import os
+import json
+import contextlib
+import sqlite3
+import logging
+import secrets
+import threading
+from ..utils.logging import emoji_log
+from ..utils.time_control import categorize_time_control
+
+# Filter name -> (SQL condition, whether the value is a list)
+FILTERS = {
+    "start_date": ("g.date >= ?", False),
+    "end_date": ("g.date <= ?", False),
+    "result": ("g.result IN ({})", True),
+    "time_control": ("g.time_control IN ({})", True),
+    "tc_category": ("g.tc_category IN ({})", True),
+    "played_as": ("g.played_as IN ({})", True),
+    "opponent": ("g.opponent = ? COLLATE NOCASE", False),
+    "eco": ("g.eco = ?", False),
+    "outcome": ("g.outcome IN ({})", True),
+    "min_moves": ("g.num_moves >= ?", False),
+    "max_moves": ("g.num_moves <= ?", False),
+    "min_blunders": ("a.blunders >= ?", False),
+    "min_inaccuracies": ("a.inaccuracies >= ?", False),
+}
+
+# Sort key -> SQL expression
+SORT_KEYS = {
+    "date": "g.date",
+    "eco": "g.eco",
+    "opponent": "g.opponent COLLATE NOCASE",
+    "result": "g.result",
+    "moves": "g.num_moves",
+    "blunders": "a.blunders",
+    "inaccuracies": "a.inaccuracies",
+    "mistakes": "a.blunders + a.inaccuracies",
+}
+
+# Grouping key -> SQL expression for analysis summaries
+GROUPINGS = {
+    "time_control": "g.time_control",
+    "tc_category": "g.tc_category",
+    "eco": "g.eco",
+    "month": "substr(g.date, 1, 7)",
+    "move_count": "a.move_count",
+}
+
+class GameStore:
+    """
+    Games and analysis results in SQLite, with indexes on the columns pages filter by.
+
+    Each thread gets its own connection; the database runs in WAL mode so readers
+    don't block the background parse and analysis threads.
+    """
+
+    def __init__(self, db_file, key_func):
+        """
+        Initialize with the database location.
+
+        Args:
+            db_file: Path to the SQLite database file
+            key_func: Function mapping a game record to its unique identifier
+        """
+        self.db_file = db_file
+        self.key_func = key_func
+        self.logger = logging.getLogger(__name__)
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(db_file) or ".", exist_ok=True)
+        self._create_schema()
+
+    def version(self):
+        """
+        Get the data version, which increases with every write.
+
+        Returns:
+            int: Version counter
+        """
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def database_id(self):
+        """
+        Get the random identifier chosen when the database was created.
+
+        The version counter starts again at 0 in a recreated database, so anything
+        stamped with a version outside this process should record the identifier too.
+
+        Returns:
+            int: Database identifier
+        """
+        row = self._conn().execute("SELECT value FROM meta WHERE key = 'database_id'").fetchone()
+        return row[0] if row else 0
+
+    def replace_games(self, games):
+        """
+        Replace all stored games.
+
+        Args:
+            games: Iterable of GameRecords or parsed game dictionaries
+        """
+        with self._write() as conn:
+            conn.execute("DELETE FROM games")
+            count = self._insert_games(conn, games)
+        emoji_log(self.logger, logging.INFO, f"Stored {count} games in {self.db_file}", "🗄️")
+
+    def upsert_games(self, games):
+        """
+        Insert or update parsed games.
+
+        Args:
+            games: Iterable of GameRecords or parsed game dictionaries
+        """
+        with self._write() as conn:
+            self._insert_games(conn, games)
+
+    def upsert_analysis(self, results):
+        """
+        Insert or update analysis results.
+
+        Args:
+            results: Iterable of AnalysisRecords or analysis result dictionaries
+        """
+        with self._write() as conn:
+            self._insert_analysis(conn, results)
+
+    def replace_analysis(self, results):
+        """
+        Replace all stored analysis results.
+
+        Args:
+            results: Iterable of AnalysisRecords or analysis result dictionaries
+        """
+        with self._write() as conn:
+            conn.execute("DELETE FROM analysis")
+            self._insert_analysis(conn, results)
+
+    def clear(self):
+        """Delete all games and analysis results."""
+        with self._write() as conn:
+            conn.execute("DELETE FROM analysis")
+            conn.execute("DELETE FROM games")
+
+    def is_empty(self, analysis=False):
+        """
+        Check whether the store holds no games (or no analysis results).
+
+        Args:
+            analysis: Check the analysis table instead of the games table
+
+        Returns:
+            bool: True if the table is empty
+        """
+        table = "analysis" if analysis else "games"
+        return self._conn().execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is None
+
+    def count_games(self, filters=None, analyzed=False):
+        """
+        Count games matching the filters.
+
+        Args:
+            filters: Optional dict of filters (see FILTERS)
+            analyzed: Only count games with analysis results
+
+        Returns:
+            int: Number of matching games
+        """
+        where, params = self._where(filters)
+        row = self._conn().execute(
+            f"SELECT COUNT(*) FROM {self._from(analyzed)} {where}", params).fetchone()
+        return row[0]
+
+    def query_games(self, filters=None, sort="date", descending=True, limit=None, offset=0, analyzed=False):
+        """
+        Fetch games matching the filters.
+
+        Args:
+            filters: Optional dict of filters (see FILTERS)
+            sort: Sort key (see SORT_KEYS)
+            descending: Sort in descending order
+            limit: Maximum number of games to return
+            offset: Number of matching games to skip
+            analyzed: Return analysis results (only for analyzed games) instead of parsed games
+
+        Returns:
+            list: Game dictionaries
+        """
+        return list(self.iter_games(filters, sort, descending, limit, offset, analyzed))
+
+    def iter_games(self, filters=None, sort="date", descending=True, limit=None, offset=0, analyzed=False):
+        """
+        Fetch games matching the filters one row at a time, e.g. to stream them.
+
+        The query runs right away, so bad arguments raise here rather than while iterating.
+        Takes the same arguments as query_games().
+
+        Returns:
+            iterator: Game dictionaries, decoded as they are read
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        where, params = self._where(filters)
+        columns = "a.data" if analyzed else "g.data"
+        order = "DESC" if descending else "ASC"
+        sql = f"SELECT {columns} FROM {self._from(analyzed)} {where} ORDER BY {SORT_KEYS[sort]} {order}, g.rowid {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+
+        cursor = self._conn().execute(sql, params)
+        return (json.loads(row[0]) for row in cursor)
+
+    def date_range(self):
+        """
+        Get the earliest and latest known game dates.
+
+        Returns:
+            tuple: (start date, end date), None for each if there are no dated games
+        """
+        # Unknown dates start with "?", which sorts after every digit; both lookups walk the date index
+        conn = self._conn()
+        start, end = (
+            conn.execute(f"SELECT date FROM games WHERE date < '?' ORDER BY date {order} LIMIT 1").fetchone()
+            for order in ("ASC", "DESC")
+        )
+        return (start[0] if start else None, end[0] if end else None)
+
+    def summarize(self, group_by=None, filters=None, analyzed=True):
+        """
+        Aggregate game counts, outcomes and mistakes.
+
+        Args:
+            group_by: Optional grouping key (see GROUPINGS)
+            filters: Optional dict of filters (see FILTERS)
+            analyzed: Only include games with analysis results
+
+        Returns:
+            list or dict: One summary per group (with a "key" field), or a single summary if not grouped
+        """
+        mistakes = "SUM(a.blunders), SUM(a.inaccuracies)" if analyzed else "0, 0"
+        select = (f"COUNT(*), SUM(g.outcome = 'win'), SUM(g.outcome = 'loss'), "
+                  f"SUM(g.outcome = 'draw'), {mistakes}")
+        where, params = self._where(filters)
+
+        if group_by is None:
+            row = self._conn().execute(f"SELECT {select} FROM {self._from(analyzed)} {where}", params).fetchone()
+            return self._summary(row)
+
+        if group_by not in GROUPINGS:
+            raise ValueError(f"Unknown grouping: {group_by}")
+        expression = GROUPINGS[group_by]
+        rows = self._conn().execute(
+            f"SELECT {expression}, {select} FROM {self._from(analyzed)} {where} "
+            f"GROUP BY {expression} ORDER BY {expression}", params)
+        return [{"key": row[0], **self._summary(row[1:])} for row in rows]
+
+    def analysis_rows(self, game_ids):
+        """
+        Fetch the values summaries aggregate for some analyzed games.
+
+        Args:
+            game_ids: Iterable of game identifiers
+
+        Returns:
+            dict: Game identifier -> {outcome, blunders, inaccuracies, groups: {grouping: key}},
+                for the games that are stored with an analysis result
+        """
+        expressions = ", ".join(GROUPINGS.values())
+        game_ids = list(game_ids)
+        rows = {}
+        conn = self._conn()
+        # Stay well below SQLite's limit on query parameters
+        for start in range(0, len(game_ids), 500):
+            batch = game_ids[start:start + 500]
+            cursor = conn.execute(
+                f"SELECT g.game_id, g.outcome, a.blunders, a.inaccuracies, {expressions} "
+                f"FROM {self._from(True)} WHERE g.game_id IN ({', '.join('?' * len(batch))})", batch)
+            for game_id, outcome, blunders, inaccuracies, *keys in cursor:
+                rows[game_id] = {
+                    "outcome": outcome,
+                    "blunders": blunders or 0,
+                    "inaccuracies": inaccuracies or 0,
+                    "groups": dict(zip(GROUPINGS, keys))
+                }
+        return rows
+
+    def _summary(self, row):
+        """Turn an aggregate row into a summary dictionary."""
+        games, wins, losses, draws, blunders, inaccuracies = (value or 0 for value in row)
+        return {
+            "games": games,
+            "wins": wins,
+            "losses": losses,
+            "draws": draws,
+            "blunders": blunders,
+            "inaccuracies": inaccuracies
+        }
+
+    def _from(self, analyzed):
+        """FROM clause for game queries, joined with analysis results if requested."""
+        if analyzed:
+            return "games g JOIN analysis a ON a.game_id = g.game_id"
+        return "games g"
+
+    def _where(self, filters):
+        """
+        Build a WHERE clause from a filter dictionary.
+
+        Returns:
+            tuple: (SQL clause, parameter list)
+        """
+        conditions = []
+        params = []
+        for name, value in (filters or {}).items():
+            if value is None or value == "" or value == []:
+                continue
+            if name not in FILTERS:
+                raise ValueError(f"Unknown filter: {name}")
+
+            condition, is_list = FILTERS[name]
+            if name in ("start_date", "end_date"):
+                # Dates are stored as in PGN headers (YYYY.MM.DD); accept ISO dates too
+                value = value.replace("-", ".")
+            if is_list:
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                conditions.append(condition.format(", ".join("?" * len(values))))
+                params.extend(values)
+            else:
+                conditions.append(condition)
+                params.append(value)
+
+        return ("WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+    def _insert_games(self, conn, games):
+        """Insert or replace game rows. Returns the number of rows written."""
+        cursor = conn.executemany(
+            "INSERT OR REPLACE INTO games "
+            "(game_id, date, white, black, played_as, opponent, result, outcome, eco, "
+            "time_control, tc_category, num_moves, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (self._game_row(game) for game in games))
+        return cursor.rowcount
+
+    def _insert_analysis(self, conn, results):
+        """Insert or replace analysis rows."""
+        conn.executemany(
+            "INSERT OR REPLACE INTO analysis "
+            "(game_id, blunders, inaccuracies, move_count, engine_settings, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            ((self.key_func(result), result.get("blunders", 0), result.get("inaccuracies", 0),
+              result.get("move_count", 0), result.get("engine_settings"), _to_json(result))
+             for result in results))
+
+    def _game_row(self, game):
+        """Column values for a parsed game."""
+        played_as = game.get("PlayedAs")
+        result = game.get("Result")
+        opponent = game.get("black") if played_as == "White" else game.get("white")
+
+        if result == "1/2-1/2":
+            outcome = "draw"
+        elif (played_as == "White" and result == "1-0") or (played_as == "Black" and result == "0-1"):
+            outcome = "win"
+        elif (played_as == "White" and result == "0-1") or (played_as == "Black" and result == "1-0"):
+            outcome = "loss"
+        else:
+            outcome = None
+
+        time_control = game.get("TimeControl")
+        return (
+            self.key_func(game),
+            game.get("date"),
+            game.get("white"),
+            game.get("black"),
+            played_as,
+            opponent,
+            result,
+            outcome,
+            game.get("ECO"),
+            time_control,
+            categorize_time_control(time_control) if time_control else "unknown",
+            game.get("NumMoves", 0),
+            _to_json(game)
+        )
+
+    def _conn(self):
+        """Connection for the current thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextlib.contextmanager
+    def _write(self):
+        """Write transaction that serializes writers and increments the data version."""
+        with self._write_lock:
+            conn = self._conn()
+            try:
+                yield conn
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+    def _create_schema(self):
+        """Create tables and indexes if needed."""
+        conn = self._conn()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    game_id TEXT PRIMARY KEY,
+                    date TEXT,
+                    white TEXT,
+                    black TEXT,
+                    played_as TEXT,
+                    opponent TEXT,
+                    result TEXT,
+                    outcome TEXT,
+                    eco TEXT,
+                    time_control TEXT,
+                    tc_category TEXT,
+                    num_moves INTEGER,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis (
+                    game_id TEXT PRIMARY KEY,
+                    blunders INTEGER,
+                    inaccuracies INTEGER,
+                    move_count INTEGER,
+                    engine_settings TEXT,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('database_id', ?)",
+                         (secrets.randbits(63),))
+
+            for column in ("date", "eco", "tc_category", "played_as", "result", "num_moves",
+                           "opponent COLLATE NOCASE"):
+                name = column.split()[0]
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_games_{name} ON games ({column})")
+
+def _to_json(record):
+    """Serialize a record or dictionary for the data column."""
+    return json.dumps(record if isinstance(record, dict) else record.to_dict())
@@ -6,100 +6,227 @@ import io
 import json
 import os
 import logging
+import hashlib
+import concurrent.futures
 from ..utils.logging import emoji_log
+from ..utils.journal import RecordJournal
+from .game_store import GameStore
+from .records import GameRecord
+from ..utils.pgn import iter_game_slices, split_game_ranges, decode_game, scan_game
+
+def game_identifier(game):
+    """
+    Create a unique identifier for a game.
+    
+    Args:
+        game: GameRecord, AnalysisRecord or game data dictionary
+        
+    Returns:
+        str: Unique game identifier
+    """
+    # Chess.com puts the same Site on every game, so prefer the game's Link when present
+    site = game.get("link") or game.get("site", "")
+    date = game.get("date", "")
+    white = game.get("white", "")
+    black = game.get("black", "")
+    
+    return f"{site}_{date}_{white}_{black}"
+
+def headers_identifier(headers):
+    """
+    Create the unique identifier of a game from its PGN headers.
+    
+    Matches game_identifier() of the game once it is parsed.
+    
+    Args:
+        headers: PGN headers (chess.pgn.Headers or dict)
+        
+    Returns:
+        str: Unique game identifier
+    """
+    return game_identifier({
+        "link": headers.get("Link", ""),
+        "site": headers.get("Site", "Unknown"),
+        "date": headers.get("Date", "????-??-??"),
+        "white": headers.get("White", "Unknown"),
+        "black": headers.get("Black", "Unknown")
+    })
+
+def _parse_range(pgn_file, start, end, username, fast_scan):
+    """
+    Extract metadata for the games in one byte range of a PGN file.
+    
+    Module-level so it can run in a worker process.
+    
+    Args:
+        pgn_file: Path to the PGN file
+        start: Byte offset of the first game in the range
+        end: Byte offset where the range ends (None for end of file)
+        username: Chess.com username, used to work out which color was played
+        fast_scan: Read headers only instead of replaying moves
+        
+    Returns:
+        list: (GameRecord, {source_file, offset, length}) per game, in file order
+    """
+    parsed = []
+    
+    for offset, raw_game in iter_game_slices(pgn_file, start, end):
+        if fast_scan:
+            # Metadata only: headers plus a ply count from the movetext tokens
+            headers, num_moves = scan_game(decode_game(raw_game))
+        else:
+            game = chess.pgn.read_game(io.StringIO(decode_game(raw_game)))
+            if game is None:
+                continue
+            headers = game.headers
+            num_moves = len(list(game.mainline_moves()))
+        
+        # Extract headers
+        white = headers.get("White", "Unknown")
+        black = headers.get("Black", "Unknown")
+        result = headers.get("Result", "N/A")
+        date = headers.get("Date", "????-??-??")
+        time_control = headers.get("TimeControl", "Unknown")
+        eco = headers.get("ECO", "Unknown")
+        opening = headers.get("Opening", "Unknown")
+        termination = headers.get("Termination", "Unknown")
+        
+        # Determine which color the user played
+        played_as = "White" if white == username else "Black"
+        
+        # Create the game record
+        game_data = GameRecord(
+            white=white,
+            black=black,
+            Result=result,
+            date=date,
+            TimeControl=time_control,
+            ECO=eco,
+            opening=opening,
+            Termination=termination,
+            NumMoves=num_moves,
+            PlayedAs=played_as,
+            source_file=pgn_file,
+            site=headers.get("Site", "Unknown"),
+            link=headers.get("Link", "")
+        )
+        
+        location = {
+            "source_file": pgn_file,
+            "offset": offset,
+            "length": len(raw_game)
+        }
+        parsed.append((game_data, location))
+    
+    return parsed
 
 class GameParser:
     """
     Parses PGN files and extracts game metadata.
     """
     
-    def __init__(self, username, parsed_games_file):
+    # Files smaller than this per worker are parsed in-process
+    MIN_CHUNK_BYTES = 4 * 1024 * 1024
+    
+    def __init__(self, username, parsed_games_file, game_index_file=None, game_store=None, fast_scan=True,
+                 workers=None, parse_state_file=None):
         """
         Initialize with required parameters.
         
         Args:
             username: Chess.com username
-            parsed_games_file: Path to save parsed game data
+            parsed_games_file: Path to the JSON Lines journal of parsed game data
+            game_index_file: Path to save the byte-offset index of games
+            game_store: GameStore that parsed games are written to for querying
+            fast_scan: Read headers and count plies without replaying moves (the default);
+                False builds a full game tree for every game
+            workers: Number of processes used to parse large files (defaults to the CPU count)
+            parse_state_file: Path to save how far each PGN file has been parsed
         """
         self.username = username
+        self.fast_scan = fast_scan
+        self.workers = max(1, workers or os.cpu_count() or 1)
         self.parsed_games_file = parsed_games_file
+        self.game_index_file = game_index_file or os.path.join(
+            os.path.dirname(parsed_games_file), "game_index.json")
+        self.parse_state_file = parse_state_file or os.path.join(
+            os.path.dirname(parsed_games_file), "parse_state.json")
         self.logger = logging.getLogger(__name__)
         
         # Ensure output directory exists
         os.makedirs(os.path.dirname(parsed_games_file), exist_ok=True)
+        
+        # Parsed games are journaled one per line; an old JSON array file is migrated on first use
+        self.journal = RecordJournal(
+            parsed_games_file, game_identifier,
+            legacy_path=os.path.splitext(parsed_games_file)[0] + ".json",
+            record_type=GameRecord)
+        
+        # Indexed copy of the journal that pages query
+        self.game_store = game_store or GameStore(
+            os.path.join(os.path.dirname(parsed_games_file), f"{username}_games.sqlite"), game_identifier)
+        if self.game_store.is_empty() and self.journal.exists():
+            self.game_store.replace_games(self.journal.iter_records())
     
-    def parse_games(self, pgn_file):
+    def parse_games(self, pgn_file, fast_scan=None, incremental=True):
         """
         Parse a PGN file and extract game metadata.
         
+        Archives only ever grow by appending games, so by default only the bytes
+        after the last parsed game are read. The whole file is parsed again if the
+        already-parsed prefix has changed since.
+        
         Args:
             pgn_file: Path to the PGN file
+            fast_scan: Override the parser's scan mode for this call
+            incremental: Parse only games appended since the last call
             
         Returns:
-            list: List of dictionaries with game metadata
+            list: GameRecord per game
         """
         if not os.path.exists(pgn_file):
             emoji_log(self.logger, logging.ERROR, f"PGN file not found: {pgn_file}", "❌")
             return []
             
         games_data = []
+        game_index = {}
         
         try:
-            with open(pgn_file, "r") as file:
-                pgn_text = file.read()
-                
-            pgn_io = io.StringIO(pgn_text)
-            
             # Game counter for logging
             game_count = 0
             
-            while True:
-                game = chess.pgn.read_game(pgn_io)
-                if game is None:
-                    break
-                    
+            if fast_scan is None:
+                fast_scan = self.fast_scan
+            
+            start = self._resume_offset(pgn_file) if incremental else 0
+            end = start
+            
+            for game_data, location in self._parse_ranges(pgn_file, fast_scan, start):
                 game_count += 1
-                
-                # Extract headers
-                headers = game.headers
-                white = headers.get("White", "Unknown")
-                black = headers.get("Black", "Unknown")
-                result = headers.get("Result", "N/A")
-                date = headers.get("Date", "????-??-??")
-                time_control = headers.get("TimeControl", "Unknown")
-                eco = headers.get("ECO", "Unknown")
-                opening = headers.get("Opening", "Unknown")
-                termination = headers.get("Termination", "Unknown")
-                
-                # Determine which color the user played
-                played_as = "White" if white == self.username else "Black"
-                
-                # Count moves
-                num_moves = len(list(game.mainline_moves()))
-                
-                # Create game data dictionary
-                game_data = {
-                    "white": white,
-                    "black": black,
-                    "Result": result,
-                    "date": date,
-                    "TimeControl": time_control,
-                    "ECO": eco,
-                    "opening": opening,
-                    "Termination": termination,
-                    "NumMoves": num_moves,
-                    "PlayedAs": played_as,
-                    "source_file": pgn_file,
-                    "site": headers.get("Site", "Unknown")
-                }
-                
                 games_data.append(game_data)
+                end = location["offset"] + location["length"]
                 
-            emoji_log(self.logger, logging.INFO, f"Parsed {game_count} games from {pgn_file}", "📊")
+                # Remember where the game lives so the analyzer can seek straight to it
+                game_index[game_identifier(game_data)] = location
             
-            # Save parsed data
-            self.save_parsed_data(games_data)
+            if start:
+                emoji_log(self.logger, logging.INFO, 
+                         f"Parsed {game_count} new games from {pgn_file} (from byte {start})", "📊")
+                
+                # Merge the tail into the existing data
+                if games_data:
+                    self.append_to_parsed_data(games_data)
+                    self.save_game_index(game_index)
+                games_data = self.load_parsed_data()
+            else:
+                emoji_log(self.logger, logging.INFO, f"Parsed {game_count} games from {pgn_file}", "📊")
+                
+                # Save parsed data; the new index replaces entries of games no longer in the file
+                self.save_parsed_data(games_data)
+                self.save_game_index(game_index, replace=True)
             
+            if end != start or not start:
+                self._save_parse_state(pgn_file, end)
             return games_data
             
         except Exception as e:
@@ -107,16 +234,136 @@ class GameParser:
             self.logger.exception("Detailed error information:")
             return []
     
+    def _resume_offset(self, pgn_file):
+        """
+        Find where an incremental parse of a file can pick up.
+        
+        Args:
+            pgn_file: Path to the PGN file
+            
+        Returns:
+            int: Byte offset after the last parsed game, or 0 if the file must be parsed in full
+        """
+        state = self._load_parse_state().get(os.path.abspath(pgn_file))
+        if not state or not self.journal.exists():
+            return 0
+        
+        offset = state.get("offset", 0)
+        if offset > os.path.getsize(pgn_file) or self._prefix_checksum(pgn_file, offset) != state.get("checksum"):
+            emoji_log(self.logger, logging.WARNING, 
+                     f"{pgn_file} changed since it was last parsed, parsing it in full", "🔄")
+            return 0
+        return offset
+    
+    def _prefix_checksum(self, pgn_file, length):
+        """
+        Checksum the first bytes of a file.
+        
+        Args:
+            pgn_file: Path to the file
+            length: Number of bytes to include
+            
+        Returns:
+            str: SHA-256 hex digest
+        """
+        digest = hashlib.sha256()
+        remaining = length
+        with open(pgn_file, "rb") as f:
+            while remaining > 0:
+                block = f.read(min(remaining, 1024 * 1024))
+                if not block:
+                    break
+                digest.update(block)
+                remaining -= len(block)
+        return digest.hexdigest()
+    
+    def _load_parse_state(self):
+        """
+        Load the per-file parse progress.
+        
+        Returns:
+            dict: Absolute file path -> {offset, checksum}
+        """
+        if not os.path.exists(self.parse_state_file):
+            return {}
+            
+        try:
+            with open(self.parse_state_file, "r") as state_file:
+                return json.load(state_file)
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING, 
+                     f"Could not read parse state: {str(e)}", "⚠️")
+            return {}
+    
+    def _save_parse_state(self, pgn_file, offset):
+        """
+        Record how far a file has been parsed.
+        
+        Args:
+            pgn_file: Path to the PGN file
+            offset: Byte offset just after the last parsed game
+        """
+        try:
+            state = self._load_parse_state()
+            state[os.path.abspath(pgn_file)] = {
+                "offset": offset,
+                "checksum": self._prefix_checksum(pgn_file, offset)
+            }
+            
+            with open(self.parse_state_file, "w") as state_file:
+                json.dump(state, state_file)
+                
+        except Exception as e:
+            emoji_log(self.logger, logging.ERROR, 
+                     f"Error saving parse state: {str(e)}", "❌")
+    
+    def _parse_ranges(self, pgn_file, fast_scan, start=0):
+        """
+        Parse a PGN file, splitting it across worker processes when it is large enough.
+        
+        Args:
+            pgn_file: Path to the PGN file
+            fast_scan: Read headers only instead of replaying moves
+            start: Byte offset of the first game to parse
+            
+        Returns:
+            list: (GameRecord, location) per game, in file order
+        """
+        size = os.path.getsize(pgn_file) - start
+        workers = min(self.workers, size // self.MIN_CHUNK_BYTES)
+        
+        if workers <= 1:
+            return _parse_range(pgn_file, start, None, self.username, fast_scan)
+        
+        # A few ranges per worker evens out chunks that happen to hold longer games
+        ranges = split_game_ranges(pgn_file, workers * 4, start)
+        emoji_log(self.logger, logging.INFO, 
+                 f"Parsing {len(ranges)} chunks of {pgn_file} on {workers} processes", "⚙️")
+        
+        parsed = []
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_parse_range, pgn_file, start, end, self.username, fast_scan)
+                for start, end in ranges
+            ]
+            # Collect chunks in submission order so games stay in file order
+            for future in futures:
+                parsed.extend(future.result())
+        return parsed
+    
     def save_parsed_data(self, games_data):
         """
-        Save parsed game data to a JSON file.
+        Replace the parsed game journal with a full set of parsed games.
+        
+        The journal is written to a temporary file and renamed into place, so a
+        crash mid-write leaves the previous data intact.
         
         Args:
-            games_data: List of game data dictionaries
+            games_data: List of GameRecords
         """
         try:
-            with open(self.parsed_games_file, "w") as json_file:
-                json.dump(games_data, json_file, indent=4)
+            self.journal.write_all(games_data)
+            self.game_store.replace_games(games_data)
                 
             emoji_log(self.logger, logging.INFO, 
                      f"Saved {len(games_data)} parsed games to {self.parsed_games_file}", "💾")
@@ -125,50 +372,98 @@ class GameParser:
             emoji_log(self.logger, logging.ERROR, 
                      f"Error saving parsed game data: {str(e)}", "❌")
     
+    def save_game_index(self, game_index, replace=False):
+        """
+        Merge byte-offset entries into the persistent game index.
+        
+        Args:
+            game_index: Dictionary of game identifier -> {source_file, offset, length}
+            replace: Drop all existing entries first, e.g. after a full parse
+        """
+        try:
+            index = {} if replace else self.load_game_index()
+            index.update(game_index)
+            
+            with open(self.game_index_file, "w") as index_file:
+                json.dump(index, index_file)
+                
+            emoji_log(self.logger, logging.INFO, 
+                     f"Indexed {len(game_index)} games in {self.game_index_file}", "🗂️")
+                     
+        except Exception as e:
+            emoji_log(self.logger, logging.ERROR, 
+                     f"Error saving game index: {str(e)}", "❌")
+    
+    def load_game_index(self):
+        """
+        Load the persistent game index.
+        
+        Returns:
+            dict: Game identifier -> {source_file, offset, length}
+        """
+        if not os.path.exists(self.game_index_file):
+            return {}
+            
+        try:
+            with open(self.game_index_file, "r") as index_file:
+                return json.load(index_file)
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING, 
+                     f"Could not read game index: {str(e)}", "⚠️")
+            return {}
+    
+    def load_parsed_data(self):
+        """
+        Load all parsed games.
+        
+        Returns:
+            list: GameRecords (empty if nothing parsed yet)
+        """
+        try:
+            return self.journal.load()
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING, 
+                     f"Could not read parsed data: {str(e)}", "⚠️")
+            return []
+    
+    def iter_parsed_data(self):
+        """
+        Stream parsed games without loading the whole journal.
+        
+        Yields:
+            GameRecord: Parsed games
+        """
+        return self.journal.iter_records()
+    
     def append_to_parsed_data(self, new_games_data):
         """
-        Append new parsed game data to existing data file.
+        Append new parsed game data to the journal.
+        
+        Games already in the journal are superseded by the new entries with the same ID.
         
         Args:
-            new_games_data: List of new game data dictionaries
+            new_games_data: List of new GameRecords
             
         Returns:
-            list: Combined game data list
+            list: Combined list of GameRecords
         """
         if not new_games_data:
             return []
             
-        # Read existing data if available
-        existing_data = []
-        if os.path.exists(self.parsed_games_file):
-            try:
-                with open(self.parsed_games_file, "r") as json_file:
-                    existing_data = json.load(json_file)
-            except Exception as e:
-                emoji_log(self.logger, logging.WARNING, 
-                         f"Could not read existing parsed data: {str(e)}", "⚠️")
-        
-        # Combine data (avoiding duplicates)
-        existing_games = {self._game_identifier(game): game for game in existing_data}
-        new_games = {self._game_identifier(game): game for game in new_games_data}
-        
-        # Merge dictionaries (new games will overwrite existing ones with same ID)
-        all_games = {**existing_games, **new_games}
-        combined_data = list(all_games.values())
-        
-        # Save combined data
         try:
-            with open(self.parsed_games_file, "w") as json_file:
-                json.dump(combined_data, json_file, indent=4)
+            self.journal.append(new_games_data)
+            self.journal.compact()
+            self.game_store.upsert_games(new_games_data)
+            combined_data = self.journal.load()
                 
             emoji_log(self.logger, logging.INFO, 
                      f"Updated parsed data with {len(new_games_data)} new games. Total: {len(combined_data)}", "📈")
+            return combined_data
                      
         except Exception as e:
             emoji_log(self.logger, logging.ERROR, 
                      f"Error saving updated parsed data: {str(e)}", "❌")
-        
-        return combined_data
+            return []
     
     def _game_identifier(self, game):
         """
@@ -180,10 +475,4 @@ class GameParser:
         Returns:
             str: Unique game identifier
         """
-        # Combine site, date, white player, black player as unique ID
-        site = game.get("site", "")
-        date = game.get("date", "")
-        white = game.get("white", "")
-        black = game.get("black", "")
-        
-        return f"{site}_{date}_{white}_{black}"
+        return game_identifier(game)
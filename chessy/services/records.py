@@ -0,0 +1,210 @@
+"""
+Compact in-memory records for parsed games and analysis results.
+"""
+import sys
+
+class GameRecord:
+    """
+    Metadata of a parsed game.
+
+    Uses __slots__ instead of a per-game dict, and interns the string fields that
+    repeat across games (player names, results, time controls, ECO codes, ...), so
+    a large archive holds each distinct value once. Records read like the game
+    dictionaries they replace (record.get("ECO"), record["white"]) and are turned
+    into plain dicts only when written out as JSON.
+    """
+
+    # Field names, in the order of the parsed game dictionary
+    FIELDS = ("white", "black", "Result", "date", "TimeControl", "ECO", "opening", "Termination",
+              "NumMoves", "PlayedAs", "source_file", "site", "link")
+
+    __slots__ = FIELDS + ("extra",)
+
+    def __init__(self, white="Unknown", black="Unknown", Result="N/A", date="????-??-??",
+                 TimeControl="Unknown", ECO="Unknown", opening="Unknown", Termination="Unknown",
+                 NumMoves=0, PlayedAs=None, source_file=None, site="Unknown", link="", extra=None):
+        """
+        Initialize a game record.
+
+        Args:
+            white, black, Result, date, TimeControl, ECO, opening, Termination, NumMoves,
+            PlayedAs, source_file, site, link: Game metadata, as in the parsed game dictionary
+            extra: Optional dict of fields not covered above, kept so nothing is lost on rewrite
+        """
+        self.white = _intern(white)
+        self.black = _intern(black)
+        self.Result = _intern(Result)
+        self.date = _intern(date)
+        self.TimeControl = _intern(TimeControl)
+        self.ECO = _intern(ECO)
+        self.opening = _intern(opening)
+        self.Termination = _intern(Termination)
+        self.NumMoves = NumMoves
+        self.PlayedAs = _intern(PlayedAs)
+        self.source_file = _intern(source_file)
+        self.site = _intern(site)
+        self.link = link
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a parsed game dictionary.
+
+        Args:
+            data: Game data dictionary
+
+        Returns:
+            GameRecord: The record
+        """
+        if isinstance(data, cls):
+            return data
+        fields = {name: data[name] for name in cls.FIELDS if name in data}
+        extra = {name: value for name, value in data.items() if name not in fields}
+        return cls(extra=extra, **fields)
+
+    def to_dict(self):
+        """
+        Convert the record to a plain game dictionary.
+
+        Returns:
+            dict: Game data dictionary
+        """
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key, default=None):
+        """Look up a field by its dictionary key."""
+        if key in self.FIELDS:
+            return getattr(self, key)
+        if self.extra:
+            return self.extra.get(key, default)
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def __eq__(self, other):
+        if not isinstance(other, GameRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __reduce__(self):
+        # Rebuild through __init__ so records coming back from parser processes are interned again
+        return (self.__class__, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"GameRecord({self.white} vs {self.black}, {self.date}, {self.Result})"
+
+class AnalysisRecord:
+    """
+    Engine analysis result for a game.
+
+    Refers to the analyzed GameRecord instead of copying its fields, and exposes
+    them through get() and [] alongside the analysis fields, like the merged
+    result dictionaries it replaces.
+    """
+
+    # Analysis fields, in the order of the analysis result dictionary
+    FIELDS = ("blunders", "inaccuracies", "move_count", "engine_settings", "analysis_profile",
+              "classification")
+
+    __slots__ = ("game",) + FIELDS
+
+    def __init__(self, game, blunders=0, inaccuracies=0, move_count=0, engine_settings=None,
+                 analysis_profile=None, classification=None):
+        """
+        Initialize an analysis result.
+
+        Args:
+            game: GameRecord (or game data dictionary) that was analyzed
+            blunders: Number of blunders
+            inaccuracies: Number of inaccuracies
+            move_count: Number of plies examined
+            engine_settings: Engine limit key the game was analyzed with
+            analysis_profile: Name of the analysis profile used
+            classification: Move classification method and thresholds
+        """
+        self.game = GameRecord.from_dict(game)
+        self.blunders = blunders
+        self.inaccuracies = inaccuracies
+        self.move_count = move_count
+        self.engine_settings = _intern(engine_settings)
+        self.analysis_profile = _intern(analysis_profile)
+        self.classification = _intern(classification)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from an analysis result dictionary.
+
+        Args:
+            data: Analysis result dictionary (game fields plus analysis fields)
+
+        Returns:
+            AnalysisRecord: The record
+        """
+        if isinstance(data, cls):
+            return data
+        game = GameRecord.from_dict({name: value for name, value in data.items() if name not in cls.FIELDS})
+        return cls(game, **{name: data[name] for name in cls.FIELDS if name in data})
+
+    def to_dict(self):
+        """
+        Convert the record to a plain analysis result dictionary.
+
+        Optional analysis fields that were never set are left out, as in basic results.
+
+        Returns:
+            dict: Analysis result dictionary
+        """
+        data = self.game.to_dict()
+        for name in self.FIELDS:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def get(self, key, default=None):
+        """Look up an analysis or game field by its dictionary key."""
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.game.get(key, default)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        if key in self.FIELDS:
+            return getattr(self, key) is not None
+        return key in self.game
+
+    def __eq__(self, other):
+        if not isinstance(other, AnalysisRecord):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __reduce__(self):
+        return (self.__class__, tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        return f"AnalysisRecord({self.game!r}, blunders={self.blunders}, inaccuracies={self.inaccuracies})"
+
+# Marker for missing keys, distinct from a stored None
+_MISSING = object()
+
+def _intern(value):
+    """Intern string values so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
@@ -0,0 +1,221 @@
+"""
+Precomputed aggregates of the analyzed games, read by the dashboard pages.
+"""
+import os
+import copy
+import json
+import logging
+import tempfile
+import threading
+from .game_store import GROUPINGS
+from ..utils.logging import emoji_log
+
+# Ranked game lists kept in the summary: name -> query arguments
+TOP_LISTS = {
+    "top_mistakes": {"sort": "mistakes", "limit": 10},
+    "top_inaccuracies": {"sort": "inaccuracies", "limit": 20, "filters": {"min_inaccuracies": 1}},
+}
+
+class GameSummary:
+    """
+    Totals, per-group summaries (see GROUPINGS) and top game lists of the
+    analyzed games, saved as one JSON file.
+
+    The summary records the store version it matches, and the store's database
+    identifier since a recreated database counts versions from 0 again. It is rebuilt with a few
+    aggregate queries at the end of a processing run, updated from the changed
+    games alone when analysis results are saved during a run, and rebuilt on
+    demand if the store changed some other way. Pages read it instead of
+    scanning the store, so they take the same time whatever the number of games.
+    """
+
+    def __init__(self, path, store):
+        """
+        Initialize with the summary location.
+
+        Args:
+            path: Path to the summary JSON file
+            store: GameStore the summary is computed from
+        """
+        self.path = path
+        self.store = store
+        self.logger = logging.getLogger(__name__)
+
+        self._data = None
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def current(self):
+        """
+        Get the summary of the games in the store, rebuilding it if it is out of date.
+
+        Returns:
+            dict: {database_id, version, totals, by_<grouping>..., top lists}; treat it as read-only
+        """
+        with self._lock:
+            version = self.store.version()
+            if not self._matches(self._data, version):
+                # Another process may have brought the file up to date
+                self._data = self._load()
+            if not self._matches(self._data, version):
+                self._data = self._build()
+                self._save()
+            return self._data
+
+    def rebuild(self):
+        """
+        Recompute the whole summary from the store and save it.
+
+        Returns:
+            dict: The new summary
+        """
+        with self._lock:
+            self._data = self._build()
+            self._save()
+        emoji_log(self.logger, logging.INFO,
+                 f"Summarized {self._data['totals']['games']} analyzed games in {self.path}", "📋")
+        return self._data
+
+    def snapshot(self, game_ids):
+        """
+        Record the stored state of some games before their analysis results are written.
+
+        Args:
+            game_ids: Identifiers of the games about to be written
+
+        Returns:
+            tuple: Snapshot to pass to update() once the write is done
+        """
+        game_ids = list(game_ids)
+        return self.store.version(), game_ids, self.store.analysis_rows(game_ids)
+
+    def update(self, snapshot):
+        """
+        Bring the summary up to date after one write of analysis results.
+
+        Only the written games are aggregated again. If the summary wasn't current
+        before the write, or the store changed in between, it is rebuilt instead.
+
+        Args:
+            snapshot: Result of snapshot() taken just before the write
+        """
+        version, game_ids, old_rows = snapshot
+        with self._lock:
+            # Work on a copy; callers may still be reading the current summary
+            data = copy.deepcopy(self._data) if self._data is not None else self._load()
+            if not self._matches(data, version) or self.store.version() != version + 1:
+                self._data = self._build()
+                self._save()
+                return
+
+            new_rows = self.store.analysis_rows(game_ids)
+            for rows, sign in ((old_rows, -1), (new_rows, 1)):
+                for row in rows.values():
+                    _add(data["totals"], row, sign)
+                    for grouping, key in row["groups"].items():
+                        _add_to_group(data["by_" + grouping], key, row, sign)
+
+            for name, query in TOP_LISTS.items():
+                if self._top_list_changed(data[name], query, game_ids, new_rows):
+                    data[name] = self.store.query_games(analyzed=True, **query)
+
+            data["version"] = version + 1
+            self._data = data
+            self._save()
+
+    def clear(self):
+        """Remove the saved summary."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._data = None
+
+    def _build(self):
+        """Compute the summary from the store."""
+        # Read the version first: a write during the build leaves the summary marked out of date
+        data = {"database_id": self.store.database_id(), "version": self.store.version(),
+                "totals": self.store.summarize()}
+        for grouping in GROUPINGS:
+            data["by_" + grouping] = self.store.summarize(group_by=grouping)
+        for name, query in TOP_LISTS.items():
+            data[name] = self.store.query_games(analyzed=True, **query)
+        return data
+
+    def _matches(self, data, version):
+        """Check whether a summary was computed from this database at the given version."""
+        return (data is not None and data["version"] == version and
+                data.get("database_id") == self.store.database_id())
+
+    def _top_list_changed(self, games, query, game_ids, new_rows):
+        """Check whether written games may move in or out of a top list."""
+        listed = {self.store.key_func(game) for game in games}
+        if listed.intersection(game_ids):
+            return True
+
+        score = _SCORES[query["sort"]]
+        minimum = (query.get("filters") or {}).get("min_inaccuracies", 0)
+        lowest = min((score(game) for game in games), default=0)
+        for row in new_rows.values():
+            if row["inaccuracies"] < minimum:
+                continue
+            if len(games) < query["limit"] or score(row) >= lowest:
+                return True
+        return False
+
+    def _load(self):
+        """Read the saved summary, or None if it is missing or unreadable."""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING, f"Could not read game summary: {str(e)}", "⚠️")
+            return None
+
+    def _save(self):
+        """Write the summary through a temporary file. Caller holds the lock."""
+        directory = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+# Sort key -> ranking score of a game, matching the store's SORT_KEYS
+_SCORES = {
+    "mistakes": lambda game: game.get("blunders", 0) + game.get("inaccuracies", 0),
+    "inaccuracies": lambda game: game.get("inaccuracies", 0),
+}
+
+# Game outcome -> summary field counting it
+_OUTCOME_FIELDS = {"win": "wins", "loss": "losses", "draw": "draws"}
+
+def _add(summary, row, sign):
+    """Add (sign 1) or remove (sign -1) one game's values in a summary."""
+    summary["games"] += sign
+    if row["outcome"] in _OUTCOME_FIELDS:
+        summary[_OUTCOME_FIELDS[row["outcome"]]] += sign
+    summary["blunders"] += sign * row["blunders"]
+    summary["inaccuracies"] += sign * row["inaccuracies"]
+
+def _add_to_group(groups, key, row, sign):
+    """Add or remove one game's values in a list of group summaries, keeping it ordered by key."""
+    for index, group in enumerate(groups):
+        if group["key"] == key:
+            _add(group, row, sign)
+            if group["games"] <= 0:
+                del groups[index]
+            return
+
+    if sign > 0:
+        group = {"key": key, "games": 0, "wins": 0, "losses": 0, "draws": 0, "blunders": 0, "inaccuracies": 0}
+        _add(group, row, sign)
+        groups.append(group)
+        # NULL keys sort first, as in the store's GROUP BY ... ORDER BY
+        groups.sort(key=lambda group: (group["key"] is not None, group["key"]))
@@ -0,0 +1,221 @@
+"""
+Append-only JSON Lines journal for game records.
+"""
+import os
+import json
+import logging
+import tempfile
+import threading
+from .logging import emoji_log
+
+class RecordJournal:
+    """
+    Stores one JSON record per line. Updates are appended, and the latest record
+    for a key wins. The file is compacted once superseded records pile up.
+    """
+
+    def __init__(self, path, key_func, legacy_path=None, compact_ratio=2.0, record_type=None):
+        """
+        Initialize with the journal location.
+
+        Args:
+            path: Path to the .jsonl journal file
+            key_func: Function mapping a record to its unique key
+            legacy_path: Optional path to an old JSON array file migrated on first use
+            compact_ratio: Compact when the journal holds this many lines per unique record
+            record_type: Optional class with from_dict() and to_dict() that records are
+                loaded as and written from, instead of plain dictionaries
+        """
+        self.path = path
+        self.key_func = key_func
+        self.legacy_path = legacy_path
+        self.compact_ratio = compact_ratio
+        self.record_type = record_type
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._migrate_legacy()
+
+    def exists(self):
+        """Check whether the journal holds any records."""
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def append(self, records):
+        """
+        Append records to the journal, superseding earlier records with the same key.
+
+        Args:
+            records: Iterable of records
+        """
+        lines = "".join(self._encode(record) + "\n" for record in records)
+        if not lines:
+            return
+
+        with self._lock:
+            # Start on a fresh line if an interrupted append left a torn record behind
+            if not self._ends_with_newline():
+                lines = "\n" + lines
+
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def write_all(self, records):
+        """
+        Replace the journal contents atomically.
+
+        Args:
+            records: Iterable of records
+        """
+        with self._lock:
+            self._write_atomic(records)
+
+    def iter_records(self):
+        """
+        Stream the current record for each key.
+
+        Runs two passes over the file: the first finds the last line for every key,
+        the second yields only those lines, so records are never all held in memory.
+
+        Yields:
+            Records, in the order they were last written
+        """
+        latest = {}
+        for line_number, record in self._iter_lines():
+            latest[self.key_func(record)] = line_number
+
+        wanted = set(latest.values())
+        del latest
+
+        for line_number, record in self._iter_lines():
+            if line_number in wanted:
+                yield record
+
+    def load(self):
+        """
+        Load the current record for each key.
+
+        Returns:
+            list: Records, in the order they were last written
+        """
+        return list(self._latest().values())
+
+    def keys(self):
+        """
+        Collect the keys of all records in the journal.
+
+        Returns:
+            set: Record keys
+        """
+        return {self.key_func(record) for _, record in self._iter_lines()}
+
+    def compact(self, force=False):
+        """
+        Rewrite the journal with only the current record for each key.
+
+        Args:
+            force: Compact even if the journal holds few superseded records
+
+        Returns:
+            bool: True if the journal was rewritten
+        """
+        with self._lock:
+            lines = sum(1 for _ in self._iter_lines())
+            records = self._latest()
+
+            if not force and lines <= max(1, len(records)) * self.compact_ratio:
+                return False
+
+            self._write_atomic(records.values())
+
+        emoji_log(self.logger, logging.INFO,
+                 f"Compacted {os.path.basename(self.path)}: {lines} lines -> {len(records)} records", "🗜️")
+        return True
+
+    def _latest(self):
+        """Map each key to its last written record, ordered by when that record was written."""
+        records = {}
+        for _, record in self._iter_lines():
+            key = self.key_func(record)
+            records.pop(key, None)
+            records[key] = record
+        return records
+
+    def _iter_lines(self):
+        """
+        Stream (line number, record) pairs, skipping blank and unreadable lines.
+
+        A torn final line from an interrupted append is skipped, not fatal.
+        """
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if not isinstance(record, dict):
+                    self.logger.warning(f"Skipping unreadable line {line_number + 1} in {self.path}")
+                    continue
+                if self.record_type is not None:
+                    record = self.record_type.from_dict(record)
+                yield line_number, record
+
+    def _ends_with_newline(self):
+        """Check whether the journal is empty or its last line is complete. Caller holds the lock."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return True
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _encode(self, record):
+        """Serialize a record as a single JSON line."""
+        if not isinstance(record, dict):
+            record = record.to_dict()
+        return json.dumps(record)
+
+    def _write_atomic(self, records):
+        """Write records to a temporary file and rename it over the journal. Caller holds the lock."""
+        directory = os.path.dirname(self.path) or "."
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(self._encode(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def _migrate_legacy(self):
+        """
+        Convert an old JSON array file into the journal if no journal exists yet.
+
+        The old file is kept next to the journal with a .bak suffix.
+        """
+        if not self.legacy_path or os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            self._write_atomic(records)
+            backup_path = self.legacy_path + ".bak"
+            os.replace(self.legacy_path, backup_path)
+            emoji_log(self.logger, logging.INFO,
+                     f"Migrated {len(records)} records from {self.legacy_path} to {self.path} "
+                     f"(original kept as {backup_path})", "📦")
+        except Exception as e:
+            emoji_log(self.logger, logging.WARNING,
+                     f"Could not migrate {self.legacy_path}: {str(e)}", "⚠️")
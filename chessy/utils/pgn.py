@@ -0,0 +1,312 @@
+"""
+Low-level PGN file helpers for locating individual games by byte offset and
+reading game metadata without replaying moves.
+"""
+import io
+import os
+import re
+import mmap
+import chess.pgn
+
+# A PGN tag pair line, e.g. [Event "Live Chess"]
+TAG_LINE = re.compile(rb'^\s*\[[A-Za-z0-9_]+\s+"')
+
+# First tag pair of a chess.com game, used to align split points on game boundaries
+EVENT_LINE = b'[Event "'
+
+# A complete tag pair with its (possibly escaped) value
+TAG_PAIR = re.compile(r'^\s*\[([A-Za-z0-9_]+)\s+"((?:[^"\\]|\\.)*)"\s*\]', re.MULTILINE)
+
+# Movetext tokens: comments, variation brackets and everything else split on whitespace
+MOVETEXT_TOKEN = re.compile(r"\{[^}]*\}?|;[^\n]*|[()]|[^\s(){};]+")
+
+# Move number prefix glued to a move, e.g. "12." in "12.Nf3" or "12..." in "12...Nf3"
+MOVE_NUMBER = re.compile(r"^\d+\.+")
+
+# Game termination marker at the end of the movetext
+GAME_RESULT = re.compile(r"(1-0|0-1|1/2-1/2|\*)\s*$")
+
+# A SAN move (or null move), ignoring annotation suffixes
+SAN_MOVE = re.compile(r"^(?:[KQRBN]?[a-h]?[1-8]?x?[a-h][1-8](?:=?[QRBN])?|O-O(?:-O)?|0-0(?:-0)?|--|Z0)[+#]?[!?]*$")
+
+class PGNReader:
+    """
+    Memory-mapped view of a PGN file that hands out games lazily.
+    
+    Only the game being looked at is copied out of the map, so memory use stays
+    flat however large the archive is. Reads are safe to share between threads.
+    """
+    
+    def __init__(self, pgn_file):
+        """
+        Map a PGN file for reading.
+        
+        Args:
+            pgn_file: Path to the PGN file
+        """
+        self.pgn_file = pgn_file
+        self._file = open(pgn_file, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        
+        # mmap can't map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Unmap and close the file."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+    
+    def iter_slices(self, start=0, end=None):
+        """
+        Yield the raw bytes of each game together with its byte offset.
+        
+        A new game starts at the first tag pair line that follows movetext, so games
+        can be located without replaying any moves.
+        
+        Args:
+            start: Byte offset to start reading at (must be a game boundary)
+            end: Optional byte offset; games starting at or after it are left out
+            
+        Yields:
+            tuple: (offset, raw game bytes)
+        """
+        data = self._map
+        size = self.size
+        offset = start
+        game_start = None
+        in_movetext = False
+        comment_depth = 0
+        
+        while offset < size:
+            newline = data.find(b"\n", offset)
+            line_end = size if newline == -1 else newline + 1
+            line = data[offset:line_end]
+            
+            if comment_depth == 0 and TAG_LINE.match(line):
+                if game_start is None or in_movetext:
+                    # Tag pair after movetext: a new game begins here
+                    if game_start is not None:
+                        yield game_start, data[game_start:offset]
+                    if end is not None and offset >= end:
+                        return
+                    game_start = offset
+                    in_movetext = False
+            elif game_start is not None and line.strip():
+                in_movetext = True
+                # Track {...} comments so bracketed text inside them is not mistaken for tags
+                comment_depth = max(0, comment_depth + line.count(b"{") - line.count(b"}"))
+            
+            offset = line_end
+        
+        if game_start is not None and game_start < size:
+            yield game_start, data[game_start:size]
+    
+    def iter_games(self, start=0, end=None):
+        """
+        Yield each game parsed into a chess.pgn.Game.
+        
+        Args:
+            start: Byte offset to start reading at (must be a game boundary)
+            end: Optional byte offset; games starting at or after it are left out
+            
+        Yields:
+            chess.pgn.Game: Parsed games (unreadable games are skipped)
+        """
+        for _, raw in self.iter_slices(start, end):
+            game = chess.pgn.read_game(io.StringIO(decode_game(raw)))
+            if game is not None:
+                yield game
+    
+    def read_slice(self, offset, length):
+        """
+        Copy the raw bytes of a single game out of the map.
+        
+        Args:
+            offset: Byte offset of the game
+            length: Length of the game in bytes
+            
+        Returns:
+            bytes: Raw game bytes
+        """
+        return self._map[offset:offset + length]
+    
+    def read_game(self, offset, length):
+        """
+        Parse a single game stored at a known byte offset.
+        
+        Args:
+            offset: Byte offset of the game
+            length: Length of the game in bytes
+            
+        Returns:
+            chess.pgn.Game or None: The parsed game
+        """
+        return chess.pgn.read_game(io.StringIO(decode_game(self.read_slice(offset, length))))
+    
+    def count_games(self):
+        """
+        Count the games in the file.
+        
+        Returns:
+            int: Number of games
+        """
+        return sum(1 for _ in self.iter_slices())
+
+def iter_game_slices(pgn_file, start=0, end=None):
+    """
+    Yield the raw bytes of each game in a PGN file together with its byte offset.
+    
+    Args:
+        pgn_file: Path to the PGN file
+        start: Byte offset to start reading at (must be a game boundary)
+        end: Optional byte offset; games starting at or after it are left out
+        
+    Yields:
+        tuple: (offset, raw game bytes)
+    """
+    with PGNReader(pgn_file) as reader:
+        yield from reader.iter_slices(start, end)
+
+def split_game_ranges(pgn_file, parts, start=0):
+    """
+    Split a PGN file into roughly equal byte ranges that start on game boundaries.
+    
+    Boundaries are placed at the first [Event " line at or after each split point.
+    
+    Args:
+        pgn_file: Path to the PGN file
+        parts: Number of ranges wanted
+        start: Byte offset to split from (must be a game boundary)
+        
+    Returns:
+        list: (start, end) byte offsets covering the file from start to the end
+    """
+    size = os.path.getsize(pgn_file)
+    boundaries = [start]
+    
+    with open(pgn_file, "rb") as f:
+        for part in range(1, parts):
+            target = max(start + (size - start) * part // parts, boundaries[-1])
+            f.seek(target)
+            if target > 0:
+                # Skip the rest of the line the split point landed in
+                f.readline()
+            
+            position = f.tell()
+            for line in iter(f.readline, b""):
+                if line.startswith(EVENT_LINE):
+                    break
+                position += len(line)
+            else:
+                break
+            
+            if position > boundaries[-1]:
+                boundaries.append(position)
+    
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+def decode_game(raw):
+    """
+    Decode the raw bytes of a single game.
+
+    Args:
+        raw: Raw game bytes
+
+    Returns:
+        str: Game PGN text
+    """
+    return raw.decode("utf-8", errors="replace")
+
+def read_game_at(pgn_file, offset, length):
+    """
+    Read and parse a single game stored at a known byte offset.
+
+    Args:
+        pgn_file: Path to the PGN file
+        offset: Byte offset of the game
+        length: Length of the game in bytes
+
+    Returns:
+        chess.pgn.Game or None: The parsed game
+    """
+    with PGNReader(pgn_file) as reader:
+        return reader.read_game(offset, length)
+
+def scan_game(text):
+    """
+    Read the headers of a game and count its plies without replaying any moves.
+    
+    Much cheaper than chess.pgn.read_game for metadata: no boards are built and
+    moves aren't checked for legality.
+    
+    Args:
+        text: Game PGN text
+        
+    Returns:
+        tuple: (chess.pgn.Headers, number of mainline plies)
+    """
+    headers, movetext_start = scan_headers(text)
+    movetext = text[movetext_start:]
+    
+    # Like chess.pgn, fall back to the game termination marker for an unknown result
+    if headers.get("Result", "*") == "*":
+        result = GAME_RESULT.search(movetext)
+        if result:
+            headers["Result"] = result.group(1)
+    
+    return headers, count_plies(movetext)
+
+def scan_headers(text):
+    """
+    Read the tag pairs at the start of a game.
+    
+    Args:
+        text: Game PGN text
+        
+    Returns:
+        tuple: (chess.pgn.Headers, offset where the movetext starts)
+    """
+    headers = chess.pgn.Headers()
+    movetext_start = 0
+    
+    for match in TAG_PAIR.finditer(text):
+        # Tag pairs only appear before the movetext
+        if text[movetext_start:match.start()].strip():
+            break
+        headers[match.group(1)] = match.group(2)
+        movetext_start = match.end()
+    
+    return headers, movetext_start
+
+def count_plies(movetext):
+    """
+    Count the mainline moves in PGN movetext.
+    
+    Args:
+        movetext: Movetext following the tag pairs
+        
+    Returns:
+        int: Number of plies, not counting moves inside variations
+    """
+    plies = 0
+    depth = 0
+    
+    for token in MOVETEXT_TOKEN.findall(movetext):
+        if token[0] in "{;":
+            continue
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth = max(0, depth - 1)
+        elif depth == 0 and SAN_MOVE.match(MOVE_NUMBER.sub("", token)):
+            plies += 1
+    
+    return plies
@@ -0,0 +1,164 @@
+"""
+Rate limiting and retries for outbound Chess.com API requests.
+"""
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import requests
+from .logging import emoji_log
+
+# Longest single wait between retries (seconds), also the cap on a Retry-After wait
+MAX_BACKOFF = 60
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every thread that talks to the API.
+
+    Tokens refill at a steady rate up to the bucket capacity; each request takes
+    one. A pause (e.g. from a Retry-After header) holds back all threads at once.
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Initialize the bucket full.
+
+        Args:
+            rate: Requests per second allowed on average
+            capacity: Largest burst of back-to-back requests (defaults to one second's worth)
+        """
+        self.rate = max(rate, 0.001)
+        self.capacity = max(1.0, capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    # Tokens only build up again once a pause is over
+                    refill_from = max(self._updated, self._paused_until)
+                    self._tokens = min(self.capacity, self._tokens + (now - refill_from) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Hold back all requests for a while.
+
+        Args:
+            seconds: How long to wait before the next request
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            # Resume at the steady rate rather than with a burst
+            self._tokens = 0.0
+
+def retry_after_seconds(response):
+    """
+    Read the Retry-After header of a response.
+
+    Args:
+        response: requests.Response
+
+    Returns:
+        float or None: Seconds to wait, or None if the header is missing or unreadable
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt, base_delay):
+    """
+    Jittered exponential backoff delay ("full jitter").
+
+    Args:
+        attempt: Number of the retry, starting at 0
+        base_delay: Delay scale in seconds
+
+    Returns:
+        float: Seconds to wait before retrying
+    """
+    return random.uniform(0, min(MAX_BACKOFF, base_delay * 2 ** attempt))
+
+def get_with_retries(session, url, limiter, max_retries, retry_delay, logger=None, **kwargs):
+    """
+    GET a URL through a rate limiter, retrying throttled and failed requests.
+
+    429 and 5xx responses and connection errors are retried up to max_retries
+    times. A Retry-After header is honored, up to MAX_BACKOFF seconds, and pauses
+    every thread sharing the limiter; otherwise the wait is a jittered exponential backoff.
+
+    Args:
+        session: requests.Session (or the requests module) used to send the request
+        url: URL to fetch
+        limiter: TokenBucket shared by all API requests
+        max_retries: Number of retries before giving up
+        retry_delay: Base delay of the exponential backoff in seconds
+        logger: Optional logger for retry warnings
+        **kwargs: Passed through to session.get()
+
+    Returns:
+        requests.Response: Successful (or non-retryable client error) response
+
+    Raises:
+        requests.exceptions.RequestException: If the request still fails after all retries
+    """
+    logger = logger or logging.getLogger(__name__)
+    attempt = 0
+    while True:
+        limiter.acquire()
+        retry_after = None
+        try:
+            response = session.get(url, **kwargs)
+            if response.status_code != 429 and response.status_code < 500:
+                return response
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                # A bogus header must not hold the downloads back for hours
+                retry_after = min(retry_after, MAX_BACKOFF)
+            error = requests.exceptions.HTTPError(
+                f"{response.status_code} response for {url}", response=response)
+            # Release the connection of a streamed response before trying again
+            response.close()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+
+        if attempt >= max_retries:
+            raise error
+
+        attempt += 1
+        if retry_after is not None:
+            # The limiter holds this and every other thread back until the server is ready
+            limiter.pause(retry_after)
+            emoji_log(logger, logging.WARNING,
+                     f"Request throttled, retry {attempt}/{max_retries} in {retry_after:.1f}s (Retry-After)", "⏳")
+        else:
+            delay = backoff_delay(attempt - 1, retry_delay)
+            emoji_log(logger, logging.WARNING,
+                     f"Request failed ({str(error)}), retry {attempt}/{max_retries} in {delay:.1f}s", "⏳")
+            time.sleep(delay)
@@ -17,6 +17,7 @@ setup(
     entry_points={
         "console_scripts": [
             "chessy-server=chessy.server:main",
+            "chessy-compact-archive=chessy.compact_archive:main",
         ],
     },
     python_requires=">=3.8",
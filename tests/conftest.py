@@ -0,0 +1,28 @@
+"""
+Shared pytest fixtures.
+"""
+import os
+import importlib
+import pytest
+from chessy.config import Config
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    """Application configuration with all output files under a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CHESSCOM_USERNAME", "tester")
+    monkeypatch.delenv("STOCKFISH_PATH", raising=False)
+    return Config()
+
+@pytest.fixture(scope="session")
+def server(tmp_path_factory):
+    """The chessy.server module, imported with its output files under a temporary directory."""
+    directory = tmp_path_factory.mktemp("server")
+    previous = os.getcwd()
+    os.chdir(directory)
+    try:
+        module = importlib.import_module("chessy.server")
+        module.app.config["TESTING"] = True
+        yield module
+    finally:
+        os.chdir(previous)
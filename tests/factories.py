@@ -0,0 +1,82 @@
+"""
+Sample games and analysis results for the tests.
+"""
+import random
+import chess
+import chess.pgn
+from chessy.services.records import AnalysisRecord, GameRecord
+
+OPPONENTS = ("alice", "bob", "carol")
+TIME_CONTROLS = ("60", "180+2", "600")
+RESULTS = ("1-0", "0-1", "1/2-1/2")
+
+def make_game(number, **fields):
+    """Build a parsed game; fields vary with the number unless given."""
+    played_as = "White" if number % 2 else "Black"
+    opponent = OPPONENTS[number % len(OPPONENTS)]
+    values = {
+        "white": "tester" if played_as == "White" else opponent,
+        "black": opponent if played_as == "White" else "tester",
+        "Result": RESULTS[number % len(RESULTS)],
+        "date": f"2020.{number % 12 + 1:02d}.{number % 28 + 1:02d}",
+        "TimeControl": TIME_CONTROLS[number % len(TIME_CONTROLS)],
+        "ECO": f"B{number % 5:02d}",
+        "NumMoves": 20 + number,
+        "PlayedAs": played_as,
+        "site": "Chess.com",
+        "link": f"https://www.chess.com/game/live/{number}",
+    }
+    values.update(fields)
+    return GameRecord(**values)
+
+def make_analysis(game, blunders=0, inaccuracies=0):
+    """Build an analysis result for a game."""
+    return AnalysisRecord(game, blunders=blunders, inaccuracies=inaccuracies, move_count=game.get("NumMoves"))
+
+def make_pgn(number, username="tester"):
+    """
+    Build the PGN text of a legal random game, exported the way Chess.com does.
+
+    Moves carry [%clk] comments, which hold bracketed text that must not be taken
+    for tag pairs. Some games add a variation or a NAG.
+    """
+    rng = random.Random(number)
+    game = chess.pgn.Game()
+    opponent = OPPONENTS[number % len(OPPONENTS)]
+    white, black = (username, opponent) if number % 2 else (opponent, username)
+    game.headers.update({
+        "Event": "Live Chess",
+        "Site": "Chess.com",
+        "Date": f"2020.{number % 12 + 1:02d}.{number % 28 + 1:02d}",
+        "White": white,
+        "Black": black,
+        "TimeControl": TIME_CONTROLS[number % len(TIME_CONTROLS)],
+        "ECO": f"B{number % 5:02d}",
+        "Termination": f"{white} won on time",
+        "Link": f"https://www.chess.com/game/live/{number}",
+    })
+
+    node = game
+    board = game.board()
+    for ply in range(rng.randint(1, 60)):
+        moves = list(board.legal_moves)
+        if not moves:
+            break
+        move = rng.choice(moves)
+        if number % 3 == 0 and ply == 4 and len(moves) > 1:
+            # A side line, whose moves must not count towards the mainline
+            side = node.add_variation(rng.choice([other for other in moves if other != move]))
+            side.comment = "[%clk 0:00:59]"
+        node = node.add_main_variation(move, comment=f"[%clk 0:0{ply % 10}:{rng.randint(10, 59)}]")
+        if number % 4 == 0 and ply == 2:
+            node.nags.add(chess.pgn.NAG_DUBIOUS_MOVE)
+        board.push(move)
+
+    game.headers["Result"] = board.result(claim_draw=True) if board.is_game_over() else rng.choice(RESULTS)
+    return str(game) + "\n\n"
+
+def write_pgn(path, numbers, mode="w"):
+    """Write (or append) the games with the given numbers to a PGN file."""
+    with open(path, mode, encoding="utf-8") as f:
+        for number in numbers:
+            f.write(make_pgn(number))
@@ -0,0 +1,349 @@
+"""
+Tests for the game analyzer's engine settings and move classification.
+"""
+import os
+import math
+from collections import Counter
+import chess
+import chess.engine
+import pytest
+from chessy.services import ChessyService
+from chessy.services.analyzer import GameAnalyzer
+from chessy.services.engine_pool import EnginePool
+from chessy.services.game_store import GameStore
+from chessy.services.parser import GameParser, game_identifier
+from chessy.services.records import AnalysisRecord
+from .factories import make_game, write_pgn
+
+GAME = {"link": "https://www.chess.com/game/live/1", "site": "Chess.com", "date": "2020.01.01",
+        "white": "tester", "black": "opponent"}
+
+class FakeEngine:
+    """Engine returning fixed evaluations (White's centipawns) per position and limit."""
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.calls = []
+
+    def analyse(self, board, limit):
+        self.calls.append((board.fen(), limit))
+        centipawns = self.scores(board, limit)
+        return {"score": chess.engine.PovScore(chess.engine.Cp(centipawns), chess.WHITE)}
+
+    def quit(self):
+        pass
+
+def game_positions(moves):
+    """The starting position followed by the position after each move."""
+    board = chess.Board()
+    positions = [board.copy()]
+    for move in moves:
+        board.push_san(move)
+        positions.append(board.copy())
+    return positions
+
+def centipawns(win_percent):
+    """White's centipawns giving a winning chance, the inverse of _white_win_percent."""
+    return round(math.log(100 / win_percent - 1) / -0.00368208)
+
+class DictCache:
+    """In-memory stand-in for the evaluation cache."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, board, settings):
+        return self.entries.get((board.fen(), settings))
+
+    def put(self, board, settings, info):
+        self.entries[(board.fen(), settings)] = info
+
+@pytest.fixture
+def analyzer(config):
+    return GameAnalyzer(config)
+
+@pytest.fixture
+def pipeline(config, monkeypatch, tmp_path):
+    """Service over an archive of 60 games, analyzed on fake engines."""
+    config.STOCKFISH_PATH = str(tmp_path / "stockfish")
+    open(config.STOCKFISH_PATH, "w").close()
+    os.makedirs(os.path.dirname(config.ARCHIVE_FILE), exist_ok=True)
+    write_pgn(config.ARCHIVE_FILE, range(60))
+
+    monkeypatch.setattr(EnginePool, "_spawn", lambda pool: FakeEngine(lambda board, limit: 0))
+
+    store = GameStore(config.GAME_DB_FILE, game_identifier)
+    parser = GameParser(config.USERNAME, config.PARSED_GAMES_FILE, config.GAME_INDEX_FILE, game_store=store)
+    analyzer = GameAnalyzer(config, game_store=store)
+    analyzer.checkpoint_interval = 10
+    return ChessyService(None, parser, analyzer, config)
+
+def journal_lines(analyzer):
+    """Number of records written to the analysis journal."""
+    with open(analyzer.analysis_file, "r", encoding="utf-8") as f:
+        return sum(1 for line in f if line.strip())
+
+@pytest.mark.parametrize("profile, full_cached, scan_cached", [
+    ("fast", True, True),
+    ("standard", True, True),
+    ("deep", True, True),
+])
+def test_only_reproducible_limits_are_cached(analyzer, profile, full_cached, scan_cached):
+    analyzer.set_profile(profile)
+    assert analyzer.engine_options["Threads"] == 1
+    assert (analyzer.analysis_cache_key is not None) == full_cached
+    assert (analyzer.scan_cache_key is not None) == scan_cached
+
+def test_multithreaded_limits_are_not_cached(analyzer):
+    assert analyzer._cache_key({"nodes": 1000}, threads=1) == "nodes=1000"
+    assert analyzer._cache_key({"nodes": 1000}, threads=2) is None
+    assert analyzer._cache_key({"time": 0.1}, threads=1) is None
+    assert analyzer._cache_key({"depth": 18, "time": 0.1}, threads=2) is None
+
+def test_time_capped_depth_limit_caches_only_complete_searches(analyzer):
+    analyzer.set_profile("standard")
+    assert analyzer.analysis_cache_key == f"depth={analyzer.analysis_limit.depth}"
+    assert analyzer.analysis_limit.time is not None
+    analyzer.eval_cache = DictCache()
+    reached = {}
+
+    class DepthEngine(FakeEngine):
+        def analyse(self, board, limit):
+            info = super().analyse(board, limit)
+            info["depth"] = reached[board.fen()]
+            return info
+
+    engine = DepthEngine(lambda board, limit: 30)
+    complete, cut_short = game_positions(["e4"])
+    reached[complete.fen()] = analyzer.analysis_limit.depth
+    reached[cut_short.fen()] = analyzer.analysis_limit.depth - 4
+
+    for board in (complete, cut_short, complete, cut_short):
+        analyzer._evaluate(engine, board, analyzer.analysis_limit, analyzer.analysis_cache_key)
+    # The complete search was answered from the cache the second time, the cut-short one was not
+    assert [fen for fen, _ in engine.calls] == [complete.fen(), cut_short.fen(), cut_short.fen()]
+    assert list(analyzer.eval_cache.entries) == [(complete.fen(), analyzer.analysis_cache_key)]
+
+def test_evaluate_bypasses_cache_without_key(analyzer):
+    engine = FakeEngine(lambda board, limit: 30)
+    analyzer.eval_cache = DictCache()
+    board = chess.Board()
+    limit = chess.engine.Limit(depth=1)
+
+    analyzer._evaluate(engine, board, limit, None)
+    analyzer._evaluate(engine, board, limit, None)
+    assert len(engine.calls) == 2
+    assert analyzer.eval_cache.entries == {}
+
+    analyzer._evaluate(engine, board, limit, "depth=1")
+    analyzer._evaluate(engine, board, limit, "depth=1")
+    assert len(engine.calls) == 3
+
+def test_adaptive_rechecks_moves_near_either_threshold(analyzer):
+    analyzer.set_profile("standard")
+    positions = game_positions(["e4", "e5", "Nf3", "Nc6", "Bb5"])
+    fens = [board.fen() for board in positions]
+    # White's winning chances per position, from the scan and from the full budget
+    scan_wins = [50, 50, 72, 72, 30, 1]
+    full_wins = [50, 45, 60, 72, 30, 1]
+
+    def scores(board, limit):
+        wins = scan_wins if limit == analyzer.scan_limit else full_wins
+        return centipawns(wins[fens.index(board.fen())])
+
+    engine = FakeEngine(scores)
+    game_stats = Counter()
+    win_losses = analyzer._adaptive_win_losses(engine, positions, game_stats)
+
+    # Black's 22-point loss sits just above the blunder threshold, so it is re-checked,
+    # and scored from full-budget evaluations on both sides of the move
+    assert win_losses[1] == pytest.approx(60 - 45, abs=0.1)
+    # White's 29-point loss is well past both thresholds and keeps its scan score
+    assert win_losses[3] == pytest.approx(30 - 72, abs=0.1)
+    assert win_losses[4] == pytest.approx(30 - 1, abs=0.1)
+    assert game_stats == Counter({"plies": 5, "escalated": 1})
+
+    full_fens = {fen for fen, limit in engine.calls if limit == analyzer.analysis_limit}
+    assert full_fens == {fens[1], fens[2]}
+
+@pytest.mark.parametrize("score, expected", [
+    (chess.engine.PovScore(chess.engine.Cp(0), chess.WHITE), 50),
+    (chess.engine.PovScore(chess.engine.Cp(300), chess.WHITE), 75.1),
+    # Scores reported from Black's point of view are turned around
+    (chess.engine.PovScore(chess.engine.Cp(-300), chess.BLACK), 75.1),
+    (chess.engine.PovScore(chess.engine.Cp(300), chess.BLACK), 24.9),
+    (chess.engine.PovScore(chess.engine.Mate(2), chess.WHITE), 100),
+    (chess.engine.PovScore(chess.engine.Mate(2), chess.BLACK), 0),
+])
+def test_white_win_percent_follows_the_logistic_curve(analyzer, score, expected):
+    assert analyzer._white_win_percent({"score": score}) == pytest.approx(expected, abs=0.05)
+
+@pytest.mark.parametrize("before, after, mover, loss", [
+    (50, 30, chess.WHITE, 20),
+    (50, 30, chess.BLACK, -20),
+    (30, 50.25, chess.BLACK, 20.25),
+    (40, 45, chess.WHITE, -5),
+    (None, 30, chess.WHITE, None),
+])
+def test_win_loss_is_taken_from_the_movers_side(analyzer, before, after, mover, loss):
+    assert analyzer._win_loss(before, after, mover) == loss
+
+# White's winning chances before the first move and after each move. White's moves lose
+# 20, 19.75, 10 and 9.75 points; Black's lose 20.25, 10.25, 9.75 and gain 5.
+CLASSIFIED_MOVES = ["e4", "e5", "Nf3", "Nc6", "Bc4", "Bc5", "c3", "Nf6"]
+CLASSIFIED_WINS = [50, 30, 50.25, 30.5, 40.75, 30.75, 40.5, 30.75, 25.75]
+
+def index_game(analyzer, pgn_file, game_info, link=None):
+    """Write the CLASSIFIED_MOVES game to pgn_file and point the analyzer's index at it."""
+    pgn_file.write_text(
+        f'[Event "Live Chess"]\n[Site "{game_info["site"]}"]\n[Date "{game_info["date"]}"]\n'
+        f'[White "{game_info["white"]}"]\n[Black "{game_info["black"]}"]\n[Result "*"]\n'
+        f'[Link "{link or game_info["link"]}"]\n\n'
+        + " ".join(f"{ply // 2 + 1}. {move}" if ply % 2 == 0 else move for ply, move in enumerate(CLASSIFIED_MOVES))
+        + " *\n\n")
+    analyzer.game_index = {game_identifier(game_info): {
+        "source_file": str(pgn_file), "offset": 0, "length": pgn_file.stat().st_size}}
+
+def classify(analyzer, tmp_path, monkeypatch, played_as):
+    """Analyze the CLASSIFIED_MOVES game with fixed evaluations; returns (blunders, inaccuracies)."""
+    opponent = "opponent"
+    white, black = ("tester", opponent) if played_as == "White" else (opponent, "tester")
+    game_info = {**GAME, "white": white, "black": black, "PlayedAs": played_as}
+    index_game(analyzer, tmp_path / "game.pgn", game_info)
+    analyzer.adaptive_analysis = False
+    monkeypatch.setattr(analyzer, "_evaluate_positions", lambda engine, positions, limit, settings: CLASSIFIED_WINS)
+
+    result, _ = analyzer._analyze_game(None, game_info)
+    analyzer._close_pgn_readers()
+    assert result["move_count"] == len(CLASSIFIED_MOVES)
+    return result["blunders"], result["inaccuracies"]
+
+@pytest.mark.parametrize("played_as, counts", [
+    ("White", (1, 2)),
+    ("Black", (1, 1)),
+])
+def test_only_the_players_moves_are_classified(analyzer, tmp_path, monkeypatch, played_as, counts):
+    assert classify(analyzer, tmp_path, monkeypatch, played_as) == counts
+
+@pytest.mark.parametrize("blunder_threshold, inaccuracy_threshold, counts", [
+    (20, 10, (1, 2)),
+    (19.75, 10, (2, 1)),
+    (20.25, 9.75, (0, 4)),
+    (25, 10.25, (0, 2)),
+])
+def test_thresholds_are_inclusive(config, tmp_path, monkeypatch, blunder_threshold, inaccuracy_threshold, counts):
+    config.BLUNDER_THRESHOLD = blunder_threshold
+    config.INACCURACY_THRESHOLD = inaccuracy_threshold
+    assert classify(GameAnalyzer(config), tmp_path, monkeypatch, "White") == counts
+
+def test_results_classified_another_way_are_analyzed_again(analyzer, config):
+    def result(classification):
+        return AnalysisRecord(GAME, engine_settings=analyzer.engine_settings, classification=classification)
+
+    assert analyzer.is_up_to_date(result(analyzer.classification))
+    # Centipawn-era results have no classification; early win-probability results lack thresholds
+    assert not analyzer.is_up_to_date(result(None))
+    assert not analyzer.is_up_to_date(result(GameAnalyzer.CLASSIFICATION))
+
+    config.BLUNDER_THRESHOLD = 25
+    assert not GameAnalyzer(config).is_up_to_date(result(analyzer.classification))
+
+def record_engine_games(analyzer, monkeypatch):
+    """Record the identifier of every game the analyzer hands to an engine."""
+    engine_games = []
+    analyze_game = analyzer._analyze_game
+    def record_game(engine, game_info):
+        engine_games.append(game_identifier(game_info))
+        return analyze_game(engine, game_info)
+    monkeypatch.setattr(analyzer, "_analyze_game", record_game)
+    return engine_games
+
+def test_results_are_checkpointed_every_interval(pipeline, monkeypatch):
+    analyzer = pipeline.analyzer
+    saved_batches = []
+    save = analyzer._save_analysis_results
+    def record_save(results):
+        saved_batches.append(len(results))
+        save(results)
+    monkeypatch.setattr(analyzer, "_save_analysis_results", record_save)
+
+    results = pipeline.process_new_games()
+    assert results["analyzed_games"] == 60
+    assert saved_batches[:6] == [10] * 6
+    assert sum(saved_batches) == 60
+    assert journal_lines(analyzer) == 60
+
+def test_cancelled_run_resumes_after_the_checkpointed_games(pipeline, monkeypatch):
+    analyzer = pipeline.analyzer
+    analyzer.set_progress_callback(lambda completed, total: completed < 25)
+
+    first = pipeline.process_new_games()
+    assert first["cancelled"]
+    # Games already running when the run was cancelled may still finish
+    assert 25 <= first["analyzed_games"] < 60
+    # Games the run never reached are not journaled
+    assert journal_lines(analyzer) == first["analyzed_games"]
+    done = {game_identifier(result) for result in analyzer.load_analysis_results()}
+
+    analyzer.set_progress_callback(None)
+    engine_games = record_engine_games(analyzer, monkeypatch)
+    second = pipeline.process_new_games()
+    assert not second["cancelled"]
+    assert second["skipped_games"] == first["analyzed_games"]
+    assert second["analyzed_games"] == 60 - first["analyzed_games"]
+    assert journal_lines(analyzer) == 60
+
+    # Only the games the first run didn't finish reached the engines
+    assert len(engine_games) == second["analyzed_games"]
+    assert done.isdisjoint(engine_games)
+
+def test_stale_index_entry_is_not_analyzed(analyzer, tmp_path, monkeypatch):
+    # The entry points at another game between the same players, as after the archive was rewritten
+    game_info = {**GAME, "PlayedAs": "White"}
+    index_game(analyzer, tmp_path / "game.pgn", game_info, link="https://www.chess.com/game/live/2")
+    evaluated = []
+    monkeypatch.setattr(analyzer, "_evaluate_positions",
+                        lambda engine, positions, limit, settings: evaluated.append(positions) or CLASSIFIED_WINS)
+
+    result, _ = analyzer._analyze_game(None, game_info)
+    analyzer._close_pgn_readers()
+    assert evaluated == []
+    assert "engine_settings" not in result
+
+def test_results_saved_before_link_keys_are_rekeyed(analyzer):
+    games = [make_game(number, site="Chess.com", date="2020.01.01") for number in range(3)]
+    # Games 0 and 3 share date and players, so their old key can't be told apart
+    games.append(make_game(3, site="Chess.com", date="2020.01.01", white=games[0]["white"],
+                           black=games[0]["black"]))
+    legacy = [AnalysisRecord(dict(game.to_dict(), link=""), blunders=1) for game in games]
+    analyzer.analysis_journal.write_all(legacy)
+    analyzer.game_store.upsert_games(games)
+    analyzer.game_store.replace_analysis(legacy)
+
+    results = analyzer.migrate_identifiers(analyzer.load_analysis_results(), games)
+    assert sorted(result["link"] for result in results) == ["", games[1]["link"], games[2]["link"]]
+    assert {game_identifier(result) for result in analyzer.load_analysis_results()} == {
+        game_identifier(result) for result in results}
+    assert analyzer.game_store.count_games(analyzed=True) == 2
+
+    # Nothing left to re-key: the journal is not rewritten
+    modified = os.path.getmtime(analyzer.analysis_file)
+    assert analyzer.migrate_identifiers(results, games) == results
+    assert os.path.getmtime(analyzer.analysis_file) == modified
+
+def test_up_to_date_results_do_not_reach_the_engine(pipeline, monkeypatch):
+    analyzer = pipeline.analyzer
+    pipeline.process_new_games()
+    results = analyzer.load_analysis_results()
+
+    # Ten results from other engine settings are analyzed again, the rest are reused
+    outdated = results[:10]
+    for result in outdated:
+        result.engine_settings = "depth=1"
+    analyzer.analysis_journal.append(outdated)
+
+    engine_games = record_engine_games(analyzer, monkeypatch)
+    rerun = pipeline.process_new_games()
+    assert rerun["skipped_games"] == 50
+    assert rerun["analyzed_games"] == 10
+    assert sorted(engine_games) == sorted(game_identifier(result) for result in outdated)
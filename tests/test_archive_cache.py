@@ -0,0 +1,84 @@
+"""
+Tests for the on-disk cache of monthly archives.
+"""
+import os
+from datetime import datetime, timezone
+import pytest
+from chessy.services.archive_cache import ArchiveCache
+
+URL = "https://api.chess.com/pub/player/tester/games/2020/12/pgn"
+
+@pytest.fixture
+def cache(tmp_path):
+    return ArchiveCache(str(tmp_path / "archive_cache"))
+
+def fetched_at(cache, url, *when):
+    """Pretend a cached archive was fetched at a UTC date and time."""
+    cache._index[url]["fetched_at"] = datetime(*when, tzinfo=timezone.utc).timestamp()
+
+@pytest.mark.parametrize("when, final", [
+    ((2020, 12, 31, 23, 0), False),      # During the month
+    ((2021, 1, 1, 3, 0), False),         # Within the grace period for late games
+    ((2021, 1, 1, 7, 0), True),          # After the grace period, across the year end
+])
+def test_is_final_after_the_month_and_grace_period(cache, when, final):
+    cache.store(URL, [b"games"])
+    fetched_at(cache, URL, *when)
+    assert cache.is_final(URL, "2020/12") is final
+
+def test_is_final_needs_a_cached_copy(cache):
+    assert not cache.is_final(URL, "2020/12")
+    path, _ = cache.store(URL, [b"games"])
+    fetched_at(cache, URL, 2021, 2, 1)
+    os.remove(path)
+    assert not cache.is_final(URL, "2020/12")
+    assert not cache.is_final(URL, "not a month")
+
+def test_revalidation_headers_come_from_the_cached_copy(cache):
+    assert cache.conditional_headers(URL) == {}
+    cache.store(URL, [b"games"], etag='"abc"', last_modified="Tue, 01 Dec 2020 00:00:00 GMT")
+    assert cache.conditional_headers(URL) == {
+        "If-None-Match": '"abc"', "If-Modified-Since": "Tue, 01 Dec 2020 00:00:00 GMT"}
+
+@pytest.mark.parametrize("old, new, prefix", [
+    (None, b"abc", 0),                   # Nothing cached yet
+    (b"abc", b"abcdef", 3),              # Games appended
+    (b"abc", b"abc", 3),                 # Unchanged
+    (b"abc", b"abXdef", 0),              # Rewritten
+    (b"abcdef", b"abc", 0),              # Shrunk
+    (b"", b"abc", 0),                    # Empty copy
+])
+def test_common_prefix(cache, tmp_path, old, new, prefix):
+    old_path = tmp_path / "old.pgn"
+    new_path = tmp_path / "new.pgn"
+    if old is not None:
+        old_path.write_bytes(old)
+    new_path.write_bytes(new)
+    assert cache._common_prefix(str(old_path), str(new_path)) == prefix
+
+def test_store_keeps_the_copied_offset_only_for_continued_copies(cache):
+    cache.store(URL, [b"game1\n"])
+    assert cache.unappended(URL)[1] == 0
+
+    cache.mark_appended(URL)
+    assert cache.unappended(URL) is None
+
+    # Appended games: only those are new
+    path, offset = cache.store(URL, [b"game1\n", b"game2\n"])
+    assert offset == len(b"game1\n")
+    assert cache.unappended(URL) == (path, offset)
+
+    # A rewritten archive has to be read again from the start
+    cache.mark_appended(URL)
+    assert cache.store(URL, [b"other\n"])[1] == 0
+
+def test_index_survives_a_restart(cache, tmp_path):
+    cache.store(URL, [b"games"], etag='"abc"')
+    cache.mark_appended(URL)
+
+    reopened = ArchiveCache(str(tmp_path / "archive_cache"))
+    assert reopened.get(URL)["etag"] == '"abc"'
+    assert reopened.unappended(URL) is None
+
+    reopened.clear()
+    assert reopened.get(URL) is None
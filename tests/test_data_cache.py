@@ -0,0 +1,96 @@
+"""
+Tests for the process-wide cache of decoded game data.
+"""
+import copy
+import json
+import os
+import pytest
+from chessy.services.data_cache import DataCache, ReadOnlyDict
+from chessy.services.game_store import GameStore
+from chessy.services.parser import game_identifier
+from .factories import make_game
+
+class CountingStore(GameStore):
+    """GameStore that counts the queries reaching it."""
+
+    queries = 0
+
+    def query_games(self, *args, **kwargs):
+        self.queries += 1
+        return super().query_games(*args, **kwargs)
+
+@pytest.fixture
+def store(tmp_path):
+    store = CountingStore(str(tmp_path / "games.sqlite"), game_identifier)
+    store.upsert_games(make_game(number) for number in range(5))
+    return store
+
+def test_results_are_reused_until_the_store_changes(store):
+    cache = DataCache(store)
+    first = cache.query_games({"played_as": "White"})
+    assert cache.query_games({"played_as": "White"}) is first
+    assert store.queries == 1
+
+    # Other arguments are cached separately
+    cache.query_games({"played_as": "Black"})
+    assert store.queries == 2
+
+    store.upsert_games([make_game(5)])
+    assert len(cache.query_games({"played_as": "White"})) == len(first) + 1
+    assert store.queries == 3
+
+    cache.clear()
+    cache.query_games({"played_as": "White"})
+    assert store.queries == 4
+
+def test_cached_values_are_read_only(store):
+    cache = DataCache(store)
+    games = cache.query_games()
+    assert isinstance(games, tuple)
+    with pytest.raises(TypeError):
+        games[0]["white"] = "someone"
+    with pytest.raises(TypeError):
+        games[0].update({"white": "someone"})
+
+    # Copies are ordinary dictionaries, and the values still encode as JSON
+    private = dict(games[0])
+    private["white"] = "someone"
+    assert type(copy.copy(games[0])) is dict
+    assert json.loads(json.dumps(games[0])) == dict(games[0])
+
+def test_least_recently_used_entries_are_dropped(store):
+    cache = DataCache(store, max_entries=2)
+    cache.query_games({"eco": "B00"})
+    cache.query_games({"eco": "B01"})
+    cache.query_games({"eco": "B00"})
+    cache.query_games({"eco": "B02"})
+    assert store.queries == 3
+
+    cache.query_games({"eco": "B00"})
+    assert store.queries == 3
+    cache.query_games({"eco": "B01"})
+    assert store.queries == 4
+
+def test_file_loads_are_reused_until_the_file_changes(store, tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps({"games": 1}))
+    loads = []
+
+    def loader():
+        loads.append(1)
+        with open(path) as f:
+            return json.load(f)
+
+    cache = DataCache(store)
+    assert cache.load_file(str(path), loader) == {"games": 1}
+    assert isinstance(cache.load_file(str(path), loader), ReadOnlyDict)
+    assert len(loads) == 1
+
+    path.write_text(json.dumps({"games": 22}))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000))
+    assert cache.load_file(str(path), loader) == {"games": 22}
+    assert len(loads) == 2
+
+    # A different loader for the same file gets its own entry
+    assert cache.load_file(str(path), lambda: "other") == "other"
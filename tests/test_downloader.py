@@ -0,0 +1,199 @@
+"""
+Tests for the Chess.com downloader's use of the archive cache.
+"""
+import os
+import time
+from datetime import datetime
+import pytest
+from chessy.services.downloader import ChessComDownloader
+from chessy.services.archive_cache import ArchiveCache
+from chessy.services.game_ids import GameIdSet
+from .factories import make_pgn
+
+USERNAME = "tester"
+ARCHIVE_URL = "https://api.chess.com/pub/player/tester/games/{month}"
+
+def make_game(number, time_control):
+    """Build a minimal PGN game with a unique link."""
+    return (
+        f'[Event "Live Chess"]\n'
+        f'[Site "Chess.com"]\n'
+        f'[Date "2020.01.{number:02d}"]\n'
+        f'[White "{USERNAME}"]\n'
+        f'[Black "opponent{number}"]\n'
+        f'[Result "1-0"]\n'
+        f'[TimeControl "{time_control}"]\n'
+        f'[Link "https://www.chess.com/game/live/{number}"]\n'
+        f'\n1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0\n\n'
+    ).encode("utf-8")
+
+class FakeResponse:
+    """Streamed response returned by the fake server."""
+
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+class FakeServer:
+    """Serves monthly archives, answering revalidations with 304 while they are unchanged."""
+
+    def __init__(self, archives, delays=None):
+        """
+        Args:
+            archives: Dict of month (YYYY/MM) to the PGN body of its archive
+            delays: Optional dict of month to seconds its archive takes to serve
+        """
+        self.archives = archives
+        self.etags = {month: '"v1"' for month in archives}
+        self.delays = delays or {}
+        self.requests = []
+        self.served = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append(url)
+        if url.endswith("/archives"):
+            return FakeJson({"archives": [ARCHIVE_URL.format(month=month) for month in self.archives]})
+        month = url[len(ARCHIVE_URL.format(month="")):-len("/pgn")]
+        time.sleep(self.delays.get(month, 0))
+        self.served.append(month)
+        if (headers or {}).get("If-None-Match") == self.etags[month]:
+            return FakeResponse(304)
+        return FakeResponse(200, self.archives[month], {"ETag": self.etags[month]})
+
+class FakeJson(FakeResponse):
+    """Non-streamed JSON response."""
+
+    def __init__(self, data):
+        super().__init__(200)
+        self.data = data
+
+    def json(self):
+        return self.data
+
+def make_downloader(tmp_path, server, max_workers=1):
+    """Create a downloader in tmp_path whose requests go to the fake server."""
+    games_dir = tmp_path / "games"
+    downloader = ChessComDownloader(
+        USERNAME, {}, str(games_dir / f"{USERNAME}_archive.pgn"), str(games_dir / "last_downloaded.txt"),
+        max_workers=max_workers, archive_cache=ArchiveCache(str(games_dir / "archive_cache")),
+        game_ids=GameIdSet(str(games_dir / "game_ids.txt")))
+    downloader._get = server.get
+    return downloader
+
+def archived_links(downloader):
+    """Links of the games in the archive file, in order."""
+    with open(downloader.archive_file, "r", encoding="utf-8") as f:
+        return [line.split('"')[1] for line in f if line.startswith("[Link ")]
+
+@pytest.mark.parametrize("month", [
+    "2020/01",                                 # Finished month: served from the cache without a request
+    datetime.now().strftime("%Y/%m"),          # Current month: revalidated, answered with 304
+])
+def test_unfiltered_download_adds_games_a_filtered_one_skipped(tmp_path, month):
+    body = make_game(1, "600") + make_game(2, "60") + make_game(3, "600")
+    server = FakeServer({month: body})
+
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games({"time_control": "rapid"})
+    assert archived_links(downloader) == [
+        "https://www.chess.com/game/live/1", "https://www.chess.com/game/live/3"]
+
+    # A fresh downloader, as on the next run of the server
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games()
+    assert downloader.last_download_count == 1
+    assert archived_links(downloader) == [
+        "https://www.chess.com/game/live/1", "https://www.chess.com/game/live/3",
+        "https://www.chess.com/game/live/2"]
+
+    # Everything is copied now, so the cached month is not read again
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games() is None
+    assert len(archived_links(downloader)) == 3
+
+def test_revalidated_month_only_reads_games_added_since(tmp_path):
+    month = datetime.now().strftime("%Y/%m")
+    server = FakeServer({month: make_game(1, "600")})
+
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games()
+
+    server.archives[month] += make_game(2, "600")
+    server.etags[month] = '"v2"'
+    downloads = downloader.download_archives_parallel([ARCHIVE_URL.format(month=month)])
+    assert len(downloads) == 1
+    _, path, offset = downloads[0]
+    assert offset == len(make_game(1, "600"))
+    assert os.path.getsize(path) == len(server.archives[month])
+
+def test_months_before_a_date_filtered_download_are_still_fetched(tmp_path):
+    server = FakeServer({"2020/01": make_game(1, "600"), "2020/02": make_game(2, "600")})
+
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games({"start_date": "2020-02-01", "end_date": "2020-02-29"})
+    assert server.served == ["2020/02"]
+
+    downloader = make_downloader(tmp_path, server)
+    assert downloader.fetch_and_save_games({"start_date": "2020-01-01", "end_date": "2020-01-31"})
+    assert server.served == ["2020/02", "2020/01"]
+    assert archived_links(downloader) == [
+        "https://www.chess.com/game/live/2", "https://www.chess.com/game/live/1"]
+
+def test_concurrent_downloads_are_appended_in_month_order(tmp_path):
+    months = ["2020/01", "2020/02", "2020/03", "2020/04"]
+    # Earlier months take longer, so downloads finish newest first
+    server = FakeServer(
+        {month: make_game(2 * number + 1, "600") + make_game(2 * number + 2, "600")
+         for number, month in enumerate(months)},
+        delays={month: 0.05 * (len(months) - number) for number, month in enumerate(months)})
+
+    downloader = make_downloader(tmp_path, server, max_workers=4)
+    assert downloader.fetch_and_save_games()
+    assert server.served == months[::-1]
+    assert downloader.last_download_count == 8
+    assert archived_links(downloader) == [f"https://www.chess.com/game/live/{number}" for number in range(1, 9)]
+
+def test_games_already_in_an_older_archive_are_skipped(tmp_path):
+    server = FakeServer({"2020/01": make_game(1, "600") + make_game(2, "600")})
+    downloader = make_downloader(tmp_path, server)
+
+    # An archive written before the ID file existed
+    os.makedirs(downloader.output_dir, exist_ok=True)
+    with open(downloader.archive_file, "wb") as f:
+        f.write(make_game(1, "600"))
+    assert not downloader.game_ids.exists()
+
+    assert downloader.fetch_and_save_games()
+    assert downloader.last_download_count == 1
+    assert archived_links(downloader) == [
+        "https://www.chess.com/game/live/1", "https://www.chess.com/game/live/2"]
+
+    # The identifiers were saved and are picked up by the next run
+    assert len(GameIdSet(downloader.game_ids.path)) == 2
+
+def test_compaction_keeps_the_first_copy_of_each_game(tmp_path):
+    downloader = make_downloader(tmp_path, FakeServer({"2020/01": b""}))
+    os.makedirs(downloader.output_dir, exist_ok=True)
+    with open(downloader.archive_file, "w", encoding="utf-8") as f:
+        for number in (0, 1, 0, 2, 1):
+            f.write(make_pgn(number))
+
+    assert downloader.compact_archive() == (3, 2)
+    assert archived_links(downloader) == [f"https://www.chess.com/game/live/{number}" for number in (0, 1, 2)]
+    assert len(downloader.game_ids) == 3
+
+    # Nothing left to remove; the archive is not rewritten
+    modified = os.path.getmtime(downloader.archive_file)
+    assert downloader.compact_archive() == (3, 0)
+    assert os.path.getmtime(downloader.archive_file) == modified
@@ -0,0 +1,92 @@
+"""
+Tests for the pool of engine processes.
+"""
+import time
+import chess.engine
+import pytest
+from chessy.services.engine_pool import EnginePool
+
+class FakeProcess:
+    """Stand-in for an engine process that can be crashed."""
+
+    def __init__(self, number):
+        self.number = number
+        self.dead = False
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+class FakeFactory:
+    """Starts numbered fake processes, failing while `failing` is set."""
+
+    def __init__(self):
+        self.started = []
+        self.failing = False
+
+    def __call__(self):
+        if self.failing:
+            raise FileNotFoundError("engine binary missing")
+        process = FakeProcess(len(self.started))
+        self.started.append(process)
+        return process
+
+@pytest.fixture
+def factory(monkeypatch):
+    factory = FakeFactory()
+    monkeypatch.setattr(EnginePool, "_spawn", lambda self: factory())
+    return factory
+
+def use(process, item):
+    """Work item that fails on a crashed process, as python-chess does."""
+    if process.dead:
+        raise chess.engine.EngineTerminatedError("engine process died")
+    return process
+
+def handed_out(process, item):
+    """Work item reporting the process it was given."""
+    return process
+
+def test_map_keeps_input_order(factory):
+    def square(process, item):
+        # Later items finish first
+        time.sleep(0.01 * (5 - item % 5))
+        return item * item
+
+    with EnginePool("stockfish", size=3) as pool:
+        assert pool.map(square, range(10)) == [item * item for item in range(10)]
+    assert len(factory.started) == 3
+
+def test_crashed_engine_is_restarted_and_the_item_retried(factory):
+    with EnginePool("stockfish", size=1) as pool:
+        factory.started[0].dead = True
+        process = pool.run(use, "item")
+        assert process is factory.started[1]
+        assert pool.restarts == 1
+        assert factory.started[0].quit_called
+
+        # The fresh engine serves the next item
+        assert pool.run(use, "item") is process
+
+def test_failed_restart_does_not_return_the_dead_engine(factory):
+    with EnginePool("stockfish", size=1) as pool:
+        factory.started[0].dead = True
+        factory.failing = True
+        with pytest.raises(FileNotFoundError):
+            pool.run(use, "item")
+
+        # The next item starts a new engine instead of picking up the dead one
+        factory.failing = False
+        assert pool.run(handed_out, "item") is factory.started[1]
+
+def test_engine_crashing_on_every_attempt_is_not_reused(factory):
+    def crash(process, item):
+        process.dead = True
+        raise chess.engine.EngineTerminatedError("engine process died")
+
+    with EnginePool("stockfish", size=1, max_restarts=1) as pool:
+        with pytest.raises(chess.engine.EngineTerminatedError):
+            pool.run(crash, "item")
+        assert pool.restarts == 1
+
+        assert pool.run(handed_out, "item") is factory.started[2]
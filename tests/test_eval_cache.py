@@ -0,0 +1,54 @@
+"""
+Tests for the persistent engine evaluation cache.
+"""
+import chess
+import chess.engine
+import pytest
+from chessy.services.eval_cache import EvaluationCache
+
+def info(centipawns=None, mate=None, move="e2e4"):
+    score = chess.engine.Mate(mate) if mate is not None else chess.engine.Cp(centipawns)
+    return {"score": chess.engine.PovScore(score, chess.WHITE), "depth": 12, "pv": [chess.Move.from_uci(move)]}
+
+def positions(count):
+    """Distinct positions along an opening line."""
+    board = chess.Board()
+    boards = []
+    for move in ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "d2d3", "f8c5"][:count]:
+        board.push_uci(move)
+        boards.append(board.copy(stack=False))
+    return boards
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "eval_cache.sqlite")
+
+def test_evaluations_survive_reopening(cache_file):
+    board = chess.Board()
+    with EvaluationCache(cache_file) as cache:
+        assert cache.get(board, "nodes=1000") is None
+        cache.put(board, "nodes=1000", info(35))
+        black_to_move = chess.Board("4k3/8/8/8/8/8/8/4K2R b K - 0 1")
+        cache.put(black_to_move, "nodes=1000", info(mate=-3, move="e8d7"))
+
+    with EvaluationCache(cache_file) as cache:
+        cached = cache.get(board, "nodes=1000")
+        assert cached["score"].white() == chess.engine.Cp(35)
+        assert cached["depth"] == 12 and cached["pv"] == [chess.Move.from_uci("e2e4")]
+        assert cache.get(black_to_move, "nodes=1000")["score"].white() == chess.engine.Mate(-3)
+        # Other engine settings are separate entries
+        assert cache.get(board, "nodes=2000") is None
+        assert (cache.hits, cache.misses) == (2, 1)
+
+def test_least_recently_used_positions_are_evicted(cache_file):
+    boards = positions(6)
+    with EvaluationCache(cache_file, max_entries=4) as cache:
+        for board in boards[:4]:
+            cache.put(board, "depth=8", info(10))
+        # Using the first position makes the second the oldest
+        cache.get(boards[0], "depth=8")
+        cache.put(boards[4], "depth=8", info(10))
+
+        assert cache.get(boards[0], "depth=8") is not None
+        assert cache.get(boards[1], "depth=8") is None
+        assert cache.get(boards[4], "depth=8") is not None
@@ -0,0 +1,95 @@
+"""
+Tests for the SQLite game store.
+"""
+import pytest
+from chessy.services.game_store import GameStore
+from chessy.services.parser import game_identifier
+from .factories import make_analysis, make_game
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / "games.sqlite")
+
+@pytest.fixture
+def games():
+    return [make_game(number) for number in range(30)]
+
+@pytest.fixture
+def store(db_file, games):
+    store = GameStore(db_file, game_identifier)
+    store.replace_games(games)
+    # Every third game is analyzed
+    store.upsert_analysis(make_analysis(game, blunders=number % 4, inaccuracies=number % 3)
+                          for number, game in enumerate(games) if number % 3 == 0)
+    return store
+
+def links(games):
+    return [game["link"] for game in games]
+
+def test_pages_cover_every_game_once_in_order(store, games):
+    pages = [store.query_games(limit=7, offset=offset) for offset in range(0, 35, 7)]
+    paged = [game for page in pages for game in page]
+
+    assert [len(page) for page in pages] == [7, 7, 7, 7, 2]
+    assert [game["date"] for game in paged] == sorted((game["date"] for game in games), reverse=True)
+    assert sorted(links(paged)) == sorted(links(games))
+    assert list(store.iter_games(limit=7, offset=7)) == pages[1]
+
+def test_ties_keep_a_stable_order_across_pages(store):
+    ascending = links(store.query_games(sort="eco", descending=False))
+    paged = [link for offset in range(0, 30, 4)
+             for link in links(store.query_games(sort="eco", descending=False, limit=4, offset=offset))]
+    assert paged == ascending
+
+def test_filters_match_a_scan_of_the_games(store, games):
+    filters = {"played_as": "White", "tc_category": "rapid", "start_date": "2020.03.01"}
+    expected = [game for game in games
+                if game["PlayedAs"] == "White" and game["TimeControl"] == "600"
+                and game["date"] >= "2020.03.01"]
+
+    assert expected
+    assert store.count_games(filters) == len(expected)
+    assert sorted(links(store.query_games(filters))) == sorted(links(expected))
+    assert store.query_games({"opponent": "ALICE"}) == store.query_games({"opponent": "alice"})
+
+    with pytest.raises(ValueError):
+        store.query_games({"colour": "white"})
+    with pytest.raises(ValueError):
+        store.query_games(sort="rating")
+
+def test_analyzed_queries_join_analysis_results(store, games):
+    analyzed = store.query_games(analyzed=True, sort="mistakes")
+    assert len(analyzed) == store.count_games(analyzed=True) == 10
+    scores = [game["blunders"] + game["inaccuracies"] for game in analyzed]
+    assert scores == sorted(scores, reverse=True)
+
+    totals = store.summarize()
+    assert totals["games"] == 10
+    assert totals["blunders"] == sum(number % 4 for number in range(0, 30, 3))
+    by_category = store.summarize(group_by="tc_category")
+    assert sum(group["games"] for group in by_category) == 10
+    assert [group["key"] for group in by_category] == sorted(group["key"] for group in by_category)
+
+def test_date_range_and_empty_checks(db_file, store, games):
+    dates = sorted(game["date"] for game in games)
+    assert store.date_range() == (dates[0], dates[-1])
+    assert not store.is_empty() and not store.is_empty(analysis=True)
+
+    version = store.version()
+    store.clear()
+    assert store.version() == version + 1
+    assert store.is_empty() and store.date_range() == (None, None)
+
+def test_recreated_database_gets_a_new_id(db_file, tmp_path):
+    store = GameStore(db_file, game_identifier)
+    database_id = store.database_id()
+    store.clear()
+    assert store.version() == 1
+
+    # Reopening keeps the identifier
+    assert GameStore(db_file, game_identifier).database_id() == database_id
+
+    # A new file starts counting versions from 0 again, under another identifier
+    other = GameStore(str(tmp_path / "other.sqlite"), game_identifier)
+    assert other.version() == 0
+    assert other.database_id() != database_id
@@ -0,0 +1,70 @@
+"""
+Tests for the JSON Lines record journal.
+"""
+import json
+import pytest
+from chessy.utils.journal import RecordJournal
+
+def key(record):
+    return record["id"]
+
+@pytest.fixture
+def journal(tmp_path):
+    return RecordJournal(str(tmp_path / "records.jsonl"), key)
+
+def read_lines(journal):
+    with open(journal.path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def test_latest_record_wins_in_order_of_last_write(journal):
+    journal.append([{"id": 1, "value": "a"}, {"id": 2, "value": "b"}])
+    journal.append([{"id": 1, "value": "c"}])
+
+    assert journal.load() == [{"id": 2, "value": "b"}, {"id": 1, "value": "c"}]
+    assert list(journal.iter_records()) == journal.load()
+    assert journal.keys() == {1, 2}
+
+def test_compaction_keeps_only_current_records(journal):
+    for value in range(5):
+        journal.append([{"id": 1, "value": value}, {"id": 2, "value": value}])
+    assert len(read_lines(journal)) == 10
+
+    assert journal.compact()
+    assert read_lines(journal) == [{"id": 1, "value": 4}, {"id": 2, "value": 4}]
+    assert journal.load() == read_lines(journal)
+
+    # Nothing superseded any more, so only a forced compaction rewrites the file
+    assert not journal.compact()
+    assert journal.compact(force=True)
+
+def test_torn_final_line_is_skipped_and_repaired(journal):
+    journal.append([{"id": 1, "value": "a"}])
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"id": 2, "val')
+
+    assert journal.load() == [{"id": 1, "value": "a"}]
+
+    # The next append starts on a fresh line instead of extending the torn one
+    journal.append([{"id": 3, "value": "c"}])
+    assert journal.load() == [{"id": 1, "value": "a"}, {"id": 3, "value": "c"}]
+
+    journal.compact(force=True)
+    assert read_lines(journal) == [{"id": 1, "value": "a"}, {"id": 3, "value": "c"}]
+
+def test_legacy_json_array_is_migrated(tmp_path):
+    legacy_path = tmp_path / "records.json"
+    legacy_path.write_text(json.dumps([{"id": 1}, {"id": 2}]))
+
+    journal = RecordJournal(str(tmp_path / "records.jsonl"), key, legacy_path=str(legacy_path))
+    assert journal.load() == [{"id": 1}, {"id": 2}]
+    assert not legacy_path.exists()
+    # The original is kept as a backup
+    assert json.loads((tmp_path / "records.json.bak").read_text()) == [{"id": 1}, {"id": 2}]
+
+def test_unreadable_legacy_file_is_left_alone(tmp_path):
+    legacy_path = tmp_path / "records.json"
+    legacy_path.write_text('[{"id": 1}, {"id"')
+
+    journal = RecordJournal(str(tmp_path / "records.jsonl"), key, legacy_path=str(legacy_path))
+    assert not journal.exists()
+    assert legacy_path.read_text() == '[{"id": 1}, {"id"'
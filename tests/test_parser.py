@@ -0,0 +1,209 @@
+"""
+Tests for PGN game location, header scanning and the game parser.
+"""
+import io
+import json
+import chess.pgn
+import pytest
+from chessy.services.downloader import ChessComDownloader
+from chessy.services.game_ids import GameIdSet
+from chessy.services.parser import GameParser, _parse_range, headers_identifier
+from chessy.utils.pgn import EVENT_LINE, PGNReader, scan_game, split_game_ranges
+from .factories import make_pgn, write_pgn
+
+@pytest.fixture
+def parser(tmp_path):
+    return GameParser("tester", str(tmp_path / "analysis" / "tester_games_parsed.jsonl"))
+
+@pytest.mark.parametrize("number", range(40))
+def test_scan_game_matches_a_full_parse(number):
+    text = make_pgn(number)
+    game = chess.pgn.read_game(io.StringIO(text))
+
+    headers, plies = scan_game(text)
+    assert dict(headers) == dict(game.headers)
+    assert plies == len(list(game.mainline_moves()))
+
+def test_fast_scan_parses_the_same_records_as_replaying_moves(parser, tmp_path):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(25))
+
+    fast = parser.parse_games(pgn_file, fast_scan=True, incremental=False)
+    full = parser.parse_games(pgn_file, fast_scan=False, incremental=False)
+    assert len(fast) == 25
+    assert [game.to_dict() for game in fast] == [game.to_dict() for game in full]
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 50])
+def test_split_ranges_parse_like_the_whole_file(tmp_path, parts):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(30))
+    with open(pgn_file, "rb") as f:
+        data = f.read()
+
+    ranges = split_game_ranges(pgn_file, parts)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(data[start:].startswith(EVENT_LINE) for start, _ in ranges)
+
+    sequential = _parse_range(pgn_file, 0, None, "tester", True)
+    split = [game for start, end in ranges for game in _parse_range(pgn_file, start, end, "tester", True)]
+    assert len(sequential) == 30
+    assert [(game.to_dict(), location) for game, location in split] == [
+        (game.to_dict(), location) for game, location in sequential]
+
+def test_split_ranges_start_from_an_offset(tmp_path):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(10))
+    start = len(make_pgn(0).encode("utf-8")) + len(make_pgn(1).encode("utf-8"))
+
+    ranges = split_game_ranges(pgn_file, 4, start)
+    games = [game for start, end in ranges for game, _ in _parse_range(pgn_file, start, end, "tester", True)]
+    assert ranges[0][0] == start
+    assert [game["link"] for game in games] == [
+        f"https://www.chess.com/game/live/{number}" for number in range(2, 10)]
+
+def test_process_pool_parse_matches_in_process_parse(parser, tmp_path, monkeypatch):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(40))
+    in_process = parser.parse_games(pgn_file, incremental=False)
+    in_process_index = parser.load_game_index()
+
+    # Make the small file count as large enough to split across processes
+    monkeypatch.setattr(GameParser, "MIN_CHUNK_BYTES", 1024)
+    parser.workers = 3
+    pooled = parser.parse_games(pgn_file, incremental=False)
+    assert [game.to_dict() for game in pooled] == [game.to_dict() for game in in_process]
+    assert parser.load_game_index() == in_process_index
+
+def record_parse_starts(parser, monkeypatch):
+    """Record the byte offset each parse of the parser starts at."""
+    starts = []
+    parse_ranges = parser._parse_ranges
+
+    def recording(pgn_file, fast_scan, start=0):
+        starts.append(start)
+        return parse_ranges(pgn_file, fast_scan, start)
+
+    monkeypatch.setattr(parser, "_parse_ranges", recording)
+    return starts
+
+def test_incremental_parse_reads_only_appended_games(parser, tmp_path, monkeypatch):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(10))
+    starts = record_parse_starts(parser, monkeypatch)
+
+    assert len(parser.parse_games(pgn_file)) == 10
+    first_size = (tmp_path / "archive.pgn").stat().st_size
+
+    write_pgn(pgn_file, range(10, 15), mode="a")
+    games = parser.parse_games(pgn_file)
+    assert starts == [0, first_size]
+
+    # Same games, index and store contents as parsing the grown file from scratch
+    fresh = GameParser("tester", str(tmp_path / "fresh" / "tester_games_parsed.jsonl"))
+    expected = fresh.parse_games(pgn_file)
+    assert [game.to_dict() for game in games] == [game.to_dict() for game in expected]
+    assert parser.load_game_index() == fresh.load_game_index()
+    assert parser.game_store.count_games() == 15
+
+    # Nothing appended: nothing parsed, the same games returned
+    assert len(parser.parse_games(pgn_file)) == 15
+    assert starts[-1] == (tmp_path / "archive.pgn").stat().st_size
+
+def test_changed_prefix_is_parsed_in_full(parser, tmp_path, monkeypatch):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(10))
+    starts = record_parse_starts(parser, monkeypatch)
+    parser.parse_games(pgn_file)
+
+    # Rewritten archive, e.g. after compaction, that happens to be longer
+    write_pgn(pgn_file, range(20, 32))
+    games = parser.parse_games(pgn_file)
+    assert starts == [0, 0]
+    assert [game["link"] for game in games] == [
+        f"https://www.chess.com/game/live/{number}" for number in range(20, 32)]
+
+def test_appended_archive_resumes_at_the_saved_offset(parser, tmp_path):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(6))
+    parser.parse_games(pgn_file)
+    parsed_size = (tmp_path / "archive.pgn").stat().st_size
+
+    write_pgn(pgn_file, range(6, 9), mode="a")
+    assert parser._resume_offset(pgn_file) == parsed_size
+
+@pytest.mark.parametrize("edited_game", [0, 2, 5])
+def test_change_inside_the_parsed_prefix_forces_a_full_parse(parser, tmp_path, monkeypatch, edited_game):
+    pgn_file = tmp_path / "archive.pgn"
+    write_pgn(str(pgn_file), range(6))
+    parser.parse_games(str(pgn_file))
+
+    # Same length, one game's result edited in place, then more games appended
+    data = bytearray(pgn_file.read_bytes())
+    result_at = -1
+    for _ in range(edited_game + 1):
+        result_at = data.index(b'[Result "', result_at + 1)
+    result_at += len(b'[Result "')
+    data[result_at:result_at + 1] = b"0" if data[result_at:result_at + 1] != b"0" else b"1"
+    pgn_file.write_bytes(bytes(data))
+    write_pgn(str(pgn_file), range(6, 9), mode="a")
+
+    assert parser._resume_offset(str(pgn_file)) == 0
+    starts = record_parse_starts(parser, monkeypatch)
+    assert len(parser.parse_games(str(pgn_file))) == 9
+    assert starts == [0]
+
+def assert_index_locates_each_game(parser, pgn_file, numbers):
+    """Check that the index has one entry per game, each pointing at the game it is keyed by."""
+    index = parser.load_game_index()
+    assert len(index) == len(numbers)
+    with PGNReader(pgn_file) as reader:
+        for key, location in index.items():
+            game = reader.read_game(location["offset"], location["length"])
+            assert headers_identifier(game.headers) == key
+    assert {key.split("_")[0] for key in index} == {
+        f"https://www.chess.com/game/live/{number}" for number in numbers}
+
+def test_index_is_rebuilt_after_the_archive_is_compacted(parser, tmp_path):
+    pgn_file = str(tmp_path / "archive.pgn")
+    with open(pgn_file, "w", encoding="utf-8") as f:
+        for number in (0, 1, 2, 2, 3, 4, 5, 5, 6, 7):
+            f.write(make_pgn(number))
+    parser.parse_games(pgn_file)
+    assert_index_locates_each_game(parser, pgn_file, range(8))
+
+    # An entry under the identifier scheme from before games were keyed by Link
+    index = parser.load_game_index()
+    index["Chess.com_2020.01.01_tester_alice"] = {"source_file": pgn_file, "offset": 0, "length": 10}
+    with open(parser.game_index_file, "w") as f:
+        json.dump(index, f)
+
+    # Removing the duplicates moves every later game to a new offset
+    downloader = ChessComDownloader("tester", {}, pgn_file, str(tmp_path / "last_downloaded.txt"),
+                                    game_ids=GameIdSet(str(tmp_path / "game_ids.txt")))
+    assert downloader.compact_archive() == (8, 2)
+
+    parser.parse_games(pgn_file)
+    assert_index_locates_each_game(parser, pgn_file, range(8))
+
+def test_reader_slices_locate_each_game(tmp_path):
+    pgn_file = str(tmp_path / "archive.pgn")
+    write_pgn(pgn_file, range(8))
+
+    with PGNReader(pgn_file) as reader:
+        slices = list(reader.iter_slices())
+        assert reader.count_games() == 8
+        for number, (offset, raw_game) in enumerate(slices):
+            assert reader.read_slice(offset, len(raw_game)) == raw_game
+            game = reader.read_game(offset, len(raw_game))
+            assert game.headers["Link"] == f"https://www.chess.com/game/live/{number}"
+
+        # Games starting at or after the end offset are left out
+        assert [offset for offset, _ in reader.iter_slices(slices[2][0], slices[5][0])] == [
+            offset for offset, _ in slices[2:5]]
+
+def test_reader_handles_an_empty_file(tmp_path):
+    pgn_file = tmp_path / "empty.pgn"
+    pgn_file.write_bytes(b"")
+    with PGNReader(str(pgn_file)) as reader:
+        assert list(reader.iter_slices()) == []
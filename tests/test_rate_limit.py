@@ -0,0 +1,112 @@
+"""
+Tests for the shared token bucket and request retries.
+"""
+import pytest
+import requests
+from chessy.utils import rate_limit
+from chessy.utils.rate_limit import TokenBucket, get_with_retries, retry_after_seconds
+
+class FakeClock:
+    """Stands in for the time module; sleeping advances the clock instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # Like a real sleep, always let some time pass
+        self.now += max(seconds, 1e-6)
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+def acquire_times(bucket, clock, count):
+    """Times at which count back-to-back requests are let through."""
+    times = []
+    for _ in range(count):
+        bucket.acquire()
+        times.append(clock.now - 1000.0)
+    return times
+
+def test_bucket_allows_a_burst_then_the_steady_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    assert acquire_times(bucket, clock, 6) == pytest.approx([0, 0, 0, 0.5, 1.0, 1.5], abs=1e-3)
+
+def test_bucket_refills_while_idle_up_to_capacity(clock):
+    bucket = TokenBucket(rate=1, capacity=2)
+    acquire_times(bucket, clock, 2)
+    clock.now += 60
+    start = clock.now
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.now - start == pytest.approx(1.0, abs=1e-3)
+
+def test_pause_holds_back_requests_without_a_burst_after(clock):
+    bucket = TokenBucket(rate=1, capacity=5)
+    bucket.pause(10)
+    assert acquire_times(bucket, clock, 2) == pytest.approx([11, 12], abs=1e-3)
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    """Answers with a fixed sequence of responses or exceptions."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+def test_throttled_and_failed_requests_are_retried(clock):
+    bucket = TokenBucket(rate=100)
+    throttled = FakeResponse(429, {"Retry-After": "7"})
+    session = FakeSession(throttled, requests.exceptions.ConnectionError("reset"), FakeResponse(503),
+                          FakeResponse(200))
+
+    response = get_with_retries(session, "https://api.chess.com/x", bucket, max_retries=3, retry_delay=1)
+    assert response.status_code == 200
+    assert session.calls == 4
+    assert throttled.closed
+    # The Retry-After wait is honored by the limiter
+    assert clock.now - 1000.0 >= 7
+
+@pytest.mark.parametrize("retry_after", ["86400", "Fri, 31 Dec 9999 23:59:59 GMT"])
+def test_retry_after_wait_is_capped(clock, retry_after):
+    bucket = TokenBucket(rate=100)
+    session = FakeSession(FakeResponse(429, {"Retry-After": retry_after}), FakeResponse(200))
+
+    assert get_with_retries(session, "u", bucket, max_retries=1, retry_delay=1).status_code == 200
+    assert clock.now - 1000.0 == pytest.approx(rate_limit.MAX_BACKOFF, abs=0.1)
+
+def test_client_errors_are_returned_and_retries_run_out(clock):
+    bucket = TokenBucket(rate=100)
+    assert get_with_retries(FakeSession(FakeResponse(404)), "u", bucket, 3, 1).status_code == 404
+
+    session = FakeSession(*[FakeResponse(500) for _ in range(3)])
+    with pytest.raises(requests.exceptions.HTTPError):
+        get_with_retries(session, "u", bucket, max_retries=2, retry_delay=1)
+    assert session.calls == 3
+
+def test_retry_after_accepts_seconds_and_dates():
+    assert retry_after_seconds(FakeResponse(429, {"Retry-After": "12"})) == 12
+    assert retry_after_seconds(FakeResponse(429, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0
+    assert retry_after_seconds(FakeResponse(429, {"Retry-After": "soon"})) is None
+    assert retry_after_seconds(FakeResponse(429)) is None
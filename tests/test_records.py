@@ -0,0 +1,41 @@
+"""
+Tests for the slotted game and analysis records.
+"""
+import pickle
+import pytest
+from chessy.services.records import AnalysisRecord, GameRecord
+from .factories import make_analysis, make_game
+
+def test_game_record_round_trips_through_a_dictionary():
+    data = make_game(1).to_dict()
+    data["Rated"] = "true"
+
+    record = GameRecord.from_dict(data)
+    assert record.to_dict() == data
+    assert record["Rated"] == "true" and "Rated" in record
+    assert record.get("missing", "default") == "default"
+    with pytest.raises(KeyError):
+        record["missing"]
+
+def test_analysis_record_reads_through_to_its_game():
+    game = make_game(2)
+    result = make_analysis(game, blunders=3, inaccuracies=1)
+
+    assert result["white"] == game["white"]
+    assert result["blunders"] == 3
+    # Analysis fields that were never set read as missing, as in basic results
+    assert "engine_settings" not in result
+    assert "engine_settings" not in result.to_dict()
+    assert AnalysisRecord.from_dict(result.to_dict()) == result
+
+def test_repeated_strings_are_shared():
+    first, second = (GameRecord.from_dict(make_game(0).to_dict()) for _ in range(2))
+    assert first.white is second.white
+    assert first.TimeControl is second.TimeControl
+
+def test_records_survive_pickling():
+    # Parser worker processes send records back pickled
+    result = make_analysis(make_game(3), blunders=1)
+    copy = pickle.loads(pickle.dumps(result))
+    assert copy == result
+    assert copy.game.black is result.game.black
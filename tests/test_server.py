@@ -0,0 +1,163 @@
+"""
+Tests for the web routes' conditional responses.
+"""
+import json
+from datetime import datetime, timezone
+import pytest
+from chessy.services.data_cache import DataCache
+from chessy.services.game_store import GameStore
+from chessy.services.parser import game_identifier
+from .factories import make_analysis, make_game
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+@pytest.fixture
+def games():
+    return [make_game(number) for number in range(30)]
+
+@pytest.fixture
+def store(server, tmp_path, monkeypatch, games):
+    """A store of sample games behind the routes."""
+    store = GameStore(str(tmp_path / "games.sqlite"), game_identifier)
+    store.upsert_games(games)
+    monkeypatch.setattr(server, "game_store", store)
+    monkeypatch.setattr(server, "data_cache", DataCache(store))
+    return store
+
+def test_game_list_pages_through_every_game(client, store, games):
+    links = []
+    total = None
+    for offset in range(0, 30, 8):
+        page = client.get(f"/api/games?limit=8&offset={offset}&sort=date&order=asc").get_json()
+        total = page["total"]
+        links.extend(game["link"] for game in page["games"])
+        assert set(page["games"][0]) == set(("date", "white", "black", "Result", "PlayedAs", "ECO",
+                                             "TimeControl", "NumMoves", "link"))
+
+    assert total == 30
+    assert sorted(links) == sorted(game["link"] for game in games)
+    assert links == [game["link"] for game in store.query_games(sort="date", descending=False)]
+
+def test_game_list_filters(client, store, games):
+    page = client.get("/api/games?tc_category=bullet&tc_category=rapid&result=win"
+                      "&start_date=2020-03-01&limit=500").get_json()
+    expected = [game for game in games
+                if game["TimeControl"] in ("60", "600") and game["date"] >= "2020.03.01"
+                and game["Result"] == ("1-0" if game["PlayedAs"] == "White" else "0-1")]
+
+    assert expected
+    assert page["total"] == len(expected)
+    assert sorted(game["link"] for game in page["games"]) == sorted(game["link"] for game in expected)
+
+def test_game_list_rejects_unknown_sorts_and_caps_the_page_size(client, store):
+    assert client.get("/api/games?sort=rating").status_code == 400
+    page = client.get("/api/games?limit=100000").get_json()
+    assert page["limit"] == 500
+
+def test_game_data_etag_changes_with_a_recreated_database(server, client, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "game_store", GameStore(str(tmp_path / "first.sqlite"), game_identifier))
+    first = client.get("/api/game_data")
+    assert first.status_code == 200
+    assert client.get("/api/game_data", headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+
+    # A new database is back at version 0, the same as the first one
+    monkeypatch.setattr(server, "game_store", GameStore(str(tmp_path / "second.sqlite"), game_identifier))
+    second = client.get("/api/game_data", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+def test_game_data_selects_fields_and_a_date_window(client, store, games):
+    store.upsert_analysis(make_analysis(game, blunders=1) for game in games)
+
+    data = client.get("/api/game_data?fields=date,blunders&start_date=2020-06-01&end_date=2020.08.31").get_json()
+    dates = sorted(game["date"] for game in games if "2020.06.01" <= game["date"] <= "2020.08.31")
+    assert data == [{"date": date, "blunders": 1} for date in dates]
+
+    latest = client.get("/api/game_data?fields=date&order=desc&limit=1").get_json()
+    assert latest == [{"date": max(game["date"] for game in games)}]
+
+    # Server file paths are only sent when asked for
+    assert "source_file" not in client.get("/api/game_data?limit=1").get_json()[0]
+
+def test_game_data_streams_ndjson(client, store, games):
+    store.upsert_analysis(make_analysis(game) for game in games)
+    response = client.get("/api/game_data?format=ndjson&fields=link")
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert sorted(json.loads(line)["link"] for line in lines) == sorted(game["link"] for game in games)
+
+@pytest.mark.parametrize("query, expected_total", [
+    ("", 30),
+    ("&limit=12", 12),
+    ("&start_date=2020-03-01&end_date=2020-08-31", None),
+])
+def test_game_data_stream_matches_the_store(server, client, store, games, monkeypatch, query, expected_total):
+    store.upsert_analysis(make_analysis(game) for game in games)
+    monkeypatch.setattr(server, "GAME_DATA_CHUNK_SIZE", 7)
+
+    response = client.get(f"/api/game_data?format=ndjson{query}", buffered=False)
+    chunks = list(response.response)
+    lines = "".join(chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk for chunk in chunks).splitlines()
+    response.close()
+
+    if expected_total is None:
+        expected_total = sum(1 for game in games if "2020.03.01" <= game["date"] <= "2020.08.31")
+        assert 0 < expected_total < 30
+    assert int(response.headers["X-Total-Count"]) == expected_total
+    assert len(lines) == expected_total
+    assert len(chunks) == -(-expected_total // 7)
+    assert len({json.loads(line)["link"] for line in lines}) == expected_total
+
+LAST_MODIFIED = datetime(2020, 5, 17, 12, 30, 15, 250000, tzinfo=timezone.utc)
+
+def respond(server, headers=None, last_modified=None, max_age=None, status=200):
+    """Call conditional_response for a request with the given headers; returns (response, builds)."""
+    builds = []
+
+    def build():
+        builds.append(1)
+        return ({"games": 3}, status)
+
+    with server.app.test_request_context("/", headers=headers or {}):
+        response = server.conditional_response("games-1", build, last_modified=last_modified, max_age=max_age)
+    return response, len(builds)
+
+@pytest.mark.parametrize("headers, status", [
+    ({}, 200),
+    ({"If-None-Match": '"games-1"'}, 304),
+    ({"If-None-Match": '"games-0", "games-1"'}, 304),
+    ({"If-None-Match": "*"}, 304),
+    ({"If-None-Match": '"games-0"'}, 200),
+    # If-None-Match wins over If-Modified-Since
+    ({"If-None-Match": '"games-0"', "If-Modified-Since": "Sun, 17 May 2020 12:30:15 GMT"}, 200),
+    ({"If-Modified-Since": "Sun, 17 May 2020 12:30:15 GMT"}, 304),
+    ({"If-Modified-Since": "Sun, 17 May 2020 12:30:14 GMT"}, 200),
+])
+def test_conditional_response_answers_current_copies_with_304(server, headers, status):
+    response, builds = respond(server, headers, last_modified=LAST_MODIFIED)
+    assert response.status_code == status
+    # The payload is only built when it is sent
+    assert builds == (1 if status == 200 else 0)
+    assert response.headers["ETag"] == '"games-1"'
+    assert response.headers["Last-Modified"] == "Sun, 17 May 2020 12:30:15 GMT"
+    assert "no-cache" in response.headers["Cache-Control"]
+
+def test_conditional_response_cache_lifetime_and_errors(server):
+    response, _ = respond(server, max_age=3600)
+    assert set(response.headers["Cache-Control"].split(", ")) == {"public", "max-age=3600"}
+
+    # Error responses carry no validators, so they are never revalidated into a 304
+    response, _ = respond(server, status=500)
+    assert response.status_code == 500
+    assert "ETag" not in response.headers and "Cache-Control" not in response.headers
+
+def test_game_data_etag_changes_after_a_write(client, store, games):
+    etag = client.get("/api/game_data").headers["ETag"]
+    assert client.get("/api/game_data", headers={"If-None-Match": etag}).status_code == 304
+
+    store.upsert_analysis([make_analysis(games[0])])
+    response = client.get("/api/game_data", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 1
@@ -0,0 +1,70 @@
+"""
+Tests for the ChessyService processing pipeline.
+"""
+import types
+import pytest
+from chessy.services import ChessyService
+
+class StubParser:
+    def parse_games(self, pgn_file):
+        return [{"link": "https://www.chess.com/game/live/1", "site": "Chess.com", "date": "2020.01.01",
+                 "white": "a", "black": "b"}]
+
+class StubAnalyzer:
+    """Records the profile each step ran with."""
+
+    def __init__(self, fail=False):
+        self.profile = "standard"
+        self.cancelled = False
+        self.last_analysis_count = 0
+        self.fail = fail
+        self.used_profiles = []
+
+    def set_profile(self, profile_name):
+        self.profile = profile_name
+
+    def load_analysis_results(self):
+        return []
+
+    def migrate_identifiers(self, results, games_data):
+        return results
+
+    def is_up_to_date(self, result):
+        return False
+
+    def analyze_games(self, games_data, known_results=None):
+        self.used_profiles.append(self.profile)
+        if self.fail:
+            raise RuntimeError("engine failed")
+        self.last_analysis_count = len(games_data)
+        return list(games_data)
+
+    def generate_eco_statistics(self, games_data):
+        return {}
+
+    def refresh_summary(self):
+        pass
+
+@pytest.fixture
+def archive_config(tmp_path):
+    archive = tmp_path / "archive.pgn"
+    archive.write_text("")
+    return types.SimpleNamespace(ARCHIVE_FILE=str(archive), USERNAME="tester")
+
+def test_requested_profile_applies_to_one_run(archive_config):
+    analyzer = StubAnalyzer()
+    service = ChessyService(None, StubParser(), analyzer, archive_config)
+
+    service.process_new_games(profile="deep")
+    service.process_new_games()
+
+    assert analyzer.used_profiles == ["deep", "standard"]
+    assert analyzer.profile == "standard"
+
+def test_profile_is_restored_when_analysis_fails(archive_config):
+    analyzer = StubAnalyzer(fail=True)
+    service = ChessyService(None, StubParser(), analyzer, archive_config)
+
+    with pytest.raises(RuntimeError):
+        service.process_new_games(profile="fast")
+    assert analyzer.profile == "standard"
@@ -0,0 +1,78 @@
+"""
+Tests for the precomputed dashboard summary.
+"""
+import pytest
+from chessy.services.game_store import GameStore
+from chessy.services.parser import game_identifier
+from chessy.services.summary import GameSummary
+from .factories import make_analysis, make_game
+
+@pytest.fixture
+def games():
+    return [make_game(number) for number in range(40)]
+
+@pytest.fixture
+def store(tmp_path, games):
+    store = GameStore(str(tmp_path / "games.sqlite"), game_identifier)
+    store.upsert_games(games)
+    store.upsert_analysis(make_analysis(game, blunders=number % 3, inaccuracies=number % 4)
+                          for number, game in enumerate(games[:20]))
+    return store
+
+@pytest.fixture
+def summary(tmp_path, store):
+    return GameSummary(str(tmp_path / "summary.json"), store)
+
+def save(summary, store, results):
+    """Write analysis results the way the analyzer does, updating the summary."""
+    snapshot = summary.snapshot(game_identifier(result) for result in results)
+    store.upsert_analysis(results)
+    summary.update(snapshot)
+
+def test_updates_match_a_rebuild(summary, store, games):
+    new_game = make_game(40, TimeControl="1800")
+    store.upsert_games([new_game])
+    summary.current()
+    build = summary._build
+    summary._build = None  # Each save must be applied incrementally
+
+    # Newly analyzed games, including a new time control group and top-list entries
+    save(summary, store, [make_analysis(game, blunders=9, inaccuracies=5) for game in games[20:24]])
+    save(summary, store, [make_analysis(games[24], inaccuracies=1),
+                          make_analysis(new_game, blunders=1)])
+    # Re-analyzed games whose counts went down, pushing them out of the top lists
+    save(summary, store, [make_analysis(game) for game in games[20:22]])
+
+    assert summary.current() == build()
+    assert summary.current()["totals"]["games"] == 26
+
+def test_update_rebuilds_when_the_store_changed_in_between(summary, store, games):
+    summary.current()
+    snapshot = summary.snapshot([game_identifier(games[30])])
+    store.upsert_analysis([make_analysis(games[31], blunders=4)])
+    store.upsert_analysis([make_analysis(games[30], blunders=2)])
+    summary.update(snapshot)
+
+    assert summary.current() == summary._build()
+    assert summary.current()["totals"]["games"] == 22
+
+def test_saved_summary_is_reused_by_a_new_process(tmp_path, summary, store):
+    built = summary.current()
+    reopened = GameSummary(summary.path, store)
+    reopened._build = None  # Must not be needed
+    assert reopened.current() == built
+
+def test_summary_file_from_another_database_is_rebuilt(tmp_path):
+    path = str(tmp_path / "summary.json")
+    first = GameStore(str(tmp_path / "first.sqlite"), game_identifier)
+    games = [make_game(number) for number in range(3)]
+    first.upsert_games(games)
+    first.upsert_analysis(make_analysis(game) for game in games)
+    assert GameSummary(path, first).current()["totals"]["games"] == 3
+
+    # A recreated database reaches the same version with other games
+    second = GameStore(str(tmp_path / "second.sqlite"), game_identifier)
+    second.upsert_games(games[:1])
+    second.upsert_analysis([make_analysis(games[0])])
+    assert second.version() == first.version()
+    assert GameSummary(path, second).current()["totals"]["games"] == 1